@@ -1,24 +1,65 @@
 """API"""
 
+import codecs
+import json
 import os
+import re
 import sys
+import time
 import requests
+from urllib3.util.retry import Retry
 sys.path.append(os.getcwd())
 
-from constants import DockerConstants, ApiConstants
+from constants import DockerConstants, ApiConstants, SessionConstants
+from instrumentation import InstrumentedAdapter, RequestEvent, get_timings, reset_timings
 
 
 class ApiClient:
     """Bears API class"""
 
-    def __init__(self, base_url=DockerConstants.BASE_URL):
+    def __init__(self, base_url=DockerConstants.BASE_URL, pool_size=SessionConstants.POOL_SIZE,
+                 retries=SessionConstants.RETRIES, timeout=SessionConstants.TIMEOUT, transport=None):
         """ApiClient init
 
         :param base_url: base URL for REST requests
         :type base_url: str
+        :param pool_size: maximum number of keep-alive connections kept open to the host
+        :type pool_size: int
+        :param retries: number of retries on connection errors
+        :type retries: int
+        :param timeout: default (connect, read) timeout in seconds for every call
+        :type timeout: tuple or float
+        :param transport: transport adapter mounted for base_url instead of HTTP, e.g. FakeAlaskaAdapter
+        :type transport: requests.adapters.BaseAdapter
         :return: None
         """
         self._base_url = base_url
+        self._timeout = timeout
+        self._session = requests.Session()
+        self._session.headers.update({'Connection': 'keep-alive'})
+        retry = Retry(total=retries, connect=retries, read=retries, status=0,
+                      backoff_factor=SessionConstants.BACKOFF_FACTOR, raise_on_status=False)
+        adapter = InstrumentedAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=retry, pool_block=True)
+        self._session.mount('http://', adapter)
+        self._session.mount('https://', adapter)
+        self._transport = transport
+        if transport is not None:
+            # a recording transport sends through the adapter of this client, see CassetteAdapter.bind
+            self._session.mount(base_url, transport.bind(adapter) if hasattr(transport, 'bind') else transport)
+        self._hooks = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self):
+        """Close pooled connections
+
+        :return: None
+        """
+        self._session.close()
 
     @property
     def base_url(self):
@@ -29,6 +70,81 @@ class ApiClient:
         """
         return self._base_url
 
+    @property
+    def transport(self):
+        """transport getter
+
+        :return: transport adapter mounted for base_url, None for HTTP
+        :rtype: requests.adapters.BaseAdapter
+        """
+        return self._transport
+
+    @property
+    def session(self):
+        """session getter
+
+        :return: pooled HTTP session
+        :rtype: requests.Session
+        """
+        return self._session
+
+    def add_hook(self, hook):
+        """Register instrumentation hook called with RequestEvent after every endpoint call
+
+        :param hook: callable taking instrumentation.RequestEvent
+        :return: None
+        """
+        self._hooks.append(hook)
+
+    def remove_hook(self, hook):
+        """Unregister instrumentation hook
+
+        :param hook: registered hook
+        :return: None
+        """
+        self._hooks.remove(hook)
+
+    def _request(self, method, url, path, **kwargs):
+        """Send request through the pooled session and report it to the hooks
+
+        :param method: HTTP method
+        :type method: str
+        :param url: request URL
+        :type url: str
+        :param path: path template for instrumentation, like /bear/{bear_id}
+        :type path: str
+        :return: Response object
+        :rtype: requests.models.Response
+        """
+        kwargs.setdefault('timeout', self._timeout)
+        if not self._hooks:
+            return self._session.request(method, url, **kwargs)
+
+        event = RequestEvent(method, path)
+        reset_timings()
+        started = time.perf_counter()
+        try:
+            resp = self._session.request(method, url, **kwargs)
+        except requests.RequestException as ex:
+            event.error = repr(ex)
+            raise
+        else:
+            event.status_code = resp.status_code
+            event.bytes_sent = len(resp.request.body or b'')
+            if not kwargs.get('stream'):
+                event.bytes_received = len(resp.content)
+            elif 'Content-Length' in resp.headers:
+                event.bytes_received = int(resp.headers['Content-Length'])
+            event.ttfb = resp.elapsed.total_seconds()
+            retries = getattr(resp.raw, 'retries', None)
+            event.retries = len(retries.history) if retries is not None else 0
+            return resp
+        finally:
+            event.total = time.perf_counter() - started
+            event.dns, event.connect = get_timings()
+            for hook in self._hooks:
+                hook(event)
+
     def post_add(self, **kwargs):
         """POST REST. Create record
 
@@ -36,7 +152,7 @@ class ApiClient:
         :rtype: requests.models.Response
         """
         url = self.base_url + ApiConstants.POST_ADD_PATH
-        return requests.post(url=url, **kwargs)
+        return self._request('POST', url, ApiConstants.POST_ADD_PATH, **kwargs)
 
     def get_info(self, **kwargs):
         """GET REST. Get info
@@ -45,7 +161,7 @@ class ApiClient:
         :rtype: requests.models.Response
         """
         url = self.base_url + ApiConstants.GET_INFO_PATH
-        return requests.get(url=url, **kwargs)
+        return self._request('GET', url, ApiConstants.GET_INFO_PATH, **kwargs)
 
     def get_one(self, bear_id, **kwargs):
         """GET REST. Get one database record
@@ -56,7 +172,7 @@ class ApiClient:
         :rtype: requests.models.Response
         """
         url = self.base_url + ApiConstants.GET_ONE_PATH + str(bear_id)
-        return requests.get(url=url, **kwargs)
+        return self._request('GET', url, ApiConstants.GET_ONE_PATH + '{bear_id}', **kwargs)
 
     def get_all(self, **kwargs):
         """GET REST. Get whole database
@@ -65,7 +181,21 @@ class ApiClient:
         :rtype: requests.models.Response
         """
         url = self.base_url + ApiConstants.GET_ALL_PATH
-        return requests.get(url=url, **kwargs)
+        return self._request('GET', url, ApiConstants.GET_ALL_PATH, **kwargs)
+
+    def iter_all(self, chunk_size=ApiConstants.STREAM_CHUNK_SIZE, **kwargs):
+        """GET REST. Stream whole database record by record with constant memory.
+        The connection is released when the iteration is exhausted or the generator is closed
+
+        :param chunk_size: size of body chunks read from the socket
+        :type chunk_size: int
+        :return: bear records
+        :rtype: iterator
+        :raises requests.HTTPError: response status is not 2xx
+        """
+        with self.get_all(stream=True, **kwargs) as resp:
+            resp.raise_for_status()
+            yield from iter_json_array(resp.iter_content(chunk_size=chunk_size))
 
     def put_one(self, bear_id, **kwargs):
         """PUT REST. Update database record
@@ -76,7 +206,7 @@ class ApiClient:
         :rtype: requests.models.Response
         """
         url = self.base_url + ApiConstants.PUT_ONE_PATH + str(bear_id)
-        return requests.put(url=url, **kwargs)
+        return self._request('PUT', url, ApiConstants.PUT_ONE_PATH + '{bear_id}', **kwargs)
 
     def delete_one(self, bear_id, **kwargs):
         """DELETE REST. Delete one record
@@ -87,7 +217,7 @@ class ApiClient:
         :rtype: requests.models.Response
         """
         url = self.base_url + ApiConstants.DELETE_ONE_PATH + str(bear_id)
-        return requests.delete(url=url, **kwargs)
+        return self._request('DELETE', url, ApiConstants.DELETE_ONE_PATH + '{bear_id}', **kwargs)
 
     def delete_all(self, **kwargs):
         """DELETE REST. Delete all database records
@@ -96,7 +226,85 @@ class ApiClient:
         :rtype: requests.models.Response
         """
         url = self.base_url + ApiConstants.DELETE_ALL_PATH
-        return requests.delete(url=url, **kwargs)
+        return self._request('DELETE', url, ApiConstants.DELETE_ALL_PATH, **kwargs)
+
+
+def iter_json_array(chunks):
+    """Incrementally decode top-level JSON array, yielding items as soon as they are complete.
+    An item is complete when a delimiter (',', ']' or whitespace) follows it, so a number split
+    between chunks is not yielded truncated; syntax errors are raised as soon as they are seen,
+    the rest of the stream after the array is read and may only be whitespace
+
+    :param chunks: bytes or str chunks of JSON array
+    :type chunks: iterable
+    :return: decoded array items
+    :rtype: iterator
+    :raises ValueError: chunks are not a JSON array
+    """
+    decoder = json.JSONDecoder()
+    utf8 = codecs.getincrementaldecoder('utf-8')()
+    chunks = iter(chunks)
+    # expect: '[' array start, 'first' item or ']', 'item' after ',', 'next' ',' or ']' after an item,
+    # 'end' nothing but whitespace after the array
+    buffer, pos, eof, expect = '', 0, False, '['
+    while True:
+        while pos < len(buffer) and buffer[pos] in _WHITESPACE:
+            pos += 1
+        if pos < len(buffer):
+            char = buffer[pos]
+            if expect == 'end':
+                raise _invalid(buffer, pos)
+            if expect == '[':
+                if char != '[':
+                    raise _invalid(buffer, pos)
+                pos, expect = pos + 1, 'first'
+                continue
+            if expect == 'next':
+                if char not in ',]':
+                    raise _invalid(buffer, pos)
+                pos, expect = pos + 1, 'end' if char == ']' else 'item'
+                continue
+            if char == ']' and expect == 'first':
+                pos, expect = pos + 1, 'end'
+                continue
+            if char in ',]':
+                raise _invalid(buffer, pos)
+            try:
+                item, end = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError as error:
+                # a value cut at the chunk end is completed by the next chunk, anything else is an error
+                if eof or not (error.msg.startswith('Unterminated string') or
+                               _INCOMPLETE_TAIL.fullmatch(buffer, error.pos)):
+                    raise
+            else:
+                if end < len(buffer) and buffer[end] in _DELIMITERS or end == len(buffer) and eof:
+                    yield item
+                    pos, expect = end, 'next'
+                    continue
+                if end < len(buffer) and not (isinstance(item, (int, float)) and not eof and
+                                              _NUMBER_TAIL.fullmatch(buffer, end)):
+                    raise _invalid(buffer, end)
+        elif eof:
+            if expect == 'end':
+                return
+            raise _invalid(buffer, pos)
+        chunk = next(chunks, None)
+        if chunk is None:
+            buffer, pos, eof = buffer[pos:] + utf8.decode(b'', final=True), 0, True
+        else:
+            buffer, pos = buffer[pos:] + (utf8.decode(chunk) if isinstance(chunk, bytes) else chunk), 0
+
+
+_WHITESPACE = ' \t\r\n'
+_DELIMITERS = _WHITESPACE + ',]'
+# number continued by the next chunk, like '1.' + '5' or '2e' + '3'
+_NUMBER_TAIL = re.compile(r'[-+.0-9eE]*')
+# end of the buffer inside a value: number, literal or \uXXXX escape continued by the next chunk
+_INCOMPLETE_TAIL = re.compile(r'[-+.0-9eE]*|t(r(ue?)?)?|f(a(l(se?)?)?)?|n(u(ll?)?)?|u[0-9a-fA-F]{0,4}')
+
+
+def _invalid(buffer, pos):
+    return ValueError('Invalid JSON array near {0!r}'.format(buffer[pos:pos + 20]))
 
 
 def validate_response_code(resp_obj, code, should_be_equal=True):
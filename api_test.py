@@ -0,0 +1,68 @@
+"""Unit tests of incremental JSON array decoding of ApiClient.iter_all"""
+import json
+import pytest
+import allure
+import os
+import sys
+sys.path.append(os.getcwd())
+
+from api import iter_json_array
+
+# Test data
+valid_arrays = [
+    '[]',
+    ' [ ] ',
+    '[1.5]',
+    '[2e3, -0.25E-2, 10]',
+    '[1, 22, 333]',
+    '[true, false, null]',
+    '["a,b]", "\\u0416\\"", "Жж"]',
+    '[{"bear_id": 1, "bear_type": "BROWN", "bear_name": "MIKHAIL", "bear_age": 17.5}, [1, [2]], {}]',
+    '[\n  {"bear_id": 2},\n  {"bear_id": 3}\n]',
+]
+
+invalid_arrays = ['[1,,2]', '[1,2,]', '[,1]', '[12 3]', '[1x]', '{"bear_id": 1}', '[1, 2', '[tru]', '["a]', '',
+                  '[1]x', '[] []', '[1],']
+
+
+def split_at_every_offset(document):
+    """Two-chunk splits of the UTF-8 document at every byte offset and the one byte per chunk split"""
+    data = document.encode('utf8')
+    for offset in range(len(data) + 1):
+        yield [data[:offset], data[offset:]]
+    yield [data[offset:offset + 1] for offset in range(len(data))]
+
+
+@allure.feature('iter_json_array unit tests')
+class TestIterJsonArray:
+
+    @allure.feature('Valid array is decoded whatever the chunk boundaries are')
+    @pytest.mark.parametrize('document', valid_arrays)
+    def test_valid_array_every_split(self, document) -> None:
+        expected = json.loads(document)
+        for chunks in split_at_every_offset(document):
+            assert list(iter_json_array(chunks)) == expected, 'Wrong items for chunks {0}'.format(chunks)
+
+    @allure.feature('Items are yielded before the array is complete')
+    def test_items_yielded_incrementally(self) -> None:
+        items = iter_json_array(iter(['[{"bear_id": 1}, ', '{"bear_id": 2}', ']']))
+        assert next(items) == {'bear_id': 1}
+        assert next(items) == {'bear_id': 2}
+        assert list(items) == []
+
+    @allure.feature('Invalid array raises ValueError whatever the chunk boundaries are')
+    @pytest.mark.parametrize('document', invalid_arrays)
+    def test_invalid_array_every_split(self, document) -> None:
+        for chunks in split_at_every_offset(document):
+            with pytest.raises(ValueError):
+                list(iter_json_array(chunks))
+
+    @allure.feature('Syntax error is raised without reading the rest of the stream')
+    @pytest.mark.parametrize('document', ['[1,,', '[1 2', '[1x', '[1,]', 'x', '[1] x'])
+    def test_error_raised_before_next_chunk(self, document) -> None:
+        def chunks():
+            yield document.encode('utf8')
+            raise AssertionError('Next chunk was read after a syntax error')
+
+        with pytest.raises(ValueError):
+            list(iter_json_array(chunks()))
@@ -0,0 +1,297 @@
+"""Async API"""
+
+import asyncio
+import json
+import os
+import sys
+sys.path.append(os.getcwd())
+
+from constants import DockerConstants, ApiConstants, SessionConstants, AsyncConstants
+
+
+class AsyncResponse:
+    """Fully read response of AsyncApiClient with requests-like interface"""
+
+    def __init__(self, status_code, reason, text):
+        """AsyncResponse init
+
+        :param status_code: HTTP status code
+        :type status_code: int
+        :param reason: HTTP reason phrase
+        :type reason: str
+        :param text: response body
+        :type text: str
+        :return: None
+        """
+        self.status_code = status_code
+        self.reason = reason
+        self.text = text
+
+    def json(self):
+        """Decode response body
+
+        :return: decoded JSON body
+        """
+        return json.loads(self.text)
+
+
+class AsyncApiClient:
+    """Bears asyncio API class"""
+
+    def __init__(self, base_url=DockerConstants.BASE_URL, concurrency=AsyncConstants.CONCURRENCY,
+                 timeout=SessionConstants.TIMEOUT):
+        """AsyncApiClient init
+
+        :param base_url: base URL for REST requests
+        :type base_url: str
+        :param concurrency: maximum number of in-flight requests of batch helpers and open connections
+        :type concurrency: int
+        :param timeout: (connect, read) timeout in seconds for every call
+        :type timeout: tuple or float
+        :return: None
+        """
+        # aiohttp is imported by the first client, so collecting async_api_test.py does not pay for it
+        import aiohttp
+        self._base_url = base_url
+        self._concurrency = concurrency
+        connect_timeout, read_timeout = timeout if isinstance(timeout, tuple) else (timeout, timeout)
+        self._timeout = aiohttp.ClientTimeout(sock_connect=connect_timeout, sock_read=read_timeout)
+        self._session = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+    @property
+    def base_url(self):
+        """base_url getter
+
+        :return: base URL address
+        :rtype: str
+        """
+        return self._base_url
+
+    @property
+    def concurrency(self):
+        """concurrency getter
+
+        :return: maximum number of in-flight requests
+        :rtype: int
+        """
+        return self._concurrency
+
+    async def close(self):
+        """Close pooled connections
+
+        :return: None
+        """
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def _request(self, method, url, **kwargs):
+        """Send request through the pooled session, session is created on the first call inside the running loop
+
+        :param method: HTTP method
+        :type method: str
+        :param url: request URL
+        :type url: str
+        :return: Response object
+        :rtype: AsyncResponse
+        """
+        if self._session is None:
+            import aiohttp
+            connector = aiohttp.TCPConnector(limit=self._concurrency)
+            self._session = aiohttp.ClientSession(connector=connector, timeout=self._timeout)
+        async with self._session.request(method, url, **kwargs) as resp:
+            return AsyncResponse(resp.status, resp.reason, await resp.text())
+
+    async def post_add(self, **kwargs):
+        """POST REST. Create record
+
+        :return: Response object
+        :rtype: AsyncResponse
+        """
+        url = self.base_url + ApiConstants.POST_ADD_PATH
+        return await self._request('POST', url, **kwargs)
+
+    async def get_info(self, **kwargs):
+        """GET REST. Get info
+
+        :return: Response object
+        :rtype: AsyncResponse
+        """
+        url = self.base_url + ApiConstants.GET_INFO_PATH
+        return await self._request('GET', url, **kwargs)
+
+    async def get_one(self, bear_id, **kwargs):
+        """GET REST. Get one database record
+
+        :param bear_id: Bear bear_id
+        :type bear_id: int
+        :return: Response object
+        :rtype: AsyncResponse
+        """
+        url = self.base_url + ApiConstants.GET_ONE_PATH + str(bear_id)
+        return await self._request('GET', url, **kwargs)
+
+    async def get_all(self, **kwargs):
+        """GET REST. Get whole database
+
+        :return: Response object
+        :rtype: AsyncResponse
+        """
+        url = self.base_url + ApiConstants.GET_ALL_PATH
+        return await self._request('GET', url, **kwargs)
+
+    async def put_one(self, bear_id, **kwargs):
+        """PUT REST. Update database record
+
+        :param bear_id: Bear bear_id
+        :type bear_id: int
+        :return: Response object
+        :rtype: AsyncResponse
+        """
+        url = self.base_url + ApiConstants.PUT_ONE_PATH + str(bear_id)
+        return await self._request('PUT', url, **kwargs)
+
+    async def delete_one(self, bear_id, **kwargs):
+        """DELETE REST. Delete one record
+
+        :param bear_id: Bear bear_id
+        :type bear_id: int
+        :return: Response object
+        :rtype: AsyncResponse
+        """
+        url = self.base_url + ApiConstants.DELETE_ONE_PATH + str(bear_id)
+        return await self._request('DELETE', url, **kwargs)
+
+    async def delete_all(self, **kwargs):
+        """DELETE REST. Delete all database records
+
+        :return: Response object
+        :rtype: AsyncResponse
+        """
+        url = self.base_url + ApiConstants.DELETE_ALL_PATH
+        return await self._request('DELETE', url, **kwargs)
+
+    async def _gather(self, method, args, concurrency=None):
+        """Run method for every argument with at most concurrency calls in flight
+
+        :param method: coroutine function taking one positional argument
+        :param args: arguments, one call per item
+        :type args: iterable
+        :param concurrency: in-flight limit, client concurrency if None
+        :type concurrency: int
+        :return: results in the order of args
+        :rtype: list
+        :raises Exception: the first failed call, calls in flight are cancelled and the rest are not started
+        """
+        semaphore = asyncio.Semaphore(concurrency or self._concurrency)
+        tasks = []
+        failed = []
+
+        def release(task):
+            if not task.cancelled() and task.exception() is not None:
+                failed.append(task)
+            semaphore.release()
+
+        try:
+            for arg in args:
+                # A task is created only when a call slot is free, args may be long or lazy
+                await semaphore.acquire()
+                if failed:
+                    break
+                task = asyncio.ensure_future(method(arg))
+                task.add_done_callback(release)
+                tasks.append(task)
+            if tasks and not failed:
+                await asyncio.wait(tasks, return_when=asyncio.FIRST_EXCEPTION)
+        finally:
+            pending = [task for task in tasks if not task.done()]
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.wait(pending)
+        if failed:
+            raise failed[0].exception()
+        return [task.result() for task in tasks]
+
+    async def create_bears(self, bear_jsons, concurrency=None, **kwargs):
+        """Batch POST REST. Create a record for every json
+
+        :param bear_jsons: bear records to create
+        :type bear_jsons: iterable
+        :param concurrency: in-flight limit, client concurrency if None
+        :type concurrency: int
+        :return: Response objects in the order of bear_jsons
+        :rtype: list
+        """
+        return await self._gather(lambda bear_json: self.post_add(json=bear_json, **kwargs), bear_jsons, concurrency)
+
+    async def create_n_bears(self, count, bear_json, concurrency=None, **kwargs):
+        """Batch POST REST. Create count identical records
+
+        :param count: number of records
+        :type count: int
+        :param bear_json: bear record
+        :type bear_json: dict
+        :param concurrency: in-flight limit, client concurrency if None
+        :type concurrency: int
+        :return: Response objects
+        :rtype: list
+        """
+        return await self.create_bears((bear_json for _ in range(count)), concurrency, **kwargs)
+
+    async def get_bears(self, bear_ids, concurrency=None, **kwargs):
+        """Batch GET REST. Get every record from bear_ids
+
+        :param bear_ids: Bear bear_ids
+        :type bear_ids: iterable
+        :param concurrency: in-flight limit, client concurrency if None
+        :type concurrency: int
+        :return: Response objects in the order of bear_ids
+        :rtype: list
+        """
+        return await self._gather(lambda bear_id: self.get_one(bear_id, **kwargs), bear_ids, concurrency)
+
+    async def put_bears(self, updates, concurrency=None, **kwargs):
+        """Batch PUT REST. Update records
+
+        :param updates: (bear_id, json) pairs
+        :type updates: iterable
+        :param concurrency: in-flight limit, client concurrency if None
+        :type concurrency: int
+        :return: Response objects in the order of updates
+        :rtype: list
+        """
+        return await self._gather(lambda update: self.put_one(update[0], json=update[1], **kwargs), updates,
+                                  concurrency)
+
+    async def delete_bears(self, bear_ids, concurrency=None, **kwargs):
+        """Batch DELETE REST. Delete every record from bear_ids
+
+        :param bear_ids: Bear bear_ids
+        :type bear_ids: iterable
+        :param concurrency: in-flight limit, client concurrency if None
+        :type concurrency: int
+        :return: Response objects in the order of bear_ids
+        :rtype: list
+        """
+        return await self._gather(lambda bear_id: self.delete_one(bear_id, **kwargs), bear_ids, concurrency)
+
+
+def run_async(coro):
+    """Run coroutine to completion in a new event loop, for use from synchronous fixtures and tests
+
+    :param coro: coroutine
+    :return: coroutine result
+    """
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coro)
+    finally:
+        loop.run_until_complete(loop.shutdown_asyncgens())
+        loop.close()
@@ -0,0 +1,101 @@
+"""Unit tests of AsyncApiClient batch helpers"""
+import asyncio
+import pytest
+import allure
+import os
+import sys
+sys.path.append(os.getcwd())
+
+from async_api import AsyncApiClient, run_async
+from constants import Bears, HTTPCodes
+from fake_alaska import FakeAlaskaServer
+
+# Test data
+batch_size = 50
+
+concurrency = 4
+
+failing_arg = 5
+
+
+@pytest.fixture(scope='class')
+def alaska_url():
+    """fake Alaska service over local HTTP"""
+    with FakeAlaskaServer() as server:
+        yield server.base_url
+
+
+class Calls:
+    """Coroutine function recording calls in flight, fails for failing_arg"""
+
+    def __init__(self):
+        self.started = []
+        self.cancelled = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def __call__(self, arg):
+        self.started.append(arg)
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(0.001 if arg == failing_arg else 0.01 * (arg % 3))
+            if arg == failing_arg:
+                raise ValueError(arg)
+            return arg * 2
+        except asyncio.CancelledError:
+            self.cancelled.append(arg)
+            raise
+        finally:
+            self.in_flight -= 1
+
+
+@allure.feature('AsyncApiClient unit tests')
+class TestAsyncApiClient:
+
+    @allure.feature('Batch results are in argument order with at most concurrency calls in flight')
+    def test_gather_bounded(self) -> None:
+        calls = Calls()
+        args = [arg for arg in range(batch_size) if arg != failing_arg]
+        results = run_async(AsyncApiClient(concurrency=concurrency)._gather(calls, iter(args)))
+        assert results == [arg * 2 for arg in args]
+        assert calls.max_in_flight == concurrency
+
+    @allure.feature('First error cancels the calls in flight and stops starting new ones')
+    def test_gather_cancels_on_error(self) -> None:
+        calls = Calls()
+        consumed = []
+
+        def args():
+            for arg in range(batch_size):
+                consumed.append(arg)
+                yield arg
+
+        with pytest.raises(ValueError):
+            run_async(AsyncApiClient()._gather(calls, args(), concurrency))
+        assert len(consumed) < batch_size
+        assert calls.cancelled and calls.in_flight == 0
+        assert failing_arg not in calls.cancelled
+
+    @allure.feature('Empty batch returns no results')
+    def test_gather_empty(self) -> None:
+        assert run_async(AsyncApiClient()._gather(Calls(), [])) == []
+
+    @allure.feature('Batch helpers create, read, update and delete records over HTTP')
+    def test_batch_helpers(self, alaska_url) -> None:
+        async def crud():
+            async with AsyncApiClient(base_url=alaska_url, concurrency=concurrency) as api:
+                created = await api.create_n_bears(batch_size, Bears.SIMPLE_BEAR_JSON)
+                bear_ids = [resp.json() for resp in created]
+                updates = [(bear_id, dict(Bears.SIMPLE_BEAR_JSON, bear_age=float(index + 1)))
+                           for index, bear_id in enumerate(bear_ids)]
+                updated = await api.put_bears(updates)
+                read = await api.get_bears(bear_ids)
+                deleted = await api.delete_bears(bear_ids)
+                return created + updated + deleted, bear_ids, [resp.json() for resp in read]
+
+        responses, bear_ids, records = run_async(crud())
+        assert all(resp.status_code == HTTPCodes.OK for resp in responses)
+        assert len(set(bear_ids)) == batch_size
+        assert [record['bear_age'] for record in records] == [float(index + 1) for index in range(batch_size)]
+        assert [record['bear_id'] for record in records] == bear_ids
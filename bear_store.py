@@ -0,0 +1,231 @@
+"""Indexed in-memory bear store, storage engine of the fake Alaska service"""
+
+import json
+import os
+import sys
+import threading
+from array import array
+sys.path.append(os.getcwd())
+
+from constants import Bears, BearStoreConstants
+
+TYPE_CODES = {bear_type: code for code, bear_type in enumerate(Bears.TYPES)}
+
+
+class BearStore:
+    """Columnar bear storage.
+
+    Records live in parallel columns (type code, name, age) addressed by a dense slot index:
+    slot = bear_id - first_id, bear_ids are allocated sequentially so lookup, update and delete are O(1).
+    Deleted slots are tombstoned in the alive column. Secondary indexes map bear_type and bear_name to bear_ids
+    """
+
+    def __init__(self):
+        """BearStore init
+
+        :return: None
+        """
+        self._lock = threading.RLock()
+        self._next_id = 1
+        self._reset()
+
+    def _reset(self):
+        # New column objects, so iterators over the previous generation stay consistent
+        self._first_id = self._next_id
+        self._types = bytearray()
+        self._names = []
+        self._ages = array('d')
+        self._alive = bytearray()
+        self._count = 0
+        self._by_type = {bear_type: set() for bear_type in Bears.TYPES}
+        self._by_name = {}
+
+    def __len__(self):
+        return self._count
+
+    @property
+    def next_id(self):
+        """next_id getter
+
+        :return: bear_id of the next created record
+        :rtype: int
+        """
+        return self._next_id
+
+    def _slot(self, bear_id):
+        """Slot of the alive record
+
+        :param bear_id: Bear bear_id
+        :type bear_id: int
+        :return: slot index or None if record does not exist
+        :rtype: int
+        """
+        slot = bear_id - self._first_id
+        if 0 <= slot < len(self._alive) and self._alive[slot]:
+            return slot
+        return None
+
+    def _record(self, slot):
+        return {'bear_type': Bears.TYPES[self._types[slot]],
+                'bear_name': self._names[slot],
+                'bear_age': self._ages[slot],
+                'bear_id': self._first_id + slot}
+
+    def add(self, bear_type, bear_name, bear_age):
+        """Create record
+
+        :param bear_type: Bear bear_type
+        :type bear_type: str
+        :param bear_name: Bear bear_name
+        :type bear_name: str
+        :param bear_age: Bear bear_age
+        :type bear_age: float
+        :return: bear_id of the created record
+        :rtype: int
+        """
+        with self._lock:
+            bear_id = self._next_id
+            self._next_id += 1
+            self._types.append(TYPE_CODES[bear_type])
+            self._names.append(bear_name)
+            self._ages.append(bear_age)
+            self._alive.append(1)
+            self._count += 1
+            self._by_type[bear_type].add(bear_id)
+            self._by_name.setdefault(bear_name, set()).add(bear_id)
+            return bear_id
+
+    def get(self, bear_id):
+        """Get record
+
+        :param bear_id: Bear bear_id
+        :type bear_id: int
+        :return: record or None if record does not exist
+        :rtype: dict
+        """
+        with self._lock:
+            slot = self._slot(bear_id)
+            return None if slot is None else self._record(slot)
+
+    def update(self, bear_id, bear_type=None, bear_name=None, bear_age=None):
+        """Update given fields of the record
+
+        :param bear_id: Bear bear_id
+        :type bear_id: int
+        :return: False if record does not exist
+        :rtype: bool
+        """
+        with self._lock:
+            slot = self._slot(bear_id)
+            if slot is None:
+                return False
+            if bear_type is not None:
+                self._by_type[Bears.TYPES[self._types[slot]]].discard(bear_id)
+                self._by_type[bear_type].add(bear_id)
+                self._types[slot] = TYPE_CODES[bear_type]
+            if bear_name is not None:
+                self._unindex_name(bear_id, slot)
+                self._by_name.setdefault(bear_name, set()).add(bear_id)
+                self._names[slot] = bear_name
+            if bear_age is not None:
+                self._ages[slot] = bear_age
+            return True
+
+    def _unindex_name(self, bear_id, slot):
+        ids = self._by_name[self._names[slot]]
+        ids.discard(bear_id)
+        if not ids:
+            del self._by_name[self._names[slot]]
+
+    def delete(self, bear_id):
+        """Delete record
+
+        :param bear_id: Bear bear_id
+        :type bear_id: int
+        :return: False if record does not exist
+        :rtype: bool
+        """
+        with self._lock:
+            slot = self._slot(bear_id)
+            if slot is None:
+                return False
+            self._by_type[Bears.TYPES[self._types[slot]]].discard(bear_id)
+            self._unindex_name(bear_id, slot)
+            self._alive[slot] = 0
+            self._names[slot] = None
+            self._count -= 1
+            if self._count == 0:
+                self._reset()
+            return True
+
+    def clear(self):
+        """Delete all records, bear_id sequence is not restarted
+
+        :return: None
+        """
+        with self._lock:
+            self._reset()
+
+    def ids_by_type(self, bear_type):
+        """bear_ids of records with bear_type
+
+        :param bear_type: Bear bear_type
+        :type bear_type: str
+        :return: bear_ids
+        :rtype: frozenset
+        """
+        with self._lock:
+            return frozenset(self._by_type.get(bear_type, ()))
+
+    def ids_by_name(self, bear_name):
+        """bear_ids of records with bear_name
+
+        :param bear_name: Bear bear_name as stored (uppercase)
+        :type bear_name: str
+        :return: bear_ids
+        :rtype: frozenset
+        """
+        with self._lock:
+            return frozenset(self._by_name.get(bear_name, ()))
+
+    def __iter__(self):
+        """Iterate over alive records in bear_id order. Records are read under the lock in chunks of
+        BearStoreConstants.CHUNK_RECORDS slots, so a concurrent update is seen whole or not at all.
+        Records created after the iteration started are skipped
+
+        :return: records
+        :rtype: iterator
+        """
+        with self._lock:
+            first_id, types, names, ages, alive = self._first_id, self._types, self._names, self._ages, self._alive
+            end = len(alive)
+        for start in range(0, end, BearStoreConstants.CHUNK_RECORDS):
+            with self._lock:
+                records = [{'bear_type': Bears.TYPES[types[slot]], 'bear_name': names[slot], 'bear_age': ages[slot],
+                            'bear_id': first_id + slot}
+                           for slot in range(start, min(start + BearStoreConstants.CHUNK_RECORDS, end)) if alive[slot]]
+            yield from records
+
+    def iter_json(self, chunk_records=BearStoreConstants.CHUNK_RECORDS):
+        """Serialize all records as JSON array in chunks, without building the whole list
+
+        :param chunk_records: number of records per chunk
+        :type chunk_records: int
+        :return: UTF-8 encoded chunks of the JSON array
+        :rtype: iterator
+        """
+        yield b'['
+        parts = []
+        separator = ''
+        for record in self:
+            parts.append(separator)
+            parts.append('{"bear_type": "%s", "bear_name": %s, "bear_age": %r, "bear_id": %d}'
+                         % (record['bear_type'], json.dumps(record['bear_name']), record['bear_age'],
+                            record['bear_id']))
+            separator = ', '
+            if len(parts) >= 2 * chunk_records:
+                yield ''.join(parts).encode('utf8')
+                parts = []
+        if parts:
+            yield ''.join(parts).encode('utf8')
+        yield b']'
@@ -0,0 +1,138 @@
+"""Unit tests of the indexed in-memory bear store of the fake Alaska service"""
+import json
+import pytest
+import allure
+import os
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+sys.path.append(os.getcwd())
+
+from bear_store import BearStore
+from constants import BearStoreConstants
+
+# Test data
+bears = [('POLAR', 'MIKHAIL', 17.5), ('BROWN', 'TOPTYGIN', 3.0), ('POLAR', 'UMKA', 0.5), ('GUMMY', 'MIKHAIL', 100.0)]
+
+chunk_sizes = [1, 2, 3, 1000]
+
+concurrent_adds = 1000
+
+update_states = [('POLAR', 'UMKA', 1.0), ('BROWN', 'TOPTYGIN', 2.0)]
+
+iterated_records = 2 * BearStoreConstants.CHUNK_RECORDS + 1
+
+
+def store_with(records):
+    store = BearStore()
+    bear_ids = [store.add(*record) for record in records]
+    return store, bear_ids
+
+
+@allure.feature('BearStore unit tests')
+class TestBearStore:
+
+    @allure.feature('Records are created with sequential bear_ids and read back')
+    def test_add_get(self) -> None:
+        store, bear_ids = store_with(bears)
+        assert bear_ids == [1, 2, 3, 4]
+        assert len(store) == len(bears)
+        assert store.next_id == 5
+        assert store.get(1) == {'bear_type': 'POLAR', 'bear_name': 'MIKHAIL', 'bear_age': 17.5, 'bear_id': 1}
+        assert store.get(0) is None and store.get(5) is None
+
+    @allure.feature('Update changes given fields and moves the record between indexes')
+    def test_update(self) -> None:
+        store, _ = store_with(bears)
+        assert store.update(1, bear_type='BLACK', bear_name='BORIS')
+        assert store.get(1) == {'bear_type': 'BLACK', 'bear_name': 'BORIS', 'bear_age': 17.5, 'bear_id': 1}
+        assert store.ids_by_type('POLAR') == {3} and store.ids_by_type('BLACK') == {1}
+        assert store.ids_by_name('MIKHAIL') == {4} and store.ids_by_name('BORIS') == {1}
+        assert store.update(2, bear_age=4.0) and store.get(2)['bear_age'] == 4.0
+        assert not store.update(42, bear_age=1.0)
+
+    @allure.feature('Deleted record is gone from lookups, indexes and iteration')
+    def test_delete(self) -> None:
+        store, _ = store_with(bears)
+        assert store.delete(4)
+        assert not store.delete(4)
+        assert store.get(4) is None
+        assert store.ids_by_type('GUMMY') == frozenset()
+        assert store.ids_by_name('MIKHAIL') == {1}
+        assert [record['bear_id'] for record in store] == [1, 2, 3]
+        assert len(store) == 3
+
+    @allure.feature('bear_id sequence is not restarted when the store becomes empty')
+    def test_sequence_kept_after_empty(self) -> None:
+        store, bear_ids = store_with(bears)
+        for bear_id in bear_ids:
+            store.delete(bear_id)
+        assert len(store) == 0 and list(store) == []
+        assert store.add('BLACK', 'BORIS', 1.0) == 5
+        store.clear()
+        assert store.get(5) is None
+        assert store.add('BLACK', 'BORIS', 1.0) == 6
+        assert store.get(6)['bear_id'] == 6
+
+    @allure.feature('Iteration reads a chunk of records at once and skips records created during it')
+    def test_iteration_during_changes(self) -> None:
+        store, _ = store_with(bears)
+        records = iter(store)
+        assert next(records)['bear_id'] == 1
+        store.add('BLACK', 'BORIS', 1.0)
+        store.delete(3)
+        assert [record['bear_id'] for record in records] == [2, 3, 4]
+        records = iter(store)
+        assert next(records)['bear_id'] == 1
+        store.clear()
+        assert [record['bear_id'] for record in records] == [2, 4, 5]
+
+    @allure.feature('Chunked JSON serialization decodes to the records whatever the chunk size is')
+    @pytest.mark.parametrize('chunk_records', chunk_sizes)
+    def test_iter_json(self, chunk_records) -> None:
+        store, _ = store_with(bears + [('BROWN', 'Ж"\\', 1e-05)])
+        store.delete(2)
+        chunks = list(store.iter_json(chunk_records))
+        assert json.loads(b''.join(chunks).decode('utf8')) == list(store)
+        assert len(chunks) == 2 + -(-len(store) // chunk_records)
+
+    @allure.feature('Empty store serializes to an empty array')
+    def test_iter_json_empty(self) -> None:
+        assert b''.join(BearStore().iter_json()) == b'[]'
+
+    @allure.feature('Concurrent creates get unique bear_ids')
+    def test_concurrent_add(self) -> None:
+        store = BearStore()
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            bear_ids = list(executor.map(lambda index: store.add('POLAR', 'N{0}'.format(index), 1.0),
+                                         range(concurrent_adds)))
+        assert sorted(bear_ids) == list(range(1, concurrent_adds + 1))
+        assert len(store) == concurrent_adds
+        assert len(store.ids_by_type('POLAR')) == concurrent_adds
+
+    @allure.feature('Records iterated during concurrent updates are never torn')
+    def test_iteration_during_updates(self) -> None:
+        store, bear_ids = store_with([update_states[0]] * iterated_records)
+        stop = threading.Event()
+
+        def update():
+            while not stop.is_set():
+                for state in update_states:
+                    for bear_id in bear_ids[::97]:
+                        store.update(bear_id, *state)
+
+        thread = threading.Thread(target=update)
+        switch_interval = sys.getswitchinterval()
+        # Switch threads often, so the updates interleave with reading the records
+        sys.setswitchinterval(1e-6)
+        thread.start()
+        try:
+            for _ in range(50):
+                records = list(store)
+                assert [record['bear_id'] for record in records] == bear_ids
+                assert all((record['bear_type'], record['bear_name'], record['bear_age']) in update_states
+                           for record in records)
+        finally:
+            stop.set()
+            thread.join()
+            sys.setswitchinterval(switch_interval)
@@ -0,0 +1,200 @@
+"""Load and throughput benchmark for Alaska REST API
+
+Usage:
+    python3.6 benchmark.py --mix read --workers 8 --duration 30 --output reports/benchmark.json
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import threading
+import time
+sys.path.append(os.getcwd())
+
+from api import ApiClient, validate_response_code
+from constants import DockerConstants, Bears, HTTPCodes, BenchmarkConstants
+from hooks import summarize
+
+
+class Benchmark:
+    """Closed-loop benchmark runner driving a workload mix with a pool of worker threads"""
+
+    def __init__(self, api, mix, workers, duration, rate=None, seed_size=BenchmarkConstants.SEED_SIZE):
+        """Benchmark init
+
+        :param api: API client shared by workers, its pool size should be >= workers
+        :type api: ApiClient
+        :param mix: operation name -> weight, operation names are keys of BenchmarkConstants.ENDPOINTS
+        :type mix: dict
+        :param workers: number of worker threads
+        :type workers: int
+        :param duration: benchmark duration in seconds
+        :type duration: float
+        :param rate: target total request rate per second, unlimited if None
+        :type rate: float
+        :param seed_size: number of bears created before the run
+        :type seed_size: int
+        :return: None
+        """
+        self._api = api
+        self._operations = list(mix)
+        self._weights = [mix[operation] for operation in self._operations]
+        self._workers = workers
+        self._duration = duration
+        self._rate = rate
+        self._seed_size = seed_size
+        self._bear_ids = []
+        self._seeded = False
+        self._lock = threading.Lock()
+        self._latencies = {operation: [] for operation in self._operations}
+        self._errors = {operation: 0 for operation in self._operations}
+
+    def _random_id(self, rnd):
+        with self._lock:
+            return rnd.choice(self._bear_ids) if self._bear_ids else 0
+
+    def _pop_id(self, rnd):
+        with self._lock:
+            if not self._bear_ids:
+                return 0
+            index = rnd.randrange(len(self._bear_ids))
+            self._bear_ids[index], self._bear_ids[-1] = self._bear_ids[-1], self._bear_ids[index]
+            return self._bear_ids.pop()
+
+    def _call(self, operation, rnd):
+        """Send one request of the operation
+
+        :return: Response object
+        :rtype: requests.models.Response
+        """
+        if operation == 'post_add':
+            resp = self._api.post_add(json=Bears.SIMPLE_BEAR_JSON)
+            if resp.status_code == HTTPCodes.OK:
+                with self._lock:
+                    self._bear_ids.append(resp.json())
+            return resp
+        if operation == 'get_one':
+            return self._api.get_one(bear_id=self._random_id(rnd))
+        if operation == 'put_one':
+            return self._api.put_one(bear_id=self._random_id(rnd), json=Bears.SIMPLE_BEAR_JSON)
+        if operation == 'delete_one':
+            return self._api.delete_one(bear_id=self._pop_id(rnd))
+        return getattr(self._api, operation)()
+
+    def _worker(self, index, start, stop):
+        rnd = random.Random(index)
+        latencies = {operation: [] for operation in self._operations}
+        errors = {operation: 0 for operation in self._operations}
+        interval = self._workers / self._rate if self._rate else 0
+        next_send = start + index * interval / self._workers
+        while True:
+            if interval:
+                delay = next_send - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                next_send += interval
+            if time.perf_counter() >= stop:
+                break
+            operation = rnd.choices(self._operations, self._weights)[0]
+            sent = time.perf_counter()
+            try:
+                resp = self._call(operation, rnd)
+                failed = resp.status_code != HTTPCodes.OK
+            except Exception:
+                # Any failure counts, the worker thread keeps running
+                failed = True
+            latencies[operation].append(time.perf_counter() - sent)
+            errors[operation] += failed
+        with self._lock:
+            for operation in self._operations:
+                self._latencies[operation].extend(latencies[operation])
+                self._errors[operation] += errors[operation]
+
+    def seed(self):
+        """Create seed_size bears used by read, update and delete operations, only once per runner
+
+        :return: None
+        :raises AssertionError: seeding request failed
+        :raises ValueError: the mix reads, updates or deletes bears and there are none to choose from
+        """
+        if self._seeded:
+            return
+        for _ in range(self._seed_size):
+            resp = self._api.post_add(json=Bears.SIMPLE_BEAR_JSON)
+            validate_response_code(resp, HTTPCodes.OK)
+            self._bear_ids.append(resp.json())
+        operations = [operation for operation in self._operations if operation in BenchmarkConstants.ID_OPERATIONS]
+        if operations and not self._bear_ids:
+            raise ValueError('No seeded bears for {0}, seed_size must be positive'.format(', '.join(operations)))
+        self._seeded = True
+
+    def run(self):
+        """Seed the database and run the workload
+
+        :return: benchmark results
+        :rtype: dict
+        """
+        self.seed()
+
+        start = time.perf_counter()
+        stop = start + self._duration
+        threads = [threading.Thread(target=self._worker, args=(index, start, stop), daemon=True)
+                   for index in range(self._workers)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+
+        all_latencies = [latency for values in self._latencies.values() for latency in values]
+        return {
+            'total': summarize(all_latencies, sum(self._errors.values()), elapsed),
+            'endpoints': {BenchmarkConstants.ENDPOINTS[operation]:
+                          summarize(self._latencies[operation], self._errors[operation], elapsed)
+                          for operation in self._operations},
+            'elapsed_s': elapsed,
+        }
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Alaska REST API load benchmark')
+    parser.add_argument('--base-url', default=DockerConstants.BASE_URL)
+    parser.add_argument('--mix', default='crud', choices=sorted(BenchmarkConstants.MIXES))
+    parser.add_argument('--workers', type=int, default=BenchmarkConstants.WORKERS)
+    parser.add_argument('--duration', type=float, default=BenchmarkConstants.DURATION, help='seconds')
+    parser.add_argument('--rate', type=float, default=None, help='target total requests per second')
+    parser.add_argument('--seed-size', type=int, default=BenchmarkConstants.SEED_SIZE)
+    parser.add_argument('--image', default='{0}:{1}'.format(DockerConstants.DOCKER_IMAGE, DockerConstants.DOCKER_TAG),
+                        help='image:tag under test, stored in results for comparison between runs')
+    parser.add_argument('--output', default=BenchmarkConstants.OUTPUT)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    with ApiClient(base_url=args.base_url, pool_size=args.workers) as api:
+        api.delete_all()
+        results = Benchmark(api, BenchmarkConstants.MIXES[args.mix], args.workers, args.duration, args.rate,
+                            args.seed_size).run()
+        api.delete_all()
+    results.update({'image': args.image, 'mix': args.mix, 'workers': args.workers, 'target_rate': args.rate,
+                    'duration_s': args.duration, 'started': time.strftime('%Y-%m-%dT%H:%M:%S')})
+
+    print('{0:<22}{1:>9}{2:>8}{3:>10}{4:>9}{5:>9}{6:>9}{7:>9}'
+          .format('endpoint', 'requests', 'errors', 'rps', 'p50 ms', 'p95 ms', 'p99 ms', 'max ms'))
+    for name, row in sorted(results['endpoints'].items()) + [('TOTAL', results['total'])]:
+        if not row['requests']:
+            continue
+        print('{0:<22}{1[requests]:>9}{1[errors]:>8}{1[throughput_rps]:>10.1f}{1[p50_ms]:>9.2f}{1[p95_ms]:>9.2f}'
+              '{1[p99_ms]:>9.2f}{1[max_ms]:>9.2f}'.format(name, row))
+
+    os.makedirs(os.path.dirname(args.output) or '.', exist_ok=True)
+    with open(args.output, 'w') as file:
+        json.dump(results, file, indent=2)
+    return results
+
+
+if __name__ == '__main__':
+    main()
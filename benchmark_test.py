@@ -0,0 +1,76 @@
+"""Benchmark runner smoke tests against the fake Alaska service over local HTTP"""
+import json
+import pytest
+import allure
+import os
+import sys
+sys.path.append(os.getcwd())
+
+import benchmark
+from api import ApiClient
+from constants import BenchmarkConstants
+from fake_alaska import FakeAlaskaServer
+
+# Test data
+workers = 2
+
+duration = 0.5
+
+seed_size = 10
+
+summary_keys = ['requests', 'errors', 'throughput_rps', 'mean_ms', 'p50_ms', 'p95_ms', 'p99_ms', 'max_ms']
+
+
+@pytest.fixture()
+def alaska_url():
+    """fresh fake service over local HTTP"""
+    with FakeAlaskaServer() as server:
+        yield server.base_url
+
+
+@allure.feature('Benchmark smoke tests')
+class TestBenchmark:
+
+    @allure.feature('Short run reports totals and every endpoint of the mix')
+    @pytest.mark.parametrize('mix', sorted(BenchmarkConstants.MIXES))
+    def test_benchmark_run(self, alaska_url, mix) -> None:
+        with ApiClient(base_url=alaska_url, pool_size=workers) as api:
+            results = benchmark.Benchmark(api, BenchmarkConstants.MIXES[mix], workers, duration,
+                                          seed_size=seed_size).run()
+        assert sorted(results) == ['elapsed_s', 'endpoints', 'total']
+        assert sorted(results['endpoints']) == sorted(BenchmarkConstants.ENDPOINTS[operation]
+                                                      for operation in BenchmarkConstants.MIXES[mix])
+        assert sorted(results['total']) == sorted(summary_keys)
+        assert results['total']['requests'] > 0 and results['total']['errors'] == 0
+
+    @allure.feature('Failed calls are counted as errors of their endpoint and workers keep sending')
+    def test_benchmark_errors_counted(self, alaska_url) -> None:
+        with ApiClient(base_url=alaska_url, pool_size=workers) as api:
+            runner = benchmark.Benchmark(api, {'get_one': 1}, workers, duration, seed_size=seed_size)
+
+            def failing_call(operation, rnd):
+                raise KeyError(operation)
+
+            runner._call = failing_call
+            results = runner.run()
+        endpoint = results['endpoints'][BenchmarkConstants.ENDPOINTS['get_one']]
+        assert endpoint['errors'] == endpoint['requests'] > workers
+
+    @allure.feature('Seeding fails loudly')
+    def test_benchmark_seeding_checked(self, alaska_url) -> None:
+        with ApiClient(base_url=alaska_url) as api:
+            with pytest.raises(ValueError):
+                benchmark.Benchmark(api, {'get_one': 1}, workers, duration, seed_size=0).run()
+        with ApiClient(base_url=alaska_url + '/missing') as api:
+            with pytest.raises(AssertionError):
+                benchmark.Benchmark(api, {'get_one': 1}, workers, duration, seed_size=seed_size).run()
+
+    @allure.feature('Command line run writes the results file')
+    def test_benchmark_main(self, alaska_url, tmp_path) -> None:
+        output = str(tmp_path / 'benchmark.json')
+        benchmark.main(['--base-url', alaska_url, '--mix', 'read', '--workers', str(workers),
+                        '--duration', str(duration), '--seed-size', str(seed_size), '--output', output])
+        with open(output) as file:
+            results = json.load(file)
+        assert {'total', 'endpoints', 'image', 'mix', 'workers', 'duration_s'} <= set(results)
+        assert results['mix'] == 'read' and results['total']['requests'] > 0
@@ -0,0 +1,210 @@
+"""Record/replay transport for ApiClient: HTTP exchanges are recorded to compact cassettes and replayed
+without network or docker"""
+
+import contextlib
+import gzip
+import io
+import json
+import os
+import sys
+from http import HTTPStatus
+import requests
+from requests.adapters import BaseAdapter
+from requests.structures import CaseInsensitiveDict
+sys.path.append(os.getcwd())
+
+
+class UnrecordedRequestError(requests.RequestException):
+    """Request has no recorded response in the cassette"""
+
+
+def _text(body):
+    if body is None:
+        return None
+    return body.decode('utf8', 'surrogateescape') if isinstance(body, bytes) else body
+
+
+def request_key(method, path, content_type, body):
+    """Key the recorded exchanges are matched on: method, path with query, content type and body
+    (JSON bodies are compared regardless of key order and whitespace)
+
+    :rtype: tuple
+    """
+    body = _text(body)
+    if body is not None:
+        try:
+            body = json.dumps(json.loads(body), sort_keys=True, separators=(',', ':'))
+        except ValueError:
+            pass
+    return method, path, content_type, body
+
+
+class Cassette:
+    """Recorded exchanges stored as gzip-compressed JSON lines: [method, path, request content type,
+    request body, status, response content type, response body, context]. The context is the test node id
+    (or class fixture like 'rest_api_test.py::TestAlaska::smoke_check') the exchange was recorded in,
+    exchanges are replayed in recording order within their context, so a cassette recorded in one session
+    is replayed in any test order (--schedule) and with any distribution among pytest-xdist workers"""
+
+    def __init__(self, path):
+        """Cassette init, loads the cassette file when it exists
+
+        :param path: cassette file
+        :type path: str
+        :return: None
+        """
+        self.path = path
+        self.exchanges = []
+        self._replay = {}
+        self._positions = {}
+        self._contexts = ['']
+        if os.path.exists(path):
+            with gzip.open(path, 'rt', encoding='utf8') as file:
+                self.exchanges = [json.loads(line) for line in file]
+        for exchange in self.exchanges:
+            context = exchange[7] if len(exchange) > 7 else ''
+            self._replay.setdefault((context, request_key(*exchange[:4])), []).append(exchange)
+
+    def begin(self, context):
+        """Start the context of a test, its exchanges are replayed from the first one
+
+        :param context: test node id
+        :type context: str
+        :return: None
+        """
+        self._contexts = [context]
+        self._restart(context)
+
+    @contextlib.contextmanager
+    def context(self, context):
+        """Context of a class, module or session fixture within the test context, its exchanges are
+        replayed from the first one whichever test sets the fixture up
+
+        :param context: fixture context like 'rest_api_test.py::TestAlaska::smoke_check'
+        :type context: str
+        """
+        self._contexts.append(context)
+        self._restart(context)
+        try:
+            yield
+        finally:
+            self._contexts.pop()
+
+    def _restart(self, context):
+        for key in [key for key in self._positions if key[0] == context]:
+            del self._positions[key]
+
+    def record(self, method, path, content_type, body, status, response_content_type, response_body):
+        """Append an exchange of the current context
+
+        :return: None
+        """
+        self.exchanges.append([method, path, content_type, _text(body), status, response_content_type,
+                               _text(response_body), self._contexts[-1]])
+
+    def play(self, method, path, content_type, body, strict=True):
+        """Next recorded exchange of the request in the current context. Identical requests get their
+        responses in recording order
+
+        :param strict: fail when all responses of the request were replayed, otherwise repeat the last one
+        :type strict: bool
+        :return: exchange
+        :rtype: list
+        :raises UnrecordedRequestError: request was not recorded
+        """
+        key = (self._contexts[-1], request_key(method, path, content_type, body))
+        exchanges = self._replay.get(key)
+        position = self._positions.get(key, 0)
+        if not exchanges or (strict and position >= len(exchanges)):
+            raise UnrecordedRequestError('Request is not recorded in {0} for {1}: {2} {3} {4}'
+                                         .format(self.path, key[0] or 'session', method, path, _text(body)))
+        self._positions[key] = position + 1
+        return exchanges[min(position, len(exchanges) - 1)]
+
+    def save(self):
+        """Write the cassette file
+
+        :return: None
+        """
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        temporary = self.path + '.tmp'
+        with gzip.open(temporary, 'wt', encoding='utf8') as file:
+            for exchange in self.exchanges:
+                file.write(json.dumps(exchange, separators=(',', ':')) + '\n')
+        os.replace(temporary, self.path)
+
+
+class CassetteAdapter(BaseAdapter):
+    """requests transport adapter recording exchanges of the real transport or replaying them,
+    mount it with ApiClient(transport=...): over HTTP ApiClient binds its own adapter (pool, retries)
+    as the real transport, so the recorded exchanges are the ones of a normal run"""
+
+    def __init__(self, cassette, record=False, strict=True, real=None):
+        """CassetteAdapter init
+
+        :param cassette: cassette to record to or replay from
+        :type cassette: Cassette
+        :param record: send requests through the real transport and record them, replay if False
+        :type record: bool
+        :param strict: replay fails on requests without recorded response, see Cassette.play
+        :type strict: bool
+        :param real: transport of record mode, the HTTP adapter of ApiClient if None (see bind)
+        :type real: requests.adapters.BaseAdapter
+        :return: None
+        """
+        super().__init__()
+        self.cassette = cassette
+        self.record = record
+        self.strict = strict
+        self.real = real
+
+    def bind(self, adapter):
+        """Adapter mounted by ApiClient: recording over HTTP goes through the HTTP adapter of the client
+
+        :param adapter: HTTP adapter of ApiClient
+        :type adapter: requests.adapters.HTTPAdapter
+        :return: adapter sharing the cassette
+        :rtype: CassetteAdapter
+        """
+        if not self.record or self.real is not None:
+            return self
+        return CassetteAdapter(self.cassette, record=True, strict=self.strict, real=adapter)
+
+    def send(self, request, stream=False, timeout=None, verify=True, cert=None, proxies=None):
+        """Send prepared request through the real transport and record it, or replay its response
+
+        :param request: prepared request
+        :type request: requests.PreparedRequest
+        :return: Response object
+        :rtype: requests.models.Response
+        """
+        content_type = request.headers.get('Content-Type')
+        if self.record:
+            if self.real is None:
+                raise ValueError('CassetteAdapter records over HTTP only when mounted by ApiClient(transport=...)')
+            response = self.real.send(request, stream=stream, timeout=timeout, verify=verify, cert=cert,
+                                      proxies=proxies)
+            # Reading the content keeps iter_content working for streamed responses
+            self.cassette.record(request.method, request.path_url, content_type, request.body,
+                                 response.status_code, response.headers.get('Content-Type'), response.content)
+            return response
+
+        status, response_content_type, body = self.cassette.play(
+            request.method, request.path_url, content_type, request.body, self.strict)[4:7]
+        body = body.encode('utf8', 'surrogateescape') if body is not None else b''
+        response = requests.Response()
+        response.status_code = status
+        response.reason = HTTPStatus(status).phrase
+        response.headers = CaseInsensitiveDict({'Content-Length': str(len(body))})
+        if response_content_type is not None:
+            response.headers['Content-Type'] = response_content_type
+        response.raw = io.BytesIO(body)
+        response.encoding = 'utf-8'
+        response.url = request.url
+        response.request = request
+        response.connection = self
+        return response
+
+    def close(self):
+        if self.real is not None:
+            self.real.close()
@@ -0,0 +1,153 @@
+"""Unit tests of cassette record/replay transport of ApiClient"""
+import gzip
+import json
+import pytest
+import allure
+import os
+import requests
+import sys
+sys.path.append(os.getcwd())
+
+from api import ApiClient
+from cassette import Cassette, CassetteAdapter, UnrecordedRequestError, request_key
+from constants import Bears, HTTPCodes
+from fake_alaska import FakeAlaskaAdapter, FakeAlaskaServer
+
+# Test data
+base_url = 'http://alaska.test'
+
+bear_json = Bears.SIMPLE_BEAR_JSON
+
+first_test = 'cassette_test.py::TestRecorded::test_first'
+
+second_test = 'cassette_test.py::TestRecorded::test_second'
+
+class_fixture = 'cassette_test.py::TestRecorded::smoke_check'
+
+
+@pytest.fixture()
+def cassette_path(tmp_path):
+    """cassette file in the test temporary directory"""
+    return str(tmp_path / 'alaska.jsonl.gz')
+
+
+def record(path, contexts):
+    """Record exchanges of the in-process fake service and save the cassette
+
+    :param path: cassette file
+    :param contexts: context -> function sending requests with ApiClient
+    :return: function results by context
+    """
+    cassette = Cassette(path)
+    results = {}
+    with ApiClient(base_url=base_url, transport=CassetteAdapter(cassette, record=True, real=FakeAlaskaAdapter())) \
+            as api:
+        for context, send in contexts.items():
+            cassette.begin(context)
+            results[context] = send(api)
+    cassette.save()
+    return results
+
+
+def replaying(path, strict=True):
+    cassette = Cassette(path)
+    return cassette, ApiClient(base_url=base_url, transport=CassetteAdapter(cassette, strict=strict))
+
+
+def create_and_read(api):
+    bear_id = api.post_add(json=bear_json).json()
+    return [bear_id, api.get_one(bear_id=bear_id).json(), api.get_all().json()]
+
+
+def create_twice(api):
+    return [api.post_add(json=bear_json).json(), len(api.get_all().json()), api.post_add(json=bear_json).json(),
+            len(api.get_all().json())]
+
+
+@allure.feature('Cassette unit tests')
+class TestCassette:
+
+    @allure.feature('Requests are matched regardless of JSON key order and whitespace')
+    def test_request_key(self) -> None:
+        assert request_key('POST', '/bear', 'application/json', b'{"a": 1, "b": [1, 2]}') == \
+            request_key('POST', '/bear', 'application/json', '{"b":[1,2],"a":1}')
+        assert request_key('POST', '/bear', None, b'not json')[3] == 'not json'
+        assert request_key('GET', '/bear', None, None)[3] is None
+
+    @allure.feature('Recorded session is replayed with the same responses')
+    def test_record_replay(self, cassette_path) -> None:
+        recorded = record(cassette_path, {first_test: create_and_read})
+        cassette, api = replaying(cassette_path)
+        with api:
+            cassette.begin(first_test)
+            assert create_and_read(api) == recorded[first_test]
+            with pytest.raises(UnrecordedRequestError):
+                api.get_info()
+
+    @allure.feature('Identical requests get their responses in recording order, strictly or repeating the last')
+    @pytest.mark.parametrize('strict', [True, False])
+    def test_identical_requests(self, cassette_path, strict) -> None:
+        recorded = record(cassette_path, {first_test: create_twice})
+        cassette, api = replaying(cassette_path, strict)
+        with api:
+            cassette.begin(first_test)
+            assert create_twice(api) == recorded[first_test]
+            if strict:
+                with pytest.raises(UnrecordedRequestError):
+                    api.post_add(json=bear_json)
+            else:
+                assert api.post_add(json=bear_json).json() == recorded[first_test][-1]
+
+    @allure.feature('Tests are replayed in any order and a test replays from its first exchange again')
+    def test_replay_any_order(self, cassette_path) -> None:
+        recorded = record(cassette_path, {first_test: create_and_read, second_test: create_and_read})
+        cassette, api = replaying(cassette_path)
+        with api:
+            cassette.begin(second_test)
+            assert create_and_read(api) == recorded[second_test]
+            cassette.begin(first_test)
+            assert create_and_read(api) == recorded[first_test]
+            cassette.begin(second_test)
+            assert create_and_read(api) == recorded[second_test]
+
+    @allure.feature('Class fixture exchanges are replayed whichever test sets the fixture up')
+    def test_fixture_context(self, cassette_path) -> None:
+        cassette = Cassette(cassette_path)
+        with ApiClient(base_url=base_url, transport=CassetteAdapter(cassette, record=True, real=FakeAlaskaAdapter())) \
+                as api:
+            cassette.begin(first_test)
+            with cassette.context(class_fixture):
+                fixture_bear_id = api.post_add(json=bear_json).json()
+            test_bear_id = api.post_add(json=bear_json).json()
+        cassette.save()
+        assert [exchange[7] for exchange in cassette.exchanges] == [class_fixture, first_test]
+
+        cassette, api = replaying(cassette_path)
+        with api:
+            cassette.begin(second_test)
+            with cassette.context(class_fixture):
+                assert api.post_add(json=bear_json).json() == fixture_bear_id
+            with pytest.raises(UnrecordedRequestError):
+                api.post_add(json=bear_json)
+            cassette.begin(first_test)
+            assert api.post_add(json=bear_json).json() == test_bear_id
+
+    @allure.feature('Cassette without contexts is replayed as one session')
+    def test_cassette_without_contexts(self, cassette_path) -> None:
+        with gzip.open(cassette_path, 'wt', encoding='utf8') as file:
+            file.write(json.dumps(['GET', '/info', None, None, HTTPCodes.OK, 'text/html', 'Welcome']) + '\n')
+        cassette, api = replaying(cassette_path)
+        with api:
+            resp = api.get_info()
+        assert (resp.status_code, resp.text, resp.headers['Content-Type']) == (HTTPCodes.OK, 'Welcome', 'text/html')
+
+    @allure.feature('Recording over HTTP goes through the adapter of ApiClient')
+    def test_record_over_http(self, cassette_path) -> None:
+        cassette = Cassette(cassette_path)
+        adapter = CassetteAdapter(cassette, record=True)
+        with pytest.raises(ValueError):
+            adapter.send(requests.Request('GET', base_url + '/info').prepare())
+        assert CassetteAdapter(cassette).bind(object()).real is None
+        with FakeAlaskaServer() as server, ApiClient(base_url=server.base_url, transport=adapter) as api:
+            assert api.get_info().status_code == HTTPCodes.OK
+        assert [exchange[:2] for exchange in cassette.exchanges] == [['GET', '/info']]
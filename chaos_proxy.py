@@ -0,0 +1,334 @@
+"""Chaos proxy: local HTTP proxy between ApiClient and the service under test injecting latency, jitter,
+bandwidth limits, connection resets and partial responses per endpoint
+
+    python3.6 chaos_proxy.py http://127.0.0.1:8091 --port 8092 --endpoint "GET /bear" --latency 0.5 --jitter 0.1
+"""
+
+import argparse
+import http.client
+import http.server
+import os
+import random
+import socket
+import struct
+import sys
+import threading
+import time
+from urllib.parse import urlsplit
+sys.path.append(os.getcwd())
+
+from constants import ApiConstants, ChaosConstants
+from fake_alaska import ThreadingHTTPServer
+
+
+def endpoint_of(method, path):
+    """Endpoint of a request, the same as instrumentation.RequestEvent.endpoint
+
+    :param method: HTTP method
+    :type method: str
+    :param path: request path with query
+    :type path: str
+    :return: method and path template like 'GET /bear/{bear_id}'
+    :rtype: str
+    """
+    path = path.split('?', 1)[0]
+    if path.startswith(ApiConstants.GET_ONE_PATH) and len(path) > len(ApiConstants.GET_ONE_PATH):
+        path = ApiConstants.GET_ONE_PATH + '{bear_id}'
+    return '{0} {1}'.format(method, path)
+
+
+class Fault:
+    """Faults injected into responses of an endpoint"""
+
+    __slots__ = ('latency', 'jitter', 'bandwidth', 'reset', 'partial', 'times', 'before_forward')
+
+    def __init__(self, latency=0.0, jitter=0.0, bandwidth=None, reset=0.0, partial=0.0, times=None,
+                 before_forward=False):
+        """Fault init
+
+        :param latency: seconds added before the response
+        :type latency: float
+        :param jitter: maximum random seconds added to latency
+        :type jitter: float
+        :param bandwidth: response bytes per second, unlimited if None
+        :type bandwidth: float
+        :param reset: probability of resetting the connection (TCP RST) instead of responding
+        :type reset: float
+        :param partial: probability of sending headers and half of the body, then closing the connection
+        :type partial: float
+        :param times: number of requests the fault applies to, every request if None
+        :type times: int
+        :param before_forward: inject latency and reset before the request is forwarded, so a reset request
+            is not processed by the service; by default they are injected after the service has processed it
+            (a reset POST /bear has created its bear)
+        :type before_forward: bool
+        :return: None
+        """
+        self.latency = latency
+        self.jitter = jitter
+        self.bandwidth = bandwidth
+        self.reset = reset
+        self.partial = partial
+        self.times = times
+        self.before_forward = before_forward
+
+
+class _ChaosHandler(http.server.BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+
+    def setup(self):
+        super().setup()
+        self._upstream = None
+
+    def finish(self):
+        super().finish()
+        if self._upstream is not None:
+            self._upstream.close()
+
+    def _forward(self, body):
+        """Send request upstream over the keep-alive connection of this client connection
+
+        :return: status, reason, headers and body of the upstream response
+        :rtype: tuple
+        """
+        proxy = self.server.proxy
+        headers = {name: value for name, value in self.headers.items()
+                   if name.lower() not in ('host', 'connection', 'keep-alive')}
+        while True:
+            reused = self._upstream is not None
+            if not reused:
+                self._upstream = http.client.HTTPConnection(proxy.upstream_host, proxy.upstream_port,
+                                                            timeout=ChaosConstants.UPSTREAM_TIMEOUT)
+            try:
+                self._upstream.request(self.command, self.path, body=body, headers=headers)
+                response = self._upstream.getresponse()
+                return response.status, response.reason, response.getheaders(), response.read()
+            except (http.client.HTTPException, OSError):
+                # Upstream may have closed the idle keep-alive connection, reconnect once
+                self._upstream.close()
+                self._upstream = None
+                if not reused:
+                    raise
+
+    def _reset(self):
+        self.connection.setsockopt(socket.SOL_SOCKET, socket.SO_LINGER, struct.pack('ii', 1, 0))
+        self.connection.close()
+        self.close_connection = True
+
+    def _inject(self, fault, endpoint):
+        """Inject latency and reset of the fault
+
+        :return: True if the connection was reset
+        :rtype: bool
+        """
+        proxy = self.server.proxy
+        delay = fault.latency + (proxy.random() * fault.jitter if fault.jitter else 0.0)
+        if delay:
+            time.sleep(delay)
+        if fault.reset and proxy.random() < fault.reset:
+            proxy.count(endpoint, 'reset')
+            self._reset()
+            return True
+        return False
+
+    def _handle(self):
+        proxy = self.server.proxy
+        length = int(self.headers.get('Content-Length') or 0)
+        body = self.rfile.read(length) if length else None
+        endpoint = endpoint_of(self.command, self.path)
+        fault = proxy.take_fault(endpoint)
+        if fault is not None and fault.before_forward and self._inject(fault, endpoint):
+            return
+        try:
+            status, reason, headers, payload = self._forward(body)
+        except (http.client.HTTPException, OSError):
+            self.send_error(502)
+            return
+        if fault is not None and not fault.before_forward and self._inject(fault, endpoint):
+            return
+
+        self.send_response(status, reason)
+        for name, value in headers:
+            if name.lower() not in ('content-length', 'transfer-encoding', 'connection', 'keep-alive', 'date',
+                                    'server'):
+                self.send_header(name, value)
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+
+        if fault is not None and fault.partial and proxy.random() < fault.partial:
+            proxy.count(endpoint, 'partial')
+            self.wfile.write(payload[:len(payload) // 2])
+            self.close_connection = True
+            return
+        try:
+            if fault is not None and fault.bandwidth:
+                size = max(int(fault.bandwidth / ChaosConstants.BANDWIDTH_SLICES), 1)
+                for start in range(0, len(payload), size):
+                    self.wfile.write(payload[start:start + size])
+                    time.sleep(size / fault.bandwidth)
+            else:
+                self.wfile.write(payload)
+        except ConnectionError:
+            # Client gave up, e.g. on its read timeout
+            self.close_connection = True
+
+    do_GET = do_POST = do_PUT = do_DELETE = _handle
+
+    def log_message(self, format, *args):
+        pass
+
+
+class ChaosProxy:
+    """HTTP proxy to upstream base URL injecting faults configured per endpoint ('METHOD /path' like
+    'GET /bear/{bear_id}', ChaosConstants.ANY for every endpoint without its own fault)"""
+
+    def __init__(self, upstream_url, host=ChaosConstants.HOST, port=0, faults=None, seed=None):
+        """ChaosProxy init
+
+        :param upstream_url: base URL of the service under test
+        :type upstream_url: str
+        :param host: host IP
+        :type host: str
+        :param port: TCP port, any free port if 0
+        :type port: int
+        :param faults: endpoint -> Fault
+        :type faults: dict
+        :param seed: random seed of jitter and fault probabilities
+        :type seed: int
+        :return: None
+        """
+        upstream = urlsplit(upstream_url)
+        self.upstream_host = upstream.hostname
+        self.upstream_port = upstream.port or 80
+        self._faults = dict(faults or {})
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.injected = {}
+        self._server = ThreadingHTTPServer((host, port), _ChaosHandler)
+        self._server.proxy = self
+        self._thread = threading.Thread(target=self._server.serve_forever, args=(ChaosConstants.POLL_INTERVAL,),
+                                        daemon=True)
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+    @property
+    def base_url(self):
+        """base_url getter
+
+        :return: base URL of the proxy for ApiClient
+        :rtype: str
+        """
+        host, port = self._server.server_address[:2]
+        return 'http://{0}:{1}'.format(host, port)
+
+    def set_fault(self, endpoint, fault):
+        """Inject fault into responses of the endpoint
+
+        :param endpoint: 'METHOD /path' or ChaosConstants.ANY
+        :type endpoint: str
+        :param fault: fault, None removes the fault of the endpoint
+        :type fault: Fault
+        :return: None
+        """
+        with self._lock:
+            if fault is None:
+                self._faults.pop(endpoint, None)
+            else:
+                self._faults[endpoint] = fault
+
+    def clear(self):
+        """Remove all faults and counters
+
+        :return: None
+        """
+        with self._lock:
+            self._faults.clear()
+            self.injected.clear()
+
+    def take_fault(self, endpoint):
+        """Fault of the next request of the endpoint, its remaining times are decreased
+
+        :rtype: Fault
+        """
+        with self._lock:
+            fault = self._faults.get(endpoint, self._faults.get(ChaosConstants.ANY))
+            if fault is None or fault.times == 0:
+                return None
+            if fault.times is not None:
+                fault.times -= 1
+            return fault
+
+    def random(self):
+        with self._lock:
+            return self._random.random()
+
+    def count(self, endpoint, kind):
+        """Count injected fault by kind and by kind and endpoint, like 'reset' and 'reset GET /info'
+
+        :return: None
+        """
+        with self._lock:
+            for key in (kind, '{0} {1}'.format(kind, endpoint)):
+                self.injected[key] = self.injected.get(key, 0) + 1
+
+    def serve_forever(self):
+        """Serve in current thread until interrupted
+
+        :return: None
+        """
+        try:
+            self._server.serve_forever(ChaosConstants.POLL_INTERVAL)
+        finally:
+            self._server.server_close()
+
+    def start(self):
+        """Start serving in background thread
+
+        :return: None
+        """
+        self._thread.start()
+
+    def stop(self):
+        """Stop serving and close socket
+
+        :return: None
+        """
+        self._server.shutdown()
+        self._thread.join()
+        self._server.server_close()
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Chaos proxy for Alaska REST API')
+    parser.add_argument('upstream', help='base URL of the service under test')
+    parser.add_argument('--host', default=ChaosConstants.HOST)
+    parser.add_argument('--port', type=int, default=ChaosConstants.PORT)
+    parser.add_argument('--endpoint', default=ChaosConstants.ANY, help='"METHOD /path" to inject faults into')
+    parser.add_argument('--latency', type=float, default=0.0, help='seconds')
+    parser.add_argument('--jitter', type=float, default=0.0, help='seconds')
+    parser.add_argument('--bandwidth', type=float, default=None, help='response bytes per second')
+    parser.add_argument('--reset', type=float, default=0.0, help='connection reset probability')
+    parser.add_argument('--partial', type=float, default=0.0, help='partial response probability')
+    parser.add_argument('--before-forward', action='store_true', default=False,
+                        help='inject latency and reset before forwarding, reset requests are not processed')
+    parser.add_argument('--seed', type=int, default=None)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    fault = Fault(args.latency, args.jitter, args.bandwidth, args.reset, args.partial,
+                  before_forward=args.before_forward)
+    proxy = ChaosProxy(args.upstream, args.host, args.port, {args.endpoint: fault}, args.seed)
+    print('Chaos proxy to {0} is serving on {1}'.format(args.upstream, proxy.base_url))
+    proxy.serve_forever()
+
+
+if __name__ == '__main__':
+    main()
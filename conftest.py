@@ -1,22 +1,53 @@
 """Fixtures for tests"""
 
+import contextlib
 import os
 import sys
 sys.path.append(os.getcwd())
 
-import docker
-import time
-import requests
-from socket import create_connection
-from constants import DockerConstants
+# docker, aiohttp, loguru, allure and the fake services are imported by the fixtures using them,
+# so that --collect-only and single test reruns do not pay for them
+from constants import DockerConstants, HTTPCodes, FakeAlaskaConstants, CassetteConstants
+from hooks import LatencyHistogram, LoguruHook, AllureHook
 import pytest
-from logger import set_common_logger, create_test_logger
+from logger import set_common_logger, create_test_logger, close_test_logger, close_all_loggers
+
+pytest_plugins = ['perf_gate', 'scheduler']
+
+
+def get_worker_id():
+    """pytest-xdist worker id
+
+    :return: worker id like 'gw0', 'master' when tests are not distributed
+    :rtype: str
+    """
+    return os.getenv('PYTEST_XDIST_WORKER', 'master')
+
+
+def pytest_addoption(parser):
+    parser.addoption('--reuse-container', action='store_true', default=False,
+                     help='attach to a running container of the tested image and keep it running after the session')
+    parser.addoption('--alaska', default=os.getenv('ALASKA_BACKEND', 'docker'), choices=FakeAlaskaConstants.BACKENDS,
+                     help='service under test: docker container, in-process fake or fake served over local HTTP')
+    parser.addoption('--cassette', default=None,
+                     help='cassette file (.jsonl.gz) of ApiClient exchanges, recorded without -n, replayed in any '
+                          'test order and with -n')
+    parser.addoption('--cassette-mode', default='replay', choices=CassetteConstants.MODES,
+                     help='record exchanges with the service under test or replay them without network and docker')
+    parser.addoption('--cassette-lenient', action='store_true', default=False,
+                     help='replay the last recorded response of repeated requests instead of failing')
+    parser.addoption('--api-trace', action='store_true', default=False,
+                     help='log every ApiClient call and attach it to the allure report')
 
 
 @pytest.fixture(scope='session', autouse=False)
-def use_docker(image=DockerConstants.DOCKER_IMAGE, tag=DockerConstants.DOCKER_TAG, host=DockerConstants.HOST,
+def use_docker(request, image=DockerConstants.DOCKER_IMAGE, tag=DockerConstants.DOCKER_TAG, host=DockerConstants.HOST,
                port=DockerConstants.PORT, timeout=DockerConstants.CONNECT_TIMEOUT):
-    """Fixture that runs docker container on start and stops upon completion a session
+    """Fixture that runs docker container on start and stops upon completion a session.
+    Every pytest-xdist worker runs its own container published on a port allocated by docker,
+    without xdist the container is published on the fixed port.
+    With --reuse-container (or ALASKA_REUSE_CONTAINER=1) a running container of the same image:tag
+    is reused with its database cleared, and the container is left running for the next session
 
     :param image: docker image
     :type image: str
@@ -28,44 +59,168 @@ def use_docker(image=DockerConstants.DOCKER_IMAGE, tag=DockerConstants.DOCKER_TA
     :type port: int
     :param timeout: connection timeout
     :type timeout: int
-    :return: None
+    :return: base URL of the container
+    :rtype: str
     """
+    import docker
+    from api import ApiClient, validate_response_code
+    from docker_utils import get_host_port, wait_for_container, find_running_container
+
+    worker_id = get_worker_id()
+    reuse = request.config.getoption('--reuse-container') or os.getenv('ALASKA_REUSE_CONTAINER') == '1'
     run_kwargs = {
         "image": "{0}:{1}".format(image, tag),
         "detach": True,
         "tty": True,
-        "ports": {port: port},
+        "ports": {port: port if worker_id == 'master' else None},
+        "labels": {DockerConstants.WORKER_LABEL: worker_id},
     }
 
     client = docker.from_env()
-    container = client.containers.run(**run_kwargs)
-
-    start_time = time.perf_counter()
-    while True:
-        try:
-            with create_connection((host, port), timeout=timeout):
-                response = requests.get("http://{0}:{1}/info".format(host, port))
-                if response.status_code == 200:
-                    break
-        except (OSError, ConnectionResetError) as ex:
-            time.sleep(0.1)
-            if time.perf_counter() - start_time >= timeout:
-                raise TimeoutError('Waited too long for the http://{0}:{1} to start accepting connections.'
-                                   .format(host, port))
+    container = find_running_container(client, run_kwargs['image'], worker_id) if reuse else None
+    reused = container is not None
+    if not reused:
+        container = client.containers.run(**run_kwargs)
+    base_url = "http://{0}:{1}".format(host, get_host_port(container, port))
+    wait_for_container(container, base_url, timeout)
+    if reused:
+        with ApiClient(base_url=base_url) as api:
+            validate_response_code(api.delete_all(), HTTPCodes.OK)
 
-    yield
+    yield base_url
+
+    if not reuse:
+        container.stop()
+        container.remove()
+
+
+@pytest.fixture(scope='session')
+def alaska(request):
+    """Fixture that provides Alaska service selected by --alaska option,
+    or the cassette of --cassette option in replay mode (recorded in record mode)
+
+    :return: base URL and transport adapter for ApiClient (None for HTTP)
+    :rtype: tuple
+    """
+    from cassette import CassetteAdapter
+    from fake_alaska import FakeAlaska, FakeAlaskaAdapter, FakeAlaskaServer
+
+    config = request.config
+    cassette = config.cassette
+    if cassette is not None and config.getoption('--cassette-mode') == 'replay':
+        strict = not config.getoption('--cassette-lenient')
+        yield CassetteConstants.BASE_URL, CassetteAdapter(cassette, strict=strict)
+        return
+
+    backend = config.getoption('--alaska')
+    with contextlib.ExitStack() as stack:
+        if backend == 'docker':
+            base_url, transport = request.getfixturevalue('use_docker'), None
+        elif backend == 'fake':
+            base_url, transport = FakeAlaskaConstants.BASE_URL, FakeAlaskaAdapter(FakeAlaska())
+        else:
+            base_url, transport = stack.enter_context(FakeAlaskaServer()).base_url, None
+        if cassette is not None:
+            cassette.exchanges = []
+            transport = CassetteAdapter(cassette, record=True, real=transport)
+            stack.callback(cassette.save)
+        yield base_url, transport
+
+
+@pytest.fixture()
+def chaos_proxy(alaska):
+    """Fixture that runs a chaos proxy in front of the service under test, the in-process fake
+    is served over local HTTP for it. Faults are set by the test with ChaosProxy.set_fault
+
+    :return: proxy, its base_url is used for ApiClient
+    :rtype: ChaosProxy
+    """
+    from chaos_proxy import ChaosProxy
+    from fake_alaska import FakeAlaskaAdapter, FakeAlaskaServer
+
+    base_url, transport = alaska
+    with contextlib.ExitStack() as stack:
+        if isinstance(transport, FakeAlaskaAdapter):
+            base_url = stack.enter_context(FakeAlaskaServer(app=transport.app)).base_url
+        elif transport is not None:
+            pytest.skip('chaos proxy needs a service served over HTTP')
+        yield stack.enter_context(ChaosProxy(base_url))
+
+
+@pytest.fixture(scope='session')
+def api_hooks(request):
+    """Instrumentation hooks to register on every ApiClient of the session
+
+    :return: hooks, the first one is the session LatencyHistogram
+    :rtype: list
+    """
+    hooks = [request.config.api_latency]
+    if request.config.getoption('--api-trace'):
+        hooks.extend([LoguruHook(), AllureHook()])
+    return hooks
+
+
+def pytest_sessionfinish(session):
+    config = session.config
+    if hasattr(config, 'workerinput'):
+        # pytest-xdist worker: the controller merges the latencies in pytest_testnodedown
+        config.workeroutput['api_latency'] = config.api_latency.latencies()
+        config.workeroutput['api_errors'] = config.api_latency.errors()
+
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_testnodedown(node, error):
+    output = getattr(node, 'workeroutput', {})
+    node.config.api_latency.merge(output.get('api_latency', {}), output.get('api_errors', {}))
 
-    container.stop()
-    container.remove()
 
+def pytest_terminal_summary(terminalreporter, config):
+    if config.api_latency:
+        terminalreporter.write_sep('=', 'ApiClient latency per endpoint')
+        terminalreporter.write_line(config.api_latency.format_summary())
 
-def pytest_configure():
+
+def pytest_configure(config):
+    config.api_latency = LatencyHistogram()
+    config.cassette = None
+    path = config.getoption('--cassette')
+    if path is not None:
+        from cassette import Cassette
+
+        if config.getoption('--cassette-mode') == 'record' and config.getoption('dist', 'no') != 'no':
+            # exchanges of a test depend on the state the preceding tests left on its worker
+            raise pytest.UsageError('--cassette-mode record needs one consistent session, run it without -n')
+        config.cassette = Cassette(path)
+
+
+def pytest_runtest_setup(item):
+    if item.config.cassette is not None:
+        item.config.cassette.begin(item.nodeid)
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_fixture_setup(fixturedef, request):
+    cassette = request.config.cassette
+    if cassette is None or fixturedef.scope == 'function':
+        yield
+        return
+    # exchanges of a class fixture are replayed whichever test of the class sets it up
+    with cassette.context('{0}::{1}'.format(request.node.nodeid, fixturedef.argname)):
+        yield
+
+
+@pytest.fixture(scope='session', autouse=True)
+def common_logger():
+    """Console and file log sinks, set up when the first test runs (not for --collect-only)"""
     # Set console log level for a project
     console_log_lvl = os.getenv('CONSOLE_LOG_LEVEL', 'INFO')
     set_common_logger(console_level=console_log_lvl)
+    yield
+    close_all_loggers()
 
 
 @pytest.fixture(autouse=True)
 def logger(request):
-    """Instance of test logger which will be created for each test"""
+    """Instance of test logger which will be created for each test, its log file is closed on teardown"""
     yield create_test_logger(request.node.name)
+    close_test_logger(request.node.name)
@@ -8,7 +8,11 @@ class DockerConstants:
     HOST = '0.0.0.0'
     PORT = 8091
     CONNECT_TIMEOUT = 60
+    PROBE_TIMEOUT = 1
+    BACKOFF_START = 0.01
+    BACKOFF_MAX = 1.0
     BASE_URL = "http://{0}:{1}".format(HOST, PORT)
+    WORKER_LABEL = 'alaska.worker'
 
 
 class ApiConstants:
@@ -20,11 +24,79 @@ class ApiConstants:
     PUT_ONE_PATH = '/bear/'
     DELETE_ONE_PATH = '/bear/'
     DELETE_ALL_PATH = '/bear'
+    STREAM_CHUNK_SIZE = 64 * 1024
+
+
+class SessionConstants:
+    """HTTP session constants"""
+    POOL_SIZE = 10
+    RETRIES = 3
+    BACKOFF_FACTOR = 0.1
+    TIMEOUT = (3.05, 30)
+
+
+class AsyncConstants:
+    """asyncio API constants"""
+    CONCURRENCY = 100
+
+
+class FakeAlaskaConstants:
+    """Fake Alaska service constants"""
+    BACKENDS = ('docker', 'fake', 'fake-http')
+    HOST = '127.0.0.1'
+    PORT = 8091
+    BASE_URL = 'http://alaska.fake'
+    INFO = 'Welcome to Alaska! This is CRUD service for bears in alaska.'
+
+
+class CassetteConstants:
+    """Record/replay cassette constants"""
+    MODES = ('record', 'replay')
+    BASE_URL = 'http://alaska.cassette'
+
+
+class ChaosConstants:
+    """Chaos proxy constants"""
+    HOST = '127.0.0.1'
+    PORT = 8092
+    ANY = '*'
+    BANDWIDTH_SLICES = 20
+    UPSTREAM_TIMEOUT = 60
+    POLL_INTERVAL = 0.05
+
+
+class BearStoreConstants:
+    """Bear store constants"""
+    CHUNK_RECORDS = 1000
+
+
+class BenchmarkConstants:
+    """Benchmark constants"""
+    WORKERS = 4
+    DURATION = 30
+    SEED_SIZE = 100
+    OUTPUT = 'reports/benchmark.json'
+    ENDPOINTS = {'post_add': 'POST /bear',
+                 'get_info': 'GET /info',
+                 'get_one': 'GET /bear/{bear_id}',
+                 'get_all': 'GET /bear',
+                 'put_one': 'PUT /bear/{bear_id}',
+                 'delete_one': 'DELETE /bear/{bear_id}'}
+    ID_OPERATIONS = ('get_one', 'put_one', 'delete_one')
+    MIXES = {'read': {'get_one': 80, 'get_all': 5, 'get_info': 5, 'post_add': 10},
+             'write': {'post_add': 50, 'put_one': 30, 'delete_one': 10, 'get_one': 10},
+             'crud': {'post_add': 25, 'get_one': 40, 'put_one': 20, 'delete_one': 10, 'get_all': 5}}
 
 
 class Bears:
     """Bear constants"""
     GET_ALL_EMPTY_RESPONSE = 'EMPTY'
+    FIELDS = ('bear_type', 'bear_name', 'bear_age')
+    TYPES = ('POLAR', 'BROWN', 'BLACK', 'GUMMY')
+    NAME_MIN_LENGTH = 1
+    NAME_MAX_LENGTH = 10
+    AGE_MIN = 0
+    AGE_MAX = 100
     SIMPLE_BEAR_JSON = {'bear_type': 'BLACK',
                         'bear_name': 'BOB',
                         'bear_age': 10.0}
@@ -35,3 +107,81 @@ class HTTPCodes:
     BAD_REQUEST = 400
     NOT_FOUND = 404
     INTERNAL_SERVER_ERROR = 500
+
+
+class PairwiseConstants:
+    """Combinatorial test data constants"""
+    ENV = 'TEST_MATRIX'
+    DEFAULT_MODE = 'pairwise'
+    SEED = 0
+    MAX_EXHAUSTIVE = 10000
+    CANDIDATES = 50
+
+
+class PerfConstants:
+    """Performance regression gate constants"""
+    BASELINE_DIR = 'perf_baselines'
+    BASELINE_RUNS = 5
+    MIN_RUNS = 3
+    MIN_SAMPLES = 20
+    THRESHOLD = 0.2
+    ALPHA = 0.01
+    Z_SCORE = 3.0
+    MIN_DURATION_DELTA = 0.005
+    REPORT = 'reports/perf_gate.json'
+
+
+class SoakConstants:
+    """Soak run constants"""
+    DURATION = 4 * 60 * 60
+    INTERVAL = 60
+    RATE = 100
+    OUTPUT = 'reports/soak.jsonl'
+    SUMMARY = 'reports/soak_summary.json'
+
+
+class HistogramConstants:
+    """HDR-style latency histogram constants, values are recorded in microseconds up to 60 seconds"""
+    LOWEST = 1
+    HIGHEST = 60 * 1000 * 1000
+    SIGNIFICANT_FIGURES = 3
+    UNIT = 1e-6
+
+
+class LoadConstants:
+    """Open-loop load generator constants"""
+    WORKLOAD = 'post_add'
+    CONCURRENCY = 64
+    RATE = 100
+    DURATION = 60
+    START_RATE = 50
+    END_RATE = 1000
+    STEPS = 10
+    STEP_DURATION = 30
+    SLO_P99_MS = 100
+    THROUGHPUT_TOLERANCE = 0.1
+    MAX_ERROR_RATE = 0.01
+    START_DELAY = 1.0
+    OUTPUT = 'reports/load.json'
+
+
+class StartupConstants:
+    """Test harness startup time benchmark constants"""
+    MODULES = ('conftest', 'rest_api_test', 'resilience_test', 'stress_test', 'test_test')
+    BUDGETS_MS = {'conftest': 30, 'rest_api_test': 200, 'collect_only': 1000}
+    RUNS = 5
+    TOP_IMPORTS = 10
+    OUTPUT = 'reports/startup.json'
+    MIN_PYTHON = (3, 7)
+
+
+class SchedulerConstants:
+    """Duration history test scheduler constants"""
+    HISTORY = 'perf_baselines/durations.json'
+    SMOOTHING = 0.5
+    DEFAULT_DURATION = 0.01
+    SMOKE_MARKER = 'smoke'
+    SMOKE_FIXTURES = ('smoke_check',)
+    SHARED_SCOPES = ('class', 'module', 'package')
+    XDIST_VERSIONS = ((2, 1), (4, 0))
+    TOP_FIXTURES = 5
@@ -0,0 +1,68 @@
+"""pytest-xdist scheduler of scheduler.py, imported by --schedule runs with -n only
+
+CostScheduling subclasses LoadScopeScheduling and relies on its internals (workqueue, assigned_work,
+registered_collections, _split_scope, _assign_work_unit, _reschedule, _pending_of), they are the same
+in the pinned pytest-xdist==2.1.0 and up to 3.x; other versions are checked by scheduler.py against
+SchedulerConstants.XDIST_VERSIONS and fall back to the --dist scheduling
+"""
+
+import os
+import re
+import sys
+import xdist
+from xdist.scheduler import LoadScopeScheduling
+sys.path.append(os.getcwd())
+
+from scheduler import plan_units
+
+
+def xdist_version():
+    """Installed pytest-xdist version
+
+    :return: (major, minor)
+    :rtype: tuple
+    """
+    return tuple(int(part) for part in re.findall(r'\d+', xdist.__version__)[:2])
+
+
+class CostScheduling(LoadScopeScheduling):
+    """pytest-xdist scheduler handing work units of plan_units to the first idle worker in their order,
+    greedy longest-processing-time-first balancing of the expected durations"""
+
+    def __init__(self, config, log, history):
+        """CostScheduling init
+
+        :param config: pytest config
+        :param log: pytest-xdist log producer
+        :param history: duration history
+        :type history: DurationHistory
+        :return: None
+        """
+        super().__init__(config, log)
+        self.history = history
+        self.unit_of = {}
+        self.rank = {}
+        self.costs = {}
+        self.loads = {}
+
+    def _split_scope(self, nodeid):
+        return self.unit_of.get(nodeid) or super()._split_scope(nodeid)
+
+    def _assign_work_unit(self, node):
+        unit = min(self.workqueue, key=lambda name: self.rank.get(name, len(self.rank)))
+        self.workqueue.move_to_end(unit, last=False)
+        self.loads[node.gateway.id] = self.loads.get(node.gateway.id, 0.0) + self.costs.get(unit, 0.0)
+        super()._assign_work_unit(node)
+
+    def _reschedule(self, node):
+        # the next unit goes to the worker running its last test, not prefetched by the number of pending tests
+        if not node.shutting_down and self.workqueue and self._pending_of(self.assigned_work[node]) > 1:
+            return
+        super()._reschedule(node)
+
+    def schedule(self):
+        if self.collection is None and self.registered_collections:
+            nodeids = next(iter(self.registered_collections.values()))
+            self.unit_of, order, self.costs = plan_units(nodeids, self.history, len(self.nodes))
+            self.rank = {unit: index for index, unit in enumerate(order)}
+        super().schedule()
@@ -0,0 +1,113 @@
+"""Docker helpers for the container under test"""
+
+import os
+import sys
+import time
+sys.path.append(os.getcwd())
+
+from constants import DockerConstants, ApiConstants, HTTPCodes
+
+
+def get_host_port(container, port):
+    """Host port published for container port
+
+    :param container: docker container
+    :type container: docker.models.containers.Container
+    :param port: container TCP port
+    :type port: int
+    :return: host TCP port
+    :rtype: int
+    """
+    container.reload()
+    return int(container.attrs['NetworkSettings']['Ports']['{0}/tcp'.format(port)][0]['HostPort'])
+
+
+def wait_for_container(container, base_url, timeout):
+    """Wait until container serves requests. Polls with exponential backoff, trusts the container
+    health check when the image defines one and fails fast when the container exits
+
+    :param container: docker container
+    :type container: docker.models.containers.Container
+    :param base_url: base URL of the container
+    :type base_url: str
+    :param timeout: readiness timeout
+    :type timeout: int
+    :return: None
+    """
+    import requests
+
+    delay = DockerConstants.BACKOFF_START
+    start_time = time.perf_counter()
+    while True:
+        container.reload()
+        state = container.attrs['State']
+        if state['Status'] in ('exited', 'dead'):
+            raise RuntimeError('Container {0} exited with code {1}:\n{2}'
+                               .format(container.short_id, state.get('ExitCode'), container.logs(tail=20)))
+        health = state.get('Health', {}).get('Status')
+        if health == 'unhealthy':
+            raise RuntimeError('Container {0} is unhealthy'.format(container.short_id))
+        if health in (None, 'healthy'):
+            try:
+                response = requests.get(base_url + ApiConstants.GET_INFO_PATH, timeout=DockerConstants.PROBE_TIMEOUT)
+                if response.status_code == HTTPCodes.OK:
+                    return
+            except (OSError, requests.RequestException):
+                pass
+        if time.perf_counter() - start_time >= timeout:
+            raise TimeoutError('Waited too long for the {0} to start accepting connections.'.format(base_url))
+        time.sleep(delay)
+        delay = min(delay * 2, DockerConstants.BACKOFF_MAX)
+
+
+def find_running_container(client, image, worker_id):
+    """Running container of the image started for the worker
+
+    :param client: docker client
+    :type client: docker.DockerClient
+    :param image: docker image:tag
+    :type image: str
+    :param worker_id: pytest-xdist worker id
+    :type worker_id: str
+    :return: container or None
+    :rtype: docker.models.containers.Container
+    """
+    containers = client.containers.list(filters={
+        'ancestor': image,
+        'status': 'running',
+        'label': '{0}={1}'.format(DockerConstants.WORKER_LABEL, worker_id),
+    })
+    return containers[0] if containers else None
+
+
+def sample_container(container):
+    """Resource usage sample of the container through docker stats
+
+    :param container: docker container
+    :type container: docker.models.containers.Container
+    :return: cpu_percent, memory_bytes, memory_limit_bytes, pids, open_fds (of the container main process,
+        None when it cannot be read), rx_bytes, tx_bytes
+    :rtype: dict
+    """
+    import docker
+
+    stats = container.stats(stream=False)
+    cpu, precpu = stats['cpu_stats'], stats.get('precpu_stats', {})
+    cpu_delta = cpu['cpu_usage']['total_usage'] - precpu.get('cpu_usage', {}).get('total_usage', 0)
+    system_delta = cpu.get('system_cpu_usage', 0) - precpu.get('system_cpu_usage', 0)
+    cpus = cpu.get('online_cpus') or len(cpu['cpu_usage'].get('percpu_usage') or [None])
+    networks = stats.get('networks', {}).values()
+    try:
+        exit_code, output = container.exec_run(['sh', '-c', 'ls /proc/1/fd | wc -l'])
+        open_fds = int(output) if exit_code == 0 else None
+    except (docker.errors.APIError, ValueError):
+        open_fds = None
+    return {
+        'cpu_percent': cpu_delta / system_delta * cpus * 100 if system_delta > 0 else 0.0,
+        'memory_bytes': stats.get('memory_stats', {}).get('usage'),
+        'memory_limit_bytes': stats.get('memory_stats', {}).get('limit'),
+        'pids': stats.get('pids_stats', {}).get('current'),
+        'open_fds': open_fds,
+        'rx_bytes': sum(network['rx_bytes'] for network in networks),
+        'tx_bytes': sum(network['tx_bytes'] for network in networks),
+    }
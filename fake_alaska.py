@@ -0,0 +1,318 @@
+"""Fake Alaska service implementing /bear and /info contract from README.md"""
+
+import http.server
+import io
+import json
+import os
+import re
+import socketserver
+import sys
+import threading
+from http import HTTPStatus
+from urllib.parse import unquote, urlsplit
+import requests
+from requests.adapters import BaseAdapter
+from requests.structures import CaseInsensitiveDict
+sys.path.append(os.getcwd())
+
+from bear_store import BearStore
+from constants import ApiConstants, Bears, HTTPCodes, FakeAlaskaConstants
+
+JSON_CONTENT_TYPE = 'application/json'
+TEXT_CONTENT_TYPE = 'text/plain; charset=utf-8'
+BEAR_ID_PATTERN = re.compile(r'^\d+$')
+
+
+class FakeAlaska:
+    """In-memory Alaska application. Transport independent: takes request parts, returns response parts"""
+
+    def __init__(self, store=None):
+        """FakeAlaska init
+
+        :param store: bear storage, new one if None
+        :type store: BearStore
+        :return: None
+        """
+        self.store = store if store is not None else BearStore()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _validate(bear_json, required):
+        """Validate bear fields
+
+        :param bear_json: decoded request body
+        :param required: all bear fields are required
+        :type required: bool
+        :return: normalized fields or None for invalid request
+        :rtype: dict
+        """
+        if not isinstance(bear_json, dict) or not bear_json or not set(bear_json) <= set(Bears.FIELDS):
+            return None
+        if required and set(bear_json) != set(Bears.FIELDS):
+            return None
+        fields = {}
+        if 'bear_type' in bear_json:
+            if bear_json['bear_type'] not in Bears.TYPES:
+                return None
+            fields['bear_type'] = bear_json['bear_type']
+        if 'bear_name' in bear_json:
+            name = bear_json['bear_name']
+            if not isinstance(name, str) or not Bears.NAME_MIN_LENGTH <= len(name) <= Bears.NAME_MAX_LENGTH:
+                return None
+            fields['bear_name'] = name.upper()
+        if 'bear_age' in bear_json:
+            age = bear_json['bear_age']
+            if isinstance(age, bool) or not isinstance(age, (int, float)) or not Bears.AGE_MIN < age <= Bears.AGE_MAX:
+                return None
+            fields['bear_age'] = float(age)
+        return fields
+
+    @staticmethod
+    def _decode(body, content_type):
+        """Decode JSON request body
+
+        :return: decoded body or None for invalid request
+        """
+        if not content_type or content_type.split(';')[0].strip().lower() != JSON_CONTENT_TYPE:
+            return None
+        try:
+            return json.loads(body.decode('utf8') if isinstance(body, bytes) else body)
+        except (ValueError, TypeError, AttributeError):
+            return None
+
+    def handle(self, method, path, body=None, content_type=None):
+        """Handle one request
+
+        :param method: HTTP method
+        :type method: str
+        :param path: request path
+        :type path: str
+        :param body: request body
+        :type body: bytes
+        :param content_type: request Content-Type header
+        :type content_type: str
+        :return: status code, response body (bytes or iterator of bytes chunks), response Content-Type
+        :rtype: tuple
+        """
+        path = unquote(urlsplit(path).path).rstrip('/') or '/'
+        with self._lock:
+            if path == ApiConstants.GET_INFO_PATH and method == 'GET':
+                return HTTPCodes.OK, FakeAlaskaConstants.INFO.encode('utf8'), TEXT_CONTENT_TYPE
+            if path == ApiConstants.GET_ALL_PATH:
+                if method == 'POST':
+                    return self._post_add(self._decode(body, content_type))
+                if method == 'GET':
+                    # Streamed after the lock is released, the store reads every chunk of records under its own lock
+                    return HTTPCodes.OK, self.store.iter_json(), JSON_CONTENT_TYPE
+                if method == 'DELETE':
+                    self.store.clear()
+                    return HTTPCodes.OK, b'OK', TEXT_CONTENT_TYPE
+            if path.startswith(ApiConstants.GET_ONE_PATH) and method in ('GET', 'PUT', 'DELETE'):
+                bear_id = path[len(ApiConstants.GET_ONE_PATH):]
+                if not BEAR_ID_PATTERN.match(bear_id):
+                    return HTTPCodes.BAD_REQUEST, b'Invalid bear_id', TEXT_CONTENT_TYPE
+                bear_id = int(bear_id)
+                if method == 'GET':
+                    record = self.store.get(bear_id)
+                    if record is not None:
+                        return HTTPCodes.OK, json.dumps(record).encode('utf8'), JSON_CONTENT_TYPE
+                elif method == 'PUT':
+                    if self.store.get(bear_id) is not None:
+                        return self._put_one(bear_id, self._decode(body, content_type))
+                elif self.store.delete(bear_id):
+                    return HTTPCodes.OK, b'OK', TEXT_CONTENT_TYPE
+                return HTTPCodes.NOT_FOUND, Bears.GET_ALL_EMPTY_RESPONSE.encode('utf8'), TEXT_CONTENT_TYPE
+        return HTTPCodes.NOT_FOUND, b'Not found', TEXT_CONTENT_TYPE
+
+    def _post_add(self, bear_json):
+        fields = self._validate(bear_json, required=True)
+        if fields is None:
+            return HTTPCodes.BAD_REQUEST, b'Invalid bear', TEXT_CONTENT_TYPE
+        bear_id = self.store.add(**fields)
+        return HTTPCodes.OK, str(bear_id).encode('utf8'), JSON_CONTENT_TYPE
+
+    def _put_one(self, bear_id, bear_json):
+        fields = self._validate(bear_json, required=False)
+        if fields is None:
+            return HTTPCodes.BAD_REQUEST, b'Invalid bear', TEXT_CONTENT_TYPE
+        self.store.update(bear_id, **fields)
+        return HTTPCodes.OK, b'OK', TEXT_CONTENT_TYPE
+
+
+class _ChunksReader(io.RawIOBase):
+    """Readable file-like object over an iterator of bytes chunks"""
+
+    def __init__(self, chunks):
+        super().__init__()
+        self._chunks = iter(chunks)
+        self._buffer = b''
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        while not self._buffer:
+            self._buffer = next(self._chunks, None)
+            if self._buffer is None:
+                self._buffer = b''
+                return 0
+        size = min(len(buffer), len(self._buffer))
+        buffer[:size] = self._buffer[:size]
+        self._buffer = self._buffer[size:]
+        return size
+
+
+class FakeAlaskaAdapter(BaseAdapter):
+    """requests transport adapter serving requests by FakeAlaska in-process, mount it with ApiClient(transport=...)"""
+
+    def __init__(self, app=None):
+        """FakeAlaskaAdapter init
+
+        :param app: fake application, new one if None
+        :type app: FakeAlaska
+        :return: None
+        """
+        super().__init__()
+        self.app = app or FakeAlaska()
+
+    def send(self, request, stream=False, timeout=None, verify=True, cert=None, proxies=None):
+        """Serve prepared request
+
+        :param request: prepared request
+        :type request: requests.PreparedRequest
+        :return: Response object
+        :rtype: requests.models.Response
+        """
+        status, body, content_type = self.app.handle(request.method, request.path_url, request.body,
+                                                     request.headers.get('Content-Type'))
+        response = requests.Response()
+        response.status_code = status
+        response.reason = HTTPStatus(status).phrase
+        if isinstance(body, bytes):
+            response.headers = CaseInsensitiveDict({'Content-Type': content_type, 'Content-Length': str(len(body))})
+            response.raw = io.BytesIO(body)
+        else:
+            response.headers = CaseInsensitiveDict({'Content-Type': content_type, 'Transfer-Encoding': 'chunked'})
+            response.raw = io.BufferedReader(_ChunksReader(body))
+        response.encoding = 'utf-8'
+        response.url = request.url
+        response.request = request
+        response.connection = self
+        return response
+
+    def close(self):
+        pass
+
+
+class _FakeAlaskaHandler(http.server.BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+
+    def _handle(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        body = self.rfile.read(length) if length else None
+        status, body, content_type = self.server.app.handle(self.command, self.path, body,
+                                                            self.headers.get('Content-Type'))
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        if isinstance(body, bytes):
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            return
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.end_headers()
+        try:
+            for chunk in body:
+                if chunk:
+                    self.wfile.write(b'%x\r\n%s\r\n' % (len(chunk), chunk))
+            self.wfile.write(b'0\r\n\r\n')
+        except ConnectionError:
+            # Client stopped reading the stream early
+            self.close_connection = True
+
+    do_GET = do_POST = do_PUT = do_DELETE = _handle
+
+    def log_message(self, format, *args):
+        pass
+
+
+class ThreadingHTTPServer(socketserver.ThreadingMixIn, http.server.HTTPServer):
+    """HTTP server handling every connection in a daemon thread, shared by the fake service and the chaos proxy"""
+    daemon_threads = True
+
+
+class FakeAlaskaServer:
+    """FakeAlaska served over HTTP by a local threading server"""
+
+    def __init__(self, host=FakeAlaskaConstants.HOST, port=0, app=None):
+        """FakeAlaskaServer init
+
+        :param host: host IP
+        :type host: str
+        :param port: TCP port, any free port if 0
+        :type port: int
+        :param app: fake application, new one if None
+        :type app: FakeAlaska
+        :return: None
+        """
+        self._server = ThreadingHTTPServer((host, port), _FakeAlaskaHandler)
+        self._server.app = app or FakeAlaska()
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+    @property
+    def base_url(self):
+        """base_url getter
+
+        :return: base URL address
+        :rtype: str
+        """
+        host, port = self._server.server_address[:2]
+        return 'http://{0}:{1}'.format(host, port)
+
+    @property
+    def app(self):
+        """app getter
+
+        :return: fake application
+        :rtype: FakeAlaska
+        """
+        return self._server.app
+
+    def serve_forever(self):
+        """Serve in current thread until interrupted
+
+        :return: None
+        """
+        try:
+            self._server.serve_forever()
+        finally:
+            self._server.server_close()
+
+    def start(self):
+        """Start serving in background thread
+
+        :return: None
+        """
+        self._thread.start()
+
+    def stop(self):
+        """Stop serving and close socket
+
+        :return: None
+        """
+        self._server.shutdown()
+        self._server.server_close()
+
+
+if __name__ == '__main__':
+    fake_server = FakeAlaskaServer(port=int(sys.argv[1]) if len(sys.argv) > 1 else FakeAlaskaConstants.PORT)
+    print('Fake Alaska is serving on {0}'.format(fake_server.base_url))
+    fake_server.serve_forever()
@@ -0,0 +1,170 @@
+"""HDR-style latency histogram: fixed relative precision over a wide range, constant memory, mergeable"""
+
+import math
+import os
+import sys
+from array import array
+sys.path.append(os.getcwd())
+
+from constants import HistogramConstants
+
+
+class HdrHistogram:
+    """Log-linear histogram of integer values (latencies in microseconds by default).
+
+    Values are counted in buckets whose width doubles every power of two, every bucket being split into
+    linear sub-buckets, so any recorded value is reproduced with significant_figures decimal digits.
+    Histograms with the same settings are merged by adding their counts
+    """
+
+    def __init__(self, lowest=HistogramConstants.LOWEST, highest=HistogramConstants.HIGHEST,
+                 significant_figures=HistogramConstants.SIGNIFICANT_FIGURES, unit=HistogramConstants.UNIT):
+        """HdrHistogram init
+
+        :param lowest: lowest discernible value in units, >= 1
+        :type lowest: int
+        :param highest: highest trackable value in units, larger values are clamped to it
+        :type highest: int
+        :param significant_figures: decimal digits of precision, 1..5
+        :type significant_figures: int
+        :param unit: size of the unit in seconds, values are recorded in seconds
+        :type unit: float
+        :return: None
+        """
+        self.lowest = lowest
+        self.highest = highest
+        self.significant_figures = significant_figures
+        self.unit = unit
+        self._unit_magnitude = int(math.floor(math.log2(lowest)))
+        sub_bucket_count_magnitude = int(math.ceil(math.log2(2 * 10 ** significant_figures)))
+        self._sub_bucket_half_count_magnitude = max(sub_bucket_count_magnitude, 1) - 1
+        self._sub_bucket_count = 1 << (self._sub_bucket_half_count_magnitude + 1)
+        self._sub_bucket_half_count = self._sub_bucket_count // 2
+        self._sub_bucket_mask = (self._sub_bucket_count - 1) << self._unit_magnitude
+        smallest_untrackable = self._sub_bucket_count << self._unit_magnitude
+        bucket_count = 1
+        while smallest_untrackable <= highest:
+            smallest_untrackable <<= 1
+            bucket_count += 1
+        self._counts = array('q', bytes(8 * (bucket_count + 1) * self._sub_bucket_half_count))
+        self.count = 0
+        self.total = 0
+        self.min = None
+        self.max = None
+
+    def _index(self, value):
+        bucket_index = (value | self._sub_bucket_mask).bit_length() - self._unit_magnitude - \
+            (self._sub_bucket_half_count_magnitude + 1)
+        sub_bucket_index = value >> (bucket_index + self._unit_magnitude)
+        return ((bucket_index + 1) << self._sub_bucket_half_count_magnitude) + \
+            sub_bucket_index - self._sub_bucket_half_count
+
+    def _value(self, index):
+        """Highest value counted in the slot of counts index
+
+        :rtype: int
+        """
+        bucket_index = (index >> self._sub_bucket_half_count_magnitude) - 1
+        sub_bucket_index = (index & (self._sub_bucket_half_count - 1)) + self._sub_bucket_half_count
+        if bucket_index < 0:
+            sub_bucket_index -= self._sub_bucket_half_count
+            bucket_index = 0
+        shift = bucket_index + self._unit_magnitude
+        return (sub_bucket_index << shift) + (1 << shift) - 1
+
+    def record(self, seconds, count=1):
+        """Record a value
+
+        :param seconds: value in seconds
+        :type seconds: float
+        :param count: number of occurrences
+        :type count: int
+        :return: None
+        """
+        value = min(max(int(round(seconds / self.unit)), 0), self.highest)
+        self._counts[self._index(value)] += count
+        self.count += count
+        self.total += value * count
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def merge(self, other):
+        """Add counts of a histogram with the same settings
+
+        :param other: histogram to add
+        :type other: HdrHistogram
+        :return: self
+        :rtype: HdrHistogram
+        """
+        if len(other._counts) != len(self._counts) or other.unit != self.unit:
+            raise ValueError('Histograms with different settings cannot be merged')
+        for index, count in enumerate(other._counts):
+            if count:
+                self._counts[index] += count
+        self.count += other.count
+        self.total += other.total
+        if other.count:
+            self.min = other.min if self.min is None else min(self.min, other.min)
+            self.max = other.max if self.max is None else max(self.max, other.max)
+        return self
+
+    def percentile(self, percent):
+        """Value at percentile, within the histogram precision
+
+        :param percent: percentile, 0..100
+        :type percent: float
+        :return: value in seconds, None for empty histogram
+        :rtype: float
+        """
+        if not self.count:
+            return None
+        target = max(int(math.ceil(percent / 100.0 * self.count)), 1)
+        running = 0
+        for index, count in enumerate(self._counts):
+            running += count
+            if running >= target:
+                return min(self._value(index), self.max) * self.unit
+        return self.max * self.unit
+
+    def summary(self):
+        """Latency summary in milliseconds
+
+        :rtype: dict
+        """
+        def ms(seconds):
+            return seconds * 1000 if seconds is not None else None
+
+        return {
+            'requests': self.count,
+            'mean_ms': self.total / self.count * self.unit * 1000 if self.count else None,
+            'p50_ms': ms(self.percentile(50)),
+            'p90_ms': ms(self.percentile(90)),
+            'p95_ms': ms(self.percentile(95)),
+            'p99_ms': ms(self.percentile(99)),
+            'p999_ms': ms(self.percentile(99.9)),
+            'max_ms': ms(self.max * self.unit) if self.count else None,
+        }
+
+    def to_dict(self):
+        """Compact serializable form: settings and non-zero counts
+
+        :rtype: dict
+        """
+        return {'lowest': self.lowest, 'highest': self.highest, 'significant_figures': self.significant_figures,
+                'unit': self.unit, 'total': self.total, 'min': self.min, 'max': self.max,
+                'counts': [[index, count] for index, count in enumerate(self._counts) if count]}
+
+    @classmethod
+    def from_dict(cls, data):
+        """Histogram from to_dict form
+
+        :param data: to_dict result
+        :type data: dict
+        :rtype: HdrHistogram
+        """
+        histogram = cls(data['lowest'], data['highest'], data['significant_figures'], data['unit'])
+        for index, count in data['counts']:
+            histogram._counts[index] = count
+            histogram.count += count
+        histogram.total, histogram.min, histogram.max = data['total'], data['min'], data['max']
+        return histogram
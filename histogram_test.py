@@ -0,0 +1,95 @@
+"""Unit tests of the HDR-style latency histogram"""
+import math
+import random
+import pytest
+import allure
+import os
+import sys
+sys.path.append(os.getcwd())
+
+from constants import HistogramConstants
+from histogram import HdrHistogram
+
+# Test data
+percents = [0, 1, 25, 50, 90, 99, 99.9, 100]
+
+significant_figures = [1, 2, 3, 4]
+
+sample_size = 5000
+
+
+def samples(seed, size=sample_size):
+    """Log-uniform latencies in whole microseconds from 1 us to 60 s"""
+    rnd = random.Random(seed)
+    return [round(10 ** rnd.uniform(0, math.log10(HistogramConstants.HIGHEST))) for _ in range(size)]
+
+
+def exact_percentile(values, percent):
+    """Nearest-rank percentile the histogram approximates"""
+    ordered = sorted(values)
+    return ordered[max(int(math.ceil(percent / 100.0 * len(ordered))), 1) - 1]
+
+
+def histogram_of(values, **kwargs):
+    histogram = HdrHistogram(**kwargs)
+    for value in values:
+        histogram.record(value * HistogramConstants.UNIT)
+    return histogram
+
+
+@allure.feature('HdrHistogram unit tests')
+class TestHdrHistogram:
+
+    @allure.feature('Percentiles are within the relative error of significant figures')
+    @pytest.mark.parametrize('figures', significant_figures)
+    def test_percentile_error_bound(self, figures) -> None:
+        values = samples(figures)
+        histogram = histogram_of(values, significant_figures=figures)
+        for percent in percents:
+            exact = exact_percentile(values, percent)
+            value = round(histogram.percentile(percent) / HistogramConstants.UNIT)
+            assert exact <= value <= exact * (1 + 10 ** -figures), 'p{0}: {1} for {2}'.format(percent, value, exact)
+
+    @allure.feature('Small values are counted exactly')
+    def test_small_values_exact(self) -> None:
+        histogram = histogram_of(range(1, 1001))
+        assert [round(histogram.percentile(percent) / HistogramConstants.UNIT) for percent in (0.1, 50, 100)] == \
+            [1, 500, 1000]
+
+    @allure.feature('Summary of count, mean and maximum in milliseconds')
+    def test_summary(self) -> None:
+        summary = histogram_of([1000, 2000, 3000]).summary()
+        assert summary['requests'] == 3
+        assert summary['mean_ms'] == pytest.approx(2.0)
+        assert summary['max_ms'] == pytest.approx(3.0)
+        assert summary['p50_ms'] == pytest.approx(2.0, rel=10 ** -HistogramConstants.SIGNIFICANT_FIGURES)
+
+    @allure.feature('Empty histogram has no percentiles')
+    def test_empty(self) -> None:
+        summary = HdrHistogram().summary()
+        assert summary['requests'] == 0
+        assert all(value is None for key, value in summary.items() if key != 'requests')
+
+    @allure.feature('Values out of range are clamped')
+    def test_clamped(self) -> None:
+        histogram = HdrHistogram()
+        histogram.record(-1.0)
+        histogram.record(3600.0)
+        assert (histogram.min, histogram.max) == (0, HistogramConstants.HIGHEST)
+        assert histogram.percentile(100) == pytest.approx(HistogramConstants.HIGHEST * HistogramConstants.UNIT)
+
+    @allure.feature('Merged histogram equals the histogram of all values')
+    def test_merge(self) -> None:
+        first, second = samples(1, 1000), samples(2, 1000)
+        merged = histogram_of(first).merge(histogram_of(second))
+        assert merged.to_dict() == histogram_of(first + second).to_dict()
+        assert histogram_of(first).merge(HdrHistogram()).to_dict() == histogram_of(first).to_dict()
+        with pytest.raises(ValueError):
+            HdrHistogram().merge(HdrHistogram(significant_figures=2))
+
+    @allure.feature('Histogram is restored from its compact form')
+    def test_dict_round_trip(self) -> None:
+        histogram = histogram_of(samples(3, 1000))
+        restored = HdrHistogram.from_dict(histogram.to_dict())
+        assert restored.count == histogram.count
+        assert restored.summary() == histogram.summary()
@@ -0,0 +1,165 @@
+"""ApiClient hooks and latency summaries
+
+Kept apart from instrumentation.py, which imports requests and urllib3, so that conftest.py can create the session
+LatencyHistogram without importing the HTTP stack
+"""
+
+import json
+import threading
+import time
+
+
+def percentile(sorted_values, percent):
+    """Nearest-rank percentile
+
+    :param sorted_values: ascending values
+    :type sorted_values: list
+    :param percent: percentile, 0 < percent <= 100
+    :type percent: float
+    :return: percentile value, None for no values
+    :rtype: float
+    """
+    if not sorted_values:
+        return None
+    rank = max(int(round(percent / 100.0 * len(sorted_values) + 0.5)) - 1, 0)
+    return sorted_values[min(rank, len(sorted_values) - 1)]
+
+
+def summarize(latencies, errors, elapsed):
+    """Latency and throughput summary of one endpoint
+
+    :param latencies: request latencies in seconds
+    :type latencies: list
+    :param errors: number of failed requests
+    :type errors: int
+    :param elapsed: wall time in seconds
+    :type elapsed: float
+    :return: summary
+    :rtype: dict
+    """
+    values = sorted(latencies)
+    return {
+        'requests': len(values),
+        'errors': errors,
+        'throughput_rps': len(values) / elapsed if elapsed else 0.0,
+        'mean_ms': sum(values) / len(values) * 1000 if values else None,
+        'p50_ms': percentile(values, 50) * 1000 if values else None,
+        'p95_ms': percentile(values, 95) * 1000 if values else None,
+        'p99_ms': percentile(values, 99) * 1000 if values else None,
+        'max_ms': values[-1] * 1000 if values else None,
+    }
+
+
+class LatencyHistogram:
+    """Hook collecting total latency of every call per endpoint in memory"""
+
+    def __init__(self):
+        """LatencyHistogram init
+
+        :return: None
+        """
+        self._lock = threading.Lock()
+        self._latencies = {}
+        self._errors = {}
+        self._started = time.perf_counter()
+
+    def __call__(self, event):
+        with self._lock:
+            self._latencies.setdefault(event.endpoint, []).append(event.total)
+            self._errors[event.endpoint] = self._errors.get(event.endpoint, 0) + (event.status_code is None)
+
+    def __bool__(self):
+        return bool(self._latencies)
+
+    def latencies(self):
+        """Recorded latencies
+
+        :return: endpoint -> latencies in seconds
+        :rtype: dict
+        """
+        with self._lock:
+            return {endpoint: list(values) for endpoint, values in self._latencies.items()}
+
+    def errors(self):
+        """Recorded failed calls
+
+        :return: endpoint -> number of calls without response
+        :rtype: dict
+        """
+        with self._lock:
+            return dict(self._errors)
+
+    def merge(self, latencies, errors):
+        """Add latencies and failed calls recorded by another histogram, e.g. of a pytest-xdist worker
+
+        :param latencies: endpoint -> latencies in seconds, see latencies
+        :type latencies: dict
+        :param errors: endpoint -> number of failed calls, see errors
+        :type errors: dict
+        :return: None
+        """
+        with self._lock:
+            for endpoint, values in latencies.items():
+                self._latencies.setdefault(endpoint, []).extend(values)
+                self._errors[endpoint] = self._errors.get(endpoint, 0) + errors.get(endpoint, 0)
+
+    def summary(self):
+        """Latency summary per endpoint
+
+        :return: endpoint -> summary, see summarize
+        :rtype: dict
+        """
+        elapsed = time.perf_counter() - self._started
+        with self._lock:
+            return {endpoint: summarize(values, self._errors[endpoint], elapsed)
+                    for endpoint, values in sorted(self._latencies.items())}
+
+    def format_summary(self):
+        """Latency summary table
+
+        :rtype: str
+        """
+        lines = ['{0:<26}{1:>9}{2:>8}{3:>10}{4:>10}{5:>10}{6:>10}'
+                 .format('endpoint', 'requests', 'errors', 'mean ms', 'p50 ms', 'p95 ms', 'max ms')]
+        for endpoint, row in self.summary().items():
+            lines.append('{0:<26}{1[requests]:>9}{1[errors]:>8}{1[mean_ms]:>10.2f}{1[p50_ms]:>10.2f}'
+                         '{1[p95_ms]:>10.2f}{1[max_ms]:>10.2f}'.format(endpoint, row))
+        return '\n'.join(lines)
+
+
+class LoguruHook:
+    """Hook writing every call to a loguru logger at DEBUG level"""
+
+    def __init__(self, logger=None):
+        """LoguruHook init
+
+        :param logger: loguru logger, logger bound to name 'api' if None
+        :return: None
+        """
+        if logger is None:
+            import loguru
+            logger = loguru.logger.bind(name='api')
+        self._logger = logger
+
+    def __call__(self, event):
+        self._logger.debug('{0} -> {1} in {2:.2f} ms (connect {3:.2f} ms, ttfb {4:.2f} ms, retries {5}){6}'
+                           .format(event.endpoint, event.status_code, (event.total or 0) * 1000,
+                                   (event.dns + event.connect) * 1000, (event.ttfb or 0) * 1000, event.retries,
+                                   ', error: ' + event.error if event.error else ''))
+
+
+class AllureHook:
+    """Hook attaching every call to the allure report of the running test"""
+
+    def __init__(self):
+        """AllureHook init, allure is imported only when the hook is used (--api-trace)
+
+        :return: None
+        """
+        import allure
+        self._allure = allure
+
+    def __call__(self, event):
+        allure = self._allure
+        allure.attach(json.dumps(event.as_dict(), indent=2), name=event.endpoint,
+                      attachment_type=allure.attachment_type.JSON)
@@ -0,0 +1,151 @@
+"""Request instrumentation for ApiClient: timing transport and request events, hooks are in hooks.py"""
+
+import os
+import socket
+import sys
+import threading
+import time
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.exceptions import ConnectTimeoutError, NewConnectionError
+from urllib3.util.connection import allowed_gai_family
+sys.path.append(os.getcwd())
+
+_timings = threading.local()
+
+
+def reset_timings():
+    """Reset DNS and connect timings of the current thread
+
+    :return: None
+    """
+    _timings.dns = 0.0
+    _timings.connect = 0.0
+
+
+def get_timings():
+    """DNS and connect timings of the current thread since the last reset_timings
+
+    :return: dns and connect seconds, 0.0 when a pooled connection was reused
+    :rtype: tuple
+    """
+    return getattr(_timings, 'dns', 0.0), getattr(_timings, 'connect', 0.0)
+
+
+class _TimedConnectionMixin:
+    """Measures name resolution and TCP connect of new connections"""
+
+    def _new_conn(self):
+        started = time.perf_counter()
+        dns_host = self._dns_host
+        try:
+            addresses = []
+            for *_, sockaddr in socket.getaddrinfo(dns_host, self.port, allowed_gai_family(), socket.SOCK_STREAM):
+                if sockaddr[0] not in addresses:
+                    addresses.append(sockaddr[0])
+        except OSError:
+            # urllib3 resolves the name again and raises its own error
+            addresses = [dns_host]
+        resolved = time.perf_counter()
+        try:
+            # Every resolved address is tried in order like urllib3 create_connection does
+            for index, address in enumerate(addresses):
+                self._dns_host = address
+                try:
+                    return super()._new_conn()
+                except (NewConnectionError, ConnectTimeoutError):
+                    if index == len(addresses) - 1:
+                        raise
+        finally:
+            self._dns_host = dns_host
+            _timings.dns = getattr(_timings, 'dns', 0.0) + resolved - started
+            _timings.connect = getattr(_timings, 'connect', 0.0) + time.perf_counter() - resolved
+
+
+class _TimedHTTPConnection(_TimedConnectionMixin, HTTPConnection):
+    pass
+
+
+class _TimedHTTPSConnection(_TimedConnectionMixin, HTTPSConnection):
+    pass
+
+
+class _TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = _TimedHTTPConnection
+
+
+class _TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = _TimedHTTPSConnection
+
+
+class InstrumentedAdapter(HTTPAdapter):
+    """HTTPAdapter whose connections record DNS and connect timings, see get_timings"""
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {'http': _TimedHTTPConnectionPool,
+                                                   'https': _TimedHTTPSConnectionPool}
+
+
+class RequestEvent:
+    """One ApiClient call"""
+
+    __slots__ = ('method', 'path', 'status_code', 'bytes_sent', 'bytes_received', 'dns', 'connect', 'ttfb', 'total',
+                 'retries', 'error')
+
+    def __init__(self, method, path, status_code=None, bytes_sent=0, bytes_received=None, dns=0.0, connect=0.0,
+                 ttfb=None, total=None, retries=0, error=None):
+        """RequestEvent init
+
+        :param method: HTTP method
+        :type method: str
+        :param path: path template like /bear/{bear_id}
+        :type path: str
+        :param status_code: HTTP status code, None when request failed
+        :type status_code: int
+        :param bytes_sent: request body size
+        :type bytes_sent: int
+        :param bytes_received: response body size, None for streamed responses without Content-Length
+        :type bytes_received: int
+        :param dns: name resolution seconds, 0.0 for reused connection
+        :type dns: float
+        :param connect: TCP connect seconds, 0.0 for reused connection
+        :type connect: float
+        :param ttfb: seconds from sending the request to parsed response headers
+        :type ttfb: float
+        :param total: seconds of the whole call including body download
+        :type total: float
+        :param retries: number of retries done by the transport
+        :type retries: int
+        :param error: exception text when request failed
+        :type error: str
+        :return: None
+        """
+        self.method = method
+        self.path = path
+        self.status_code = status_code
+        self.bytes_sent = bytes_sent
+        self.bytes_received = bytes_received
+        self.dns = dns
+        self.connect = connect
+        self.ttfb = ttfb
+        self.total = total
+        self.retries = retries
+        self.error = error
+
+    @property
+    def endpoint(self):
+        """endpoint getter
+
+        :return: method and path template like 'GET /bear/{bear_id}'
+        :rtype: str
+        """
+        return '{0} {1}'.format(self.method, self.path)
+
+    def as_dict(self):
+        """Event fields
+
+        :rtype: dict
+        """
+        return {name: getattr(self, name) for name in self.__slots__}
@@ -0,0 +1,134 @@
+"""Multi-process open-loop load driver for Alaska REST API
+
+Runs load_generator.LoadGenerator in several processes, each with its own ApiClient and connection pool, so
+the request rate is not limited by one interpreter. The target rate, concurrency and seed size are split
+across processes, schedules are interleaved and the latency histograms and error counts are merged into
+one report. Every process seeds its share of the database first and reports ready, the common start time
+is chosen only when all of them are ready, so seeding and process start-up never eat into the schedule:
+
+    python3.6 load_driver.py --processes 8 --workload post_add --profile step --start-rate 500 --step 500
+"""
+
+import argparse
+import math
+import multiprocessing
+import os
+import sys
+import time
+sys.path.append(os.getcwd())
+
+from api import ApiClient
+from constants import LoadConstants
+from load_generator import LoadGenerator, add_arguments, profile_from_args, workload_mix, report, write_report
+
+
+def run_process(base_url, mix, profile, concurrency, seed_size, phase, seed, ready, start):
+    """Load generator of one worker process: seed, report ready and wait for the common start time
+
+    :param ready: queue the process puts True to when seeded, False when seeding failed
+    :type ready: multiprocessing.Queue
+    :param start: queue the process gets the common start time (time.time()) from, None to abort
+    :type start: multiprocessing.Queue
+    :return: stage results, see load_generator.new_stage, empty if aborted
+    :rtype: list
+    """
+    with ApiClient(base_url=base_url, pool_size=concurrency) as api:
+        generator = LoadGenerator(api, mix, profile, concurrency, seed_size, phase, seed)
+        try:
+            generator.seed()
+        except BaseException:
+            ready.put(False)
+            raise
+        ready.put(True)
+        start_at = start.get()
+        if start_at is None:
+            return []
+        return generator.run(start_at)
+
+
+def split_evenly(total, parts):
+    """Split total into parts integers differing by at most one, the first parts get the remainder
+
+    :rtype: list
+    """
+    return [total // parts + (index < total % parts) for index in range(parts)]
+
+
+def merge_stages(results):
+    """Merge stage results of the processes
+
+    :param results: stage results of every process
+    :type results: list
+    :return: merged stage results
+    :rtype: list
+    """
+    merged = results[0]
+    for stages in results[1:]:
+        for total, stage in zip(merged, stages):
+            total['start_rate'] += stage['start_rate']
+            total['end_rate'] += stage['end_rate']
+            for key in ('sent', 'completed', 'errors'):
+                total[key] += stage[key]
+            total['latency'].merge(stage['latency'])
+            total['service_time'].merge(stage['service_time'])
+            for endpoint, endpoint_results in stage['endpoints'].items():
+                if endpoint in total['endpoints']:
+                    total['endpoints'][endpoint]['latency'].merge(endpoint_results['latency'])
+                    total['endpoints'][endpoint]['errors'] += endpoint_results['errors']
+                else:
+                    total['endpoints'][endpoint] = endpoint_results
+    return merged
+
+
+def run(base_url, mix, profile, processes, concurrency=LoadConstants.CONCURRENCY, seed_size=0):
+    """Run the profile split across processes
+
+    :param base_url: base URL of the service
+    :type base_url: str
+    :param mix: operation name -> weight
+    :type mix: dict
+    :param profile: total rate profile, list of (duration, start rate, end rate) stages
+    :type profile: list
+    :param processes: number of worker processes
+    :type processes: int
+    :param concurrency: total maximum number of in-flight requests
+    :type concurrency: int
+    :param seed_size: total number of bears created before the run
+    :type seed_size: int
+    :return: merged stage results
+    :rtype: list
+    """
+    process_profile = [(duration, start_rate / processes, end_rate / processes)
+                       for duration, start_rate, end_rate in profile]
+    process_concurrency = int(math.ceil(concurrency / processes))
+    with multiprocessing.Manager() as manager, multiprocessing.Pool(processes) as pool:
+        ready, start = manager.Queue(), manager.Queue()
+        arguments = [(base_url, mix, process_profile, process_concurrency, process_seed_size,
+                      index / processes, index, ready, start)
+                     for index, process_seed_size in enumerate(split_evenly(seed_size, processes))]
+        # Every task blocks its pool process until the start time is sent, so each process runs exactly one
+        result = pool.starmap_async(run_process, arguments, chunksize=1)
+        seeded = all([ready.get() for _ in range(processes)])
+        start_at = time.time() + LoadConstants.START_DELAY if seeded else None
+        for _ in range(processes):
+            start.put(start_at)
+        return merge_stages(result.get())
+
+
+def main(argv=None):
+    parser = add_arguments(argparse.ArgumentParser(description='Alaska REST API multi-process load driver'))
+    parser.add_argument('--processes', type=int, default=os.cpu_count(), help='worker processes')
+    args = parser.parse_args(argv)
+    with ApiClient(base_url=args.base_url) as api:
+        api.delete_all()
+        stages = run(args.base_url, workload_mix(args.workload), profile_from_args(args), args.processes,
+                     args.concurrency, args.seed_size)
+        api.delete_all()
+    results = report(stages, slo_p99_ms=args.slo_p99_ms)
+    results['processes'] = args.processes
+    write_report(results, args)
+    return results
+
+
+if __name__ == '__main__':
+    main()
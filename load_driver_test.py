@@ -0,0 +1,68 @@
+"""Multi-process load driver smoke tests against the fake Alaska service over local HTTP"""
+import json
+import pytest
+import allure
+import os
+import sys
+sys.path.append(os.getcwd())
+
+import load_driver
+from api import ApiClient
+from fake_alaska import FakeAlaskaServer
+from load_generator import constant_profile, report, step_profile
+
+# Test data
+processes = 2
+
+mix = {'post_add': 1, 'get_one': 1}
+
+seed_size = 5
+
+stage_keys = ['target_rate', 'start_rate', 'end_rate', 'duration_s', 'sent', 'errors', 'error_rate',
+              'throughput_rps', 'latency', 'service_time', 'endpoints', 'saturated']
+
+
+@pytest.fixture()
+def alaska_url():
+    """fresh fake service over local HTTP"""
+    with FakeAlaskaServer() as server:
+        yield server.base_url
+
+
+@allure.feature('Load driver smoke tests')
+class TestLoadDriver:
+
+    @allure.feature('Processes share the rate and the seed, their stages are merged into one report')
+    def test_load_driver_run(self, alaska_url) -> None:
+        stages = load_driver.run(alaska_url, mix, step_profile(20, 20, 2, 0.5), processes, 4, seed_size)
+        results = report(stages)
+        assert len(results['stages']) == 2
+        assert all(sorted(stage) == sorted(stage_keys) for stage in results['stages'])
+        assert [stage['target_rate'] for stage in results['stages']] == [20, 40]
+        assert [stage['sent'] for stage in results['stages']] == [10, 20]
+        assert sum(stage['errors'] for stage in results['stages']) == 0
+        assert sorted(results['stages'][0]['endpoints']) == ['GET /bear/{bear_id}', 'POST /bear']
+        with ApiClient(base_url=alaska_url) as api:
+            posted = sum(stage['endpoints']['POST /bear']['requests'] for stage in results['stages'])
+            assert len(api.get_all().json()) == seed_size + posted
+
+    @allure.feature('Seeding error of a process is raised without sending load')
+    def test_load_driver_seeding_error(self, alaska_url) -> None:
+        with pytest.raises(AssertionError):
+            load_driver.run(alaska_url + '/missing', mix, constant_profile(10, 0.5), processes, 2, seed_size)
+
+    @allure.feature('Seed size is split evenly, the remainder goes to the first processes')
+    def test_split_evenly(self) -> None:
+        assert load_driver.split_evenly(5, 3) == [2, 2, 1]
+        assert load_driver.split_evenly(2, 4) == [1, 1, 0, 0]
+        assert sum(load_driver.split_evenly(1001, 8)) == 1001
+
+    @allure.feature('Command line run writes the report with the number of processes')
+    def test_load_driver_main(self, alaska_url, tmp_path) -> None:
+        output = str(tmp_path / 'load.json')
+        results = load_driver.main(['--base-url', alaska_url, '--processes', str(processes), '--workload', 'read',
+                                    '--rate', '20', '--duration', '0.5', '--seed-size', str(seed_size),
+                                    '--output', output])
+        with open(output) as file:
+            assert json.load(file) == json.loads(json.dumps(results))
+        assert results['processes'] == processes and results['stages'][0]['sent'] == 10
@@ -0,0 +1,325 @@
+"""Open-loop, rate-controlled load generator for Alaska REST API
+
+Requests are sent at the arrival times of a rate profile no matter when responses come back, and latency is
+measured from the intended send time, so a slow server is not hidden by coordinated omission. Step and ramp
+profiles report every stage separately to find the highest rate the service sustains:
+
+    python3.6 load_generator.py --workload post_add --profile step --start-rate 100 --step 100 --steps 10
+    python3.6 load_generator.py --workload crud --profile ramp --start-rate 50 --end-rate 2000 --steps 20
+"""
+
+import argparse
+import bisect
+import json
+import math
+import os
+import random
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+sys.path.append(os.getcwd())
+
+from api import ApiClient
+from benchmark import Benchmark
+from constants import DockerConstants, HTTPCodes, BenchmarkConstants, LoadConstants
+from histogram import HdrHistogram
+
+
+def constant_profile(rate, duration):
+    """Constant arrival rate
+
+    :param rate: requests per second
+    :type rate: float
+    :param duration: seconds
+    :type duration: float
+    :return: profile, list of (duration, start rate, end rate) stages
+    :rtype: list
+    """
+    return [(duration, rate, rate)]
+
+
+def step_profile(start_rate, step, steps, step_duration):
+    """Arrival rate increased by step every step_duration
+
+    :rtype: list
+    """
+    return [(step_duration, start_rate + index * step, start_rate + index * step) for index in range(steps)]
+
+
+def ramp_profile(start_rate, end_rate, duration, stages=1):
+    """Arrival rate growing linearly from start_rate to end_rate, reported in stages of equal duration
+
+    :rtype: list
+    """
+    rates = [start_rate + (end_rate - start_rate) * index / stages for index in range(stages + 1)]
+    return [(duration / stages, rates[index], rates[index + 1]) for index in range(stages)]
+
+
+def arrivals(profile, phase=0.0):
+    """Intended send times of the profile
+
+    :param profile: list of (duration, start rate, end rate) stages, rate changes linearly within a stage
+    :type profile: list
+    :param phase: fraction of the first inter-arrival interval to shift the schedule by, 0 <= phase < 1;
+        processes sharing a rate use different phases to interleave their requests
+    :type phase: float
+    :return: iterator of (stage index, seconds from the start)
+    :rtype: iterator
+    """
+    offset = 0.0
+    arrived = 0.0
+    number = 0
+    for index, (duration, start_rate, end_rate) in enumerate(profile):
+        end = arrived + (start_rate + end_rate) / 2.0 * duration
+        acceleration = (end_rate - start_rate) / duration
+        while number + phase < end:
+            # Time at which the cumulative number of arrivals of the stage reaches the request number
+            count = number + phase - arrived
+            if acceleration:
+                elapsed = (math.sqrt(start_rate * start_rate + 2 * acceleration * count) - start_rate) / acceleration
+            else:
+                elapsed = count / start_rate
+            yield index, offset + elapsed
+            number += 1
+        offset += duration
+        arrived = end
+
+
+def new_stage(duration, start_rate, end_rate):
+    """Empty results of a profile stage
+
+    :rtype: dict
+    """
+    return {'duration_s': duration, 'start_rate': start_rate, 'end_rate': end_rate, 'sent': 0, 'completed': 0,
+            'errors': 0, 'latency': HdrHistogram(), 'service_time': HdrHistogram(), 'endpoints': {}}
+
+
+def stage_report(stage, slo_p99_ms=LoadConstants.SLO_P99_MS, tolerance=LoadConstants.THROUGHPUT_TOLERANCE,
+                 max_error_rate=LoadConstants.MAX_ERROR_RATE):
+    """Serializable summary of stage results
+
+    :param stage: stage results, see new_stage
+    :type stage: dict
+    :param slo_p99_ms: p99 latency limit of a sustained rate
+    :type slo_p99_ms: float
+    :param tolerance: allowed relative shortfall of throughput against the target rate
+    :type tolerance: float
+    :param max_error_rate: allowed share of failed requests
+    :type max_error_rate: float
+    :return: summary, 'saturated' is True when the service did not sustain the target rate
+    :rtype: dict
+    """
+    target_rate = (stage['start_rate'] + stage['end_rate']) / 2.0
+    throughput = stage['completed'] / stage['duration_s']
+    latency = stage['latency'].summary()
+    error_rate = stage['errors'] / stage['sent'] if stage['sent'] else 0.0
+    return {
+        'target_rate': target_rate, 'start_rate': stage['start_rate'], 'end_rate': stage['end_rate'],
+        'duration_s': stage['duration_s'], 'sent': stage['sent'], 'errors': stage['errors'],
+        'error_rate': error_rate, 'throughput_rps': throughput,
+        'latency': latency, 'service_time': stage['service_time'].summary(),
+        'endpoints': {endpoint: dict(results['latency'].summary(), errors=results['errors'])
+                      for endpoint, results in sorted(stage['endpoints'].items())},
+        'saturated': throughput < target_rate * (1 - tolerance) or error_rate > max_error_rate or
+        (latency['p99_ms'] is not None and latency['p99_ms'] > slo_p99_ms),
+    }
+
+
+def report(stages, **kwargs):
+    """Serializable summary of all stages and the highest sustained rate
+
+    :param stages: stage results
+    :type stages: list
+    :param kwargs: saturation criteria, see stage_report
+    :return: report
+    :rtype: dict
+    """
+    stage_reports = [stage_report(stage, **kwargs) for stage in stages]
+    sustained = None
+    for stage in stage_reports:
+        if stage['saturated']:
+            break
+        sustained = stage['target_rate']
+    return {'stages': stage_reports, 'sustained_rate': sustained,
+            'saturated_rate': next((stage['target_rate'] for stage in stage_reports if stage['saturated']), None)}
+
+
+class LoadGenerator(Benchmark):
+    """Open-loop load generator: a scheduler thread submits requests at their intended send times
+    to a pool of concurrency threads, late requests wait in the pool queue and their wait is counted"""
+
+    def __init__(self, api, mix, profile, concurrency=LoadConstants.CONCURRENCY,
+                 seed_size=BenchmarkConstants.SEED_SIZE, phase=0.0, seed=0):
+        """LoadGenerator init
+
+        :param api: API client, its pool size should be >= concurrency
+        :type api: ApiClient
+        :param mix: operation name -> weight, see BenchmarkConstants.MIXES
+        :type mix: dict
+        :param profile: rate profile, list of (duration, start rate, end rate) stages
+        :type profile: list
+        :param concurrency: maximum number of in-flight requests
+        :type concurrency: int
+        :param seed_size: number of bears created before the run
+        :type seed_size: int
+        :param phase: schedule phase, see arrivals
+        :type phase: float
+        :param seed: random seed of operation choice and, with the sending thread number, of bear_id choice
+        :type seed: int
+        :return: None
+        """
+        super().__init__(api, mix, concurrency, sum(stage[0] for stage in profile), seed_size=seed_size)
+        self._profile = profile
+        self._phase = phase
+        self._seed = seed
+        self._rnd = random.Random(seed)
+        self._thread_state = threading.local()
+        self._threads = 0
+        self._stage_ends = []
+        offset = 0.0
+        for duration, _, _ in profile:
+            offset += duration
+            self._stage_ends.append(offset)
+        self.stages = [new_stage(*stage) for stage in profile]
+
+    def _thread_rnd(self):
+        """Random of the current sending thread, the scheduler thread's self._rnd is not shared
+
+        :rtype: random.Random
+        """
+        rnd = getattr(self._thread_state, 'rnd', None)
+        if rnd is None:
+            with self._lock:
+                self._threads += 1
+                rnd = self._thread_state.rnd = random.Random('{0}-{1}'.format(self._seed, self._threads))
+        return rnd
+
+    def _send(self, stage_index, operation, start, intended):
+        sent = time.perf_counter()
+        try:
+            failed = self._call(operation, self._thread_rnd()).status_code != HTTPCodes.OK
+        except Exception:
+            # Any failure counts, an exception escaping an executor task would drop the request unrecorded
+            failed = True
+        done = time.perf_counter()
+        endpoint = BenchmarkConstants.ENDPOINTS[operation]
+        completed_index = min(bisect.bisect_right(self._stage_ends, done - start), len(self.stages) - 1)
+        with self._lock:
+            stage = self.stages[stage_index]
+            stage['latency'].record(done - intended)
+            stage['service_time'].record(done - sent)
+            stage['errors'] += failed
+            results = stage['endpoints'].setdefault(endpoint, {'latency': HdrHistogram(), 'errors': 0})
+            results['latency'].record(done - intended)
+            results['errors'] += failed
+            if done - start < self._stage_ends[-1]:
+                self.stages[completed_index]['completed'] += 1
+
+    def run(self, start_at=None):
+        """Seed the database unless seed was called and send requests of the profile
+
+        :param start_at: wall clock time (time.time()) to start at, now if None
+        :type start_at: float
+        :return: stage results, see new_stage
+        :rtype: list
+        """
+        self.seed()
+
+        start = time.perf_counter()
+        if start_at is not None:
+            start += max(start_at - time.time(), 0)
+        with ThreadPoolExecutor(max_workers=self._workers) as executor:
+            for stage_index, offset in arrivals(self._profile, self._phase):
+                intended = start + offset
+                delay = intended - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                operation = self._rnd.choices(self._operations, self._weights)[0]
+                self.stages[stage_index]['sent'] += 1
+                executor.submit(self._send, stage_index, operation, start, intended)
+        return self.stages
+
+
+def profile_from_args(args):
+    """Rate profile of command line arguments
+
+    :rtype: list
+    """
+    if args.profile == 'step':
+        return step_profile(args.start_rate, args.step, args.steps, args.step_duration)
+    if args.profile == 'ramp':
+        return ramp_profile(args.start_rate, args.end_rate, args.duration, args.steps)
+    return constant_profile(args.rate, args.duration)
+
+
+def workload_mix(workload):
+    """Operation weights of a mix name (BenchmarkConstants.MIXES) or of a single operation
+
+    :rtype: dict
+    """
+    return BenchmarkConstants.MIXES.get(workload) or {workload: 1}
+
+
+def add_arguments(parser):
+    parser.add_argument('--base-url', default=DockerConstants.BASE_URL)
+    parser.add_argument('--workload', default=LoadConstants.WORKLOAD,
+                        choices=sorted(BenchmarkConstants.MIXES) + sorted(BenchmarkConstants.ENDPOINTS),
+                        help='mix name or single operation')
+    parser.add_argument('--profile', default='constant', choices=['constant', 'step', 'ramp'])
+    parser.add_argument('--rate', type=float, default=LoadConstants.RATE, help='constant profile, requests/s')
+    parser.add_argument('--duration', type=float, default=LoadConstants.DURATION,
+                        help='constant and ramp profiles, seconds')
+    parser.add_argument('--start-rate', type=float, default=LoadConstants.START_RATE, help='step and ramp profiles')
+    parser.add_argument('--end-rate', type=float, default=LoadConstants.END_RATE, help='ramp profile')
+    parser.add_argument('--step', type=float, default=LoadConstants.START_RATE, help='step profile, requests/s')
+    parser.add_argument('--steps', type=int, default=LoadConstants.STEPS,
+                        help='number of steps of step profile, reported stages of ramp profile')
+    parser.add_argument('--step-duration', type=float, default=LoadConstants.STEP_DURATION, help='seconds')
+    parser.add_argument('--concurrency', type=int, default=LoadConstants.CONCURRENCY,
+                        help='maximum in-flight requests')
+    parser.add_argument('--seed-size', type=int, default=BenchmarkConstants.SEED_SIZE)
+    parser.add_argument('--slo-p99-ms', type=float, default=LoadConstants.SLO_P99_MS,
+                        help='p99 latency limit of a sustained stage')
+    parser.add_argument('--output', default=LoadConstants.OUTPUT)
+    return parser
+
+
+def print_report(results):
+    print('{0:>10}{1:>10}{2:>8}{3:>10}{4:>10}{5:>10}{6:>10}  {7}'
+          .format('target', 'rps', 'errors', 'p50 ms', 'p99 ms', 'p99.9 ms', 'max ms', ''))
+    for stage in results['stages']:
+        latency = stage['latency']
+        if not latency['requests']:
+            continue
+        print('{0:>10.1f}{1:>10.1f}{2:>8}{3[p50_ms]:>10.2f}{3[p99_ms]:>10.2f}{3[p999_ms]:>10.2f}{3[max_ms]:>10.2f}  {4}'
+              .format(stage['target_rate'], stage['throughput_rps'], stage['errors'], latency,
+                      'SATURATED' if stage['saturated'] else ''))
+    print('sustained rate: {0} requests/s'.format(results['sustained_rate']))
+
+
+def write_report(results, args):
+    results.update({'image': '{0}:{1}'.format(DockerConstants.DOCKER_IMAGE, DockerConstants.DOCKER_TAG),
+                    'workload': args.workload, 'profile': args.profile, 'concurrency': args.concurrency,
+                    'started': time.strftime('%Y-%m-%dT%H:%M:%S')})
+    print_report(results)
+    os.makedirs(os.path.dirname(args.output) or '.', exist_ok=True)
+    with open(args.output, 'w') as file:
+        json.dump(results, file, indent=2)
+
+
+def main(argv=None):
+    args = add_arguments(argparse.ArgumentParser(description='Alaska REST API open-loop load generator')) \
+        .parse_args(argv)
+    with ApiClient(base_url=args.base_url, pool_size=args.concurrency) as api:
+        api.delete_all()
+        stages = LoadGenerator(api, workload_mix(args.workload), profile_from_args(args), args.concurrency,
+                               args.seed_size).run()
+        api.delete_all()
+    results = report(stages, slo_p99_ms=args.slo_p99_ms)
+    write_report(results, args)
+    return results
+
+
+if __name__ == '__main__':
+    main()
@@ -1,22 +1,126 @@
 """Logger tools"""
 
+import os
 import sys
-import loguru
+import threading
 
 COMMON_LOG_FORMAT = '{time:YYYY-MM-DD HH:mm:ss.SSS} | {level} | {extra[name]}\n\t{module}: {message}'
 TEST_LOG_FORMAT = "<level>{time:YYYY-MM-DD HH:mm:ss.SSS} | {level} | {module}/{function} | <c>{message}</c></level>"
+COMMON_LOG_PATH = 'reports/full_tests.log'
+COMMON_LOG_ROTATION = '10 MB'
+COMMON_LOG_RETENTION = 10
+COMMON_LOG_COMPRESSION = 'zip'
+TEST_LOG_DIR = 'reports/logs'
+TEST_LOG_BUFFER_SIZE = 64 * 1024
+
+
+class LogDispatcher:
+    """Single loguru sink that routes records to per-test log files by record["extra"]["name"]"""
+
+    def __init__(self, directory=TEST_LOG_DIR, buffer_size=TEST_LOG_BUFFER_SIZE):
+        """LogDispatcher init
+
+        :param directory: directory of per-test log files
+        :type directory: str
+        :param buffer_size: write buffer size of every file
+        :type buffer_size: int
+        :return: None
+        """
+        self._directory = directory
+        self._buffer_size = buffer_size
+        self._files = {}
+        self._lock = threading.Lock()
+
+    def path(self, test_name):
+        """Log file path of the test
+
+        :param test_name: test name
+        :type test_name: str
+        :return: log file path
+        :rtype: str
+        """
+        return os.path.join(self._directory, '{0}.log'.format(test_name.replace('/', '_')))
+
+    def __call__(self, message):
+        """loguru sink, files are opened on the first record of the test
+
+        :param message: formatted loguru message
+        :type message: loguru._handler.Message
+        :return: None
+        """
+        test_name = message.record['extra'].get('name')
+        with self._lock:
+            file = self._files.get(test_name)
+            if file is None:
+                os.makedirs(self._directory, exist_ok=True)
+                file = self._files[test_name] = open(self.path(test_name), 'a', buffering=self._buffer_size,
+                                                     encoding='utf8')
+            file.write(message)
+
+    def close(self, test_name):
+        """Flush and close log file of the test
+
+        :param test_name: test name
+        :type test_name: str
+        :return: None
+        """
+        with self._lock:
+            file = self._files.pop(test_name, None)
+        if file is not None:
+            file.close()
+
+    def close_all(self):
+        """Flush and close all log files
+
+        :return: None
+        """
+        with self._lock:
+            files, self._files = self._files, {}
+        for file in files.values():
+            file.close()
+
+
+def _logger():
+    """loguru logger, loguru is imported on the first use instead of test collection"""
+    from loguru import logger
+    return logger
+
+
+_dispatcher = LogDispatcher()
+_dispatcher_id = None
+
+
+def _add_dispatcher():
+    global _dispatcher_id
+    _dispatcher_id = _logger().add(_dispatcher, format=TEST_LOG_FORMAT, enqueue=True, colorize=False,
+                                   filter=lambda record: 'name' in record['extra'])
 
 
 def set_common_logger(console_level: str):
-    loguru.logger.remove()
-    loguru.logger.add(sys.stdout, level=console_level, enqueue=True, format=TEST_LOG_FORMAT)
-    loguru.logger.add('reports/full_tests.log', level='DEBUG', enqueue=True, format=COMMON_LOG_FORMAT)
+    _logger().remove()
+    _dispatcher.close_all()
+    _logger().add(sys.stdout, level=console_level, enqueue=True, format=TEST_LOG_FORMAT)
+    _logger().add(COMMON_LOG_PATH, level='DEBUG', enqueue=True, format=COMMON_LOG_FORMAT,
+                  rotation=COMMON_LOG_ROTATION, retention=COMMON_LOG_RETENTION,
+                  compression=COMMON_LOG_COMPRESSION)
+    _add_dispatcher()
 
 
 def create_test_logger(test_name: str):
-    test_logger = loguru.logger.bind(name=test_name)
-    test_log_path = f'reports/logs/{test_name.replace("/", "_")}.log'
-    test_logger.add(test_log_path, format=TEST_LOG_FORMAT,
-                    filter=lambda record: record["extra"].get("name") == test_name)
+    if _dispatcher_id is None:
+        _add_dispatcher()
+    test_logger = _logger().bind(name=test_name)
     test_logger.info(f'Start test: {test_name}')
     return test_logger
+
+
+def close_test_logger(test_name: str):
+    """Wait for enqueued records and close log file of the test"""
+    _logger().complete()
+    _dispatcher.close(test_name)
+
+
+def close_all_loggers():
+    """Wait for enqueued records and close all per-test log files"""
+    _logger().complete()
+    _dispatcher.close_all()
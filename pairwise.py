@@ -0,0 +1,108 @@
+"""Combinatorial test data reduction: n-wise covering arrays for pytest parametrize"""
+
+import itertools
+import os
+import random
+import sys
+import pytest
+sys.path.append(os.getcwd())
+
+from constants import PairwiseConstants
+
+
+def covering_array(values_lists, strength=2, seed=PairwiseConstants.SEED):
+    """Rows covering every combination of values of any strength columns at least once.
+    Greedy construction: every next row is the candidate covering most of the still uncovered combinations.
+    Candidates are the whole product for small matrices and seeded random rows otherwise, so the result
+    is deterministic (the same on every pytest-xdist worker)
+
+    :param values_lists: values of every column
+    :type values_lists: list
+    :param strength: interaction strength, 2 for pairwise
+    :type strength: int
+    :param seed: random seed of candidate generation
+    :type seed: int
+    :return: rows
+    :rtype: list
+    """
+    columns = len(values_lists)
+    if strength >= columns:
+        return list(itertools.product(*values_lists))
+    column_sets = list(itertools.combinations(range(columns), strength))
+    uncovered = {(column_set, indexes) for column_set in column_sets
+                 for indexes in itertools.product(*(range(len(values_lists[column])) for column in column_set))}
+    sizes = [len(values) for values in values_lists]
+    exhaustive = 1
+    for size in sizes:
+        exhaustive *= size
+    rnd = random.Random(seed)
+
+    def candidates():
+        if exhaustive <= PairwiseConstants.MAX_EXHAUSTIVE:
+            return itertools.product(*(range(size) for size in sizes))
+        # Random rows, each one seeded with an uncovered combination so that progress is guaranteed
+        rows = []
+        uncovered_list = sorted(uncovered)
+        for _ in range(PairwiseConstants.CANDIDATES):
+            row = [rnd.randrange(size) for size in sizes]
+            column_set, indexes = uncovered_list[rnd.randrange(len(uncovered_list))]
+            for column, index in zip(column_set, indexes):
+                row[column] = index
+            rows.append(tuple(row))
+        return rows
+
+    def gain(row):
+        return sum((column_set, tuple(row[column] for column in column_set)) in uncovered
+                   for column_set in column_sets)
+
+    rows = []
+    while uncovered:
+        best = max(candidates(), key=gain)
+        uncovered.difference_update((column_set, tuple(best[column] for column in column_set))
+                                    for column_set in column_sets)
+        rows.append(tuple(values_lists[column][index] for column, index in enumerate(best)))
+    return rows
+
+
+def matrix_mode():
+    """Test matrix mode from PairwiseConstants.ENV environment variable
+
+    :return: strength of covering arrays, None for full cartesian product
+    :rtype: int
+    :raises ValueError: mode is not 'full', 'pairwise' or a positive integer
+    """
+    mode = os.getenv(PairwiseConstants.ENV, PairwiseConstants.DEFAULT_MODE).strip().lower()
+    if mode == 'full':
+        return None
+    if mode == 'pairwise':
+        return 2
+    try:
+        strength = int(mode)
+    except ValueError:
+        strength = 0
+    if strength < 1:
+        raise ValueError("{0}={1!r}: expected 'full', 'pairwise' or a positive interaction strength"
+                         .format(PairwiseConstants.ENV, os.getenv(PairwiseConstants.ENV)))
+    return strength
+
+
+def parametrize_matrix(argnames, values_lists, strength=None):
+    """pytest.mark.parametrize with a covering array of values_lists instead of stacked parametrize decorators.
+    Full product is used when PairwiseConstants.ENV is 'full' (nightly runs), pairwise by default,
+    a number sets the interaction strength
+
+    :param argnames: comma separated argument names
+    :type argnames: str
+    :param values_lists: values of every argument
+    :type values_lists: list
+    :param strength: interaction strength, from PairwiseConstants.ENV if None
+    :type strength: int
+    :return: parametrize mark
+    """
+    if strength is None:
+        strength = matrix_mode()
+    if strength is None:
+        rows = list(itertools.product(*values_lists))
+    else:
+        rows = covering_array(values_lists, strength)
+    return pytest.mark.parametrize(argnames, rows, ids=['-'.join(str(value) for value in row) for row in rows])
@@ -0,0 +1,86 @@
+"""Unit tests of covering arrays and test matrix mode of pairwise.py"""
+import itertools
+import pytest
+import allure
+import os
+import sys
+sys.path.append(os.getcwd())
+
+from constants import PairwiseConstants
+from pairwise import covering_array, matrix_mode, parametrize_matrix
+
+# Test data
+values_lists_small = [['POLAR', 'BROWN', 'BLACK'], ['A', 'B'], [0, 1, 2, 3]]
+
+values_lists_wide = [list(range(3))] * 6
+
+values_lists_large = [list(range(10))] * 5  # exhaustive product above PairwiseConstants.MAX_EXHAUSTIVE
+
+coverage_cases = [(values_lists_small, 1), (values_lists_small, 2), (values_lists_wide, 2), (values_lists_wide, 3),
+                  (values_lists_large, 1), (values_lists_large, 2)]
+
+modes_valid = [('full', None), ('pairwise', 2), (' PairWise ', 2), ('1', 1), ('3', 3)]
+
+modes_invalid = ['abc', '0', '-1', '2.5', '']
+
+
+def uncovered(values_lists, rows, strength):
+    """Combinations of values of any strength columns that no row contains"""
+    missing = []
+    for columns in itertools.combinations(range(len(values_lists)), strength):
+        combinations = set(itertools.product(*(values_lists[column] for column in columns)))
+        missing.extend(combinations - {tuple(row[column] for column in columns) for row in rows})
+    return missing
+
+
+@allure.feature('pairwise unit tests')
+class TestPairwise:
+
+    @allure.feature('Covering array contains every combination of values of any strength columns')
+    @pytest.mark.parametrize('values_lists, strength', coverage_cases)
+    def test_covering_array_coverage(self, values_lists, strength) -> None:
+        rows = covering_array(values_lists, strength)
+        assert not uncovered(values_lists, rows, strength), 'Combinations are not covered'
+        assert all(len(row) == len(values_lists) for row in rows)
+
+    @allure.feature('Pairwise array is much smaller than the full product')
+    def test_covering_array_reduction(self) -> None:
+        assert len(covering_array(values_lists_large, 2)) < 10 ** 5 / 100
+        assert len(covering_array(values_lists_wide, 2)) < 3 ** 6 / 10
+
+    @allure.feature('Strength not lower than the number of columns gives the full product')
+    def test_covering_array_full_product(self) -> None:
+        assert covering_array(values_lists_small, 3) == list(itertools.product(*values_lists_small))
+
+    @allure.feature('Covering array is the same on every call (pytest-xdist workers)')
+    def test_covering_array_deterministic(self) -> None:
+        assert covering_array(values_lists_large, 2) == covering_array(values_lists_large, 2)
+
+    @allure.feature('Test matrix mode of the environment variable')
+    @pytest.mark.parametrize('mode, strength', modes_valid)
+    def test_matrix_mode(self, monkeypatch, mode, strength) -> None:
+        monkeypatch.setenv(PairwiseConstants.ENV, mode)
+        assert matrix_mode() == strength
+
+    @allure.feature('Default test matrix mode is pairwise')
+    def test_matrix_mode_default(self, monkeypatch) -> None:
+        monkeypatch.delenv(PairwiseConstants.ENV, raising=False)
+        assert matrix_mode() == 2
+
+    @allure.feature('Invalid test matrix mode raises ValueError naming the environment variable')
+    @pytest.mark.parametrize('mode', modes_invalid)
+    def test_matrix_mode_invalid(self, monkeypatch, mode) -> None:
+        monkeypatch.setenv(PairwiseConstants.ENV, mode)
+        with pytest.raises(ValueError, match=PairwiseConstants.ENV):
+            matrix_mode()
+
+    @allure.feature('parametrize_matrix rows and ids')
+    def test_parametrize_matrix(self, monkeypatch) -> None:
+        monkeypatch.setenv(PairwiseConstants.ENV, 'full')
+        mark = parametrize_matrix('bear_type, bear_name, bear_age', values_lists_small)
+        argnames, rows = mark.args
+        assert argnames == 'bear_type, bear_name, bear_age'
+        assert rows == list(itertools.product(*values_lists_small))
+        assert mark.kwargs['ids'][0] == 'POLAR-A-0'
+        _, rows = parametrize_matrix('bear_type, bear_name, bear_age', values_lists_small, strength=2).args
+        assert rows == covering_array(values_lists_small, 2)
@@ -0,0 +1,324 @@
+"""Performance regression gate pytest plugin
+
+Times every test call and ApiClient endpoint (session LatencyHistogram, see hooks.py), stores
+the samples of the last runs as a baseline per image:tag and, with --perf-gate, fails the session when
+the current run is significantly slower than the baseline:
+
+    python3.6 -m pytest rest_api_test.py --perf-save       # record a baseline run
+    python3.6 -m pytest rest_api_test.py --perf-gate       # compare against the baseline
+"""
+
+import json
+import math
+import os
+import re
+import statistics
+import sys
+import time
+import pytest
+sys.path.append(os.getcwd())
+
+from constants import DockerConstants, PerfConstants
+
+
+def mann_whitney_p(baseline, current):
+    """One-sided Mann-Whitney U test, normal approximation
+
+    :param baseline: baseline samples
+    :type baseline: list
+    :param current: current samples
+    :type current: list
+    :return: p-value of the hypothesis that current samples are not greater than baseline samples
+    :rtype: float
+    """
+    values = sorted([(value, 0) for value in baseline] + [(value, 1) for value in current])
+    rank_sum = 0.0
+    index = 0
+    while index < len(values):
+        end = index
+        while end + 1 < len(values) and values[end + 1][0] == values[index][0]:
+            end += 1
+        rank = (index + end) / 2.0 + 1
+        rank_sum += rank * sum(1 for position in range(index, end + 1) if values[position][1])
+        index = end + 1
+    n_baseline, n_current = len(baseline), len(current)
+    u = rank_sum - n_current * (n_current + 1) / 2.0
+    sigma = math.sqrt(n_baseline * n_current * (n_baseline + n_current + 1) / 12.0)
+    if not sigma:
+        return 1.0
+    z = (u - n_baseline * n_current / 2.0 - 0.5) / sigma
+    return 0.5 * math.erfc(z / math.sqrt(2))
+
+
+def compare_samples(baseline, current, threshold, alpha):
+    """Compare latency samples of an endpoint
+
+    :param baseline: baseline latencies
+    :type baseline: list
+    :param current: current latencies
+    :type current: list
+    :param threshold: allowed relative slowdown of the median
+    :type threshold: float
+    :param alpha: significance level
+    :type alpha: float
+    :return: comparison, 'regression' is True for significant slowdown above threshold
+    :rtype: dict
+    """
+    baseline_median, current_median = statistics.median(baseline), statistics.median(current)
+    p_value = mann_whitney_p(baseline, current)
+    return {'baseline_median': baseline_median, 'current_median': current_median,
+            'ratio': current_median / baseline_median if baseline_median else None, 'p_value': p_value,
+            'regression': p_value < alpha and current_median > baseline_median * (1 + threshold)}
+
+
+def compare_value(baseline, current, threshold, z_score, higher_is_worse=True):
+    """Compare single value of the current run against values of the baseline runs
+
+    :param baseline: one value per baseline run
+    :type baseline: list
+    :param current: current value
+    :type current: float
+    :param threshold: allowed relative degradation of the mean
+    :type threshold: float
+    :param z_score: number of baseline standard deviations a significant degradation exceeds
+    :type z_score: float
+    :param higher_is_worse: True for durations, False for throughput
+    :type higher_is_worse: bool
+    :return: comparison, 'regression' is True for significant degradation above threshold
+    :rtype: dict
+    """
+    mean = statistics.mean(baseline)
+    deviation = statistics.stdev(baseline) if len(baseline) > 1 else 0.0
+    degradation = (current - mean) if higher_is_worse else (mean - current)
+    return {'baseline_mean': mean, 'baseline_stdev': deviation, 'current': current,
+            'ratio': current / mean if mean else None,
+            'regression': degradation > max(mean * threshold, z_score * deviation)}
+
+
+class PerfGate:
+    """Plugin registered on the controller: collects current run samples, compares them with the baseline"""
+
+    def __init__(self, config):
+        """PerfGate init
+
+        :param config: pytest config
+        :return: None
+        """
+        self.config = config
+        self.durations = {}
+        self.latencies = {}
+        self.started = None
+        self.session_start_ms = int(time.time() * 1000)
+        self.baseline_path = os.path.join(config.getoption('--perf-baseline-dir'),
+                                          re.sub(r'[^\w.-]', '_', self.target()) + '.json')
+        self.baseline = self._load()
+        self.results = None
+
+    def target(self):
+        """Name of the tested service version the baseline belongs to
+
+        :return: image:tag for docker backend, backend name otherwise
+        :rtype: str
+        """
+        backend = self.config.getoption('--alaska', 'docker')
+        if backend == 'docker':
+            return '{0}:{1}'.format(DockerConstants.DOCKER_IMAGE, DockerConstants.DOCKER_TAG)
+        return backend
+
+    def _load(self):
+        if not os.path.exists(self.baseline_path):
+            return {'target': self.target(), 'runs': []}
+        with open(self.baseline_path) as file:
+            return json.load(file)
+
+    def baseline_durations(self, nodeid):
+        """Call durations of the test in baseline runs
+
+        :rtype: list
+        """
+        return [run['tests'][nodeid] for run in self.baseline['runs'] if nodeid in run['tests']]
+
+    def current_run(self):
+        """Samples of the current run
+
+        :rtype: dict
+        """
+        elapsed = time.perf_counter() - self.started if self.started is not None else 0.0
+        requests_count = sum(len(values) for values in self.latencies.values())
+        return {'started': time.strftime('%Y-%m-%dT%H:%M:%S'), 'tests': self.durations,
+                'endpoints': self.latencies, 'throughput_rps': requests_count / elapsed if elapsed else 0.0}
+
+    def compare(self):
+        """Compare current run with baseline runs
+
+        :return: comparison results
+        :rtype: dict
+        """
+        threshold = self.config.getoption('--perf-threshold')
+        runs = self.baseline['runs']
+        current = self.current_run()
+        results = {'target': self.target(), 'baseline_runs': len(runs), 'tests': {}, 'endpoints': {},
+                   'throughput': None, 'regressions': []}
+        if len(runs) < PerfConstants.MIN_RUNS:
+            return results
+
+        for nodeid, duration in current['tests'].items():
+            baseline = self.baseline_durations(nodeid)
+            if len(baseline) < PerfConstants.MIN_RUNS:
+                continue
+            result = compare_value(baseline, duration, threshold, PerfConstants.Z_SCORE)
+            result['regression'] = result['regression'] and \
+                duration - result['baseline_mean'] > PerfConstants.MIN_DURATION_DELTA
+            results['tests'][nodeid] = result
+            if result['regression']:
+                results['regressions'].append(nodeid)
+
+        for endpoint, latencies in current['endpoints'].items():
+            baseline = [latency for run in runs for latency in run['endpoints'].get(endpoint, [])]
+            if len(baseline) < PerfConstants.MIN_SAMPLES or len(latencies) < PerfConstants.MIN_SAMPLES:
+                continue
+            result = compare_samples(baseline, latencies, threshold, PerfConstants.ALPHA)
+            results['endpoints'][endpoint] = result
+            if result['regression']:
+                results['regressions'].append(endpoint)
+
+        if current['endpoints']:
+            result = compare_value([run['throughput_rps'] for run in runs], current['throughput_rps'], threshold,
+                                   PerfConstants.Z_SCORE, higher_is_worse=False)
+            results['throughput'] = result
+            if result['regression']:
+                results['regressions'].append('throughput')
+        return results
+
+    def save(self):
+        """Append current run to the baseline, keeping the last PerfConstants.BASELINE_RUNS runs
+
+        :return: None
+        """
+        self.baseline['runs'] = (self.baseline['runs'] + [self.current_run()])[-PerfConstants.BASELINE_RUNS:]
+        os.makedirs(os.path.dirname(self.baseline_path) or '.', exist_ok=True)
+        with open(self.baseline_path, 'w') as file:
+            json.dump(self.baseline, file)
+
+    def write_report(self):
+        """Write comparison results to PerfConstants.REPORT
+
+        :return: None
+        """
+        os.makedirs(os.path.dirname(PerfConstants.REPORT) or '.', exist_ok=True)
+        with open(PerfConstants.REPORT, 'w') as file:
+            json.dump(self.results, file, indent=2)
+
+    def attach_report(self):
+        """Report comparison results to allure as a session level 'performance gate' result, failed on regressions.
+        The controller runs no tests under pytest-xdist, so the results are written through allure_commons
+        instead of allure.attach; without --alluredir nothing is written
+
+        :return: None
+        """
+        from allure_commons import plugin_manager
+        from allure_commons.model2 import Attachment, Label, Status, TestResult
+        from allure_commons.types import AttachmentType
+        from allure_commons.utils import md5, now, uuid4
+
+        file_name = '{0}-attachment.{1}'.format(uuid4(), AttachmentType.JSON.extension)
+        plugin_manager.hook.report_attached_data(body=json.dumps(self.results, indent=2), file_name=file_name)
+        name = 'performance gate: {0}'.format(self.target())
+        plugin_manager.hook.report_result(result=TestResult(
+            uuid=uuid4(), historyId=md5(name), name=name, fullName=name,
+            status=Status.FAILED if self.results['regressions'] else Status.PASSED,
+            start=self.session_start_ms, stop=now(), labels=[Label(name='feature', value='Performance gate')],
+            attachments=[Attachment(name='performance gate', source=file_name,
+                                    type=AttachmentType.JSON.mime_type)]))
+
+    def pytest_runtest_logreport(self, report):
+        # Throughput clock starts when the first test is set up, service start-up (docker) is not counted
+        if self.started is None:
+            self.started = time.perf_counter()
+        if report.when == 'call' and report.passed:
+            self.durations[report.nodeid] = report.duration
+
+    @pytest.hookimpl(tryfirst=True)
+    def pytest_sessionfinish(self, session, exitstatus):
+        for endpoint, values in self.config.api_latency.latencies().items():
+            self.latencies.setdefault(endpoint, []).extend(values)
+        self.results = self.compare()
+        self.write_report()
+        self.attach_report()
+        if self.config.getoption('--perf-gate') and self.results['regressions'] and session.exitstatus == 0:
+            session.exitstatus = pytest.ExitCode.TESTS_FAILED
+        if self.config.getoption('--perf-save') and exitstatus == 0 and not self.results['regressions']:
+            self.save()
+
+    def pytest_terminal_summary(self, terminalreporter):
+        results = self.results
+        if results is None:
+            return
+        terminalreporter.write_sep('=', 'performance gate: {0}'.format(results['target']))
+        if results['baseline_runs'] < PerfConstants.MIN_RUNS:
+            terminalreporter.write_line('baseline has {0} of {1} required runs, nothing compared ({2})'
+                                        .format(results['baseline_runs'], PerfConstants.MIN_RUNS,
+                                                self.baseline_path))
+            return
+        for endpoint, result in sorted(results['endpoints'].items()):
+            terminalreporter.write_line('{0:<26} median {1:8.2f} ms -> {2:8.2f} ms  p={3:.4f}{4}'.format(
+                endpoint, result['baseline_median'] * 1000, result['current_median'] * 1000, result['p_value'],
+                '  REGRESSION' if result['regression'] else ''))
+        if results['throughput']:
+            terminalreporter.write_line('{0:<26} {1:8.1f} rps -> {2:8.1f} rps{3}'.format(
+                'throughput', results['throughput']['baseline_mean'], results['throughput']['current'],
+                '  REGRESSION' if results['throughput']['regression'] else ''))
+        for nodeid in results['regressions']:
+            if nodeid in results['tests']:
+                result = results['tests'][nodeid]
+                terminalreporter.write_line('{0}: {1:.2f} ms -> {2:.2f} ms  REGRESSION'.format(
+                    nodeid, result['baseline_mean'] * 1000, result['current'] * 1000))
+        terminalreporter.write_line('{0} regressions, report: {1}'.format(len(results['regressions']),
+                                                                         PerfConstants.REPORT))
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup('perf', 'performance regression gate')
+    group.addoption('--perf-gate', action='store_true', default=False,
+                    help='fail the session when tests or endpoints are significantly slower than the baseline')
+    group.addoption('--perf-save', action='store_true', default=False,
+                    help='append timings of a passed session to the baseline of the tested image:tag')
+    group.addoption('--perf-baseline-dir', default=PerfConstants.BASELINE_DIR, help='baseline directory')
+    group.addoption('--perf-threshold', type=float, default=PerfConstants.THRESHOLD,
+                    help='allowed relative slowdown, default %(default)s')
+
+
+def _enabled(config):
+    return config.getoption('--perf-gate') or config.getoption('--perf-save')
+
+
+def pytest_configure(config):
+    if _enabled(config) and not hasattr(config, 'workerinput'):
+        config.perf_gate = PerfGate(config)
+        config.pluginmanager.register(config.perf_gate, 'perf_gate_state')
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_makereport(item, call):
+    yield
+    if call.when == 'call':
+        item.perf_duration = call.duration
+
+
+@pytest.fixture(autouse=True)
+def perf_report(request):
+    """Attach test call duration and, when the baseline is loaded (not on pytest-xdist workers), its baseline
+    to the allure report"""
+    yield
+    duration = getattr(request.node, 'perf_duration', None)
+    if not _enabled(request.config) or duration is None:
+        return
+    import allure
+
+    gate = getattr(request.config, 'perf_gate', None)
+    baseline = gate.baseline_durations(request.node.nodeid) if gate is not None else []
+    lines = ['duration: {0:.2f} ms'.format(duration * 1000)]
+    if baseline:
+        lines.append('baseline mean: {0:.2f} ms over {1} runs ({2})'
+                     .format(statistics.mean(baseline) * 1000, len(baseline), gate.target()))
+    allure.attach('\n'.join(lines), name='performance', attachment_type=allure.attachment_type.TEXT)
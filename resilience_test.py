@@ -0,0 +1,107 @@
+"""ApiClient timeouts and retries under injected network faults"""
+import time
+import requests
+import pytest
+import allure
+import os
+import sys
+sys.path.append(os.getcwd())
+
+from api import ApiClient, validate_response_code
+from chaos_proxy import Fault
+from constants import HTTPCodes, Bears, ChaosConstants
+
+# Test data
+injected_latency = 0.3
+
+read_timeout = 0.1
+
+bandwidth = 16384
+
+database_size = 100
+
+
+@pytest.mark.usefixtures('alaska')
+@allure.feature('Resilience test suit for Alaska test')
+class TestResilience:
+
+    @allure.feature('Read timeout bounds a hung call')
+    def test_read_timeout_bounds_hung_call(self, chaos_proxy) -> None:
+        chaos_proxy.set_fault('GET /info', Fault(latency=10))
+
+        with ApiClient(base_url=chaos_proxy.base_url, retries=0, timeout=(1, read_timeout)) as api:
+            started = time.perf_counter()
+            with pytest.raises(requests.RequestException):
+                api.get_info()
+            assert time.perf_counter() - started < 1, 'Call was not interrupted by the read timeout'
+
+    @allure.feature('Injected latency is added to every call of the endpoint')
+    def test_latency_injection(self, chaos_proxy) -> None:
+        chaos_proxy.set_fault('POST /bear', Fault(latency=injected_latency))
+
+        with ApiClient(base_url=chaos_proxy.base_url) as api:
+            started = time.perf_counter()
+            resp_post = api.post_add(json=Bears.SIMPLE_BEAR_JSON)
+            elapsed = time.perf_counter() - started
+            validate_response_code(resp_post, HTTPCodes.OK)
+            api.delete_one(bear_id=resp_post.json())
+            validate_response_code(api.get_info(), HTTPCodes.OK)
+        assert elapsed >= injected_latency, 'Latency was not injected: {0:.3f} s'.format(elapsed)
+
+    @allure.feature('Idempotent call is retried after connection reset')
+    def test_retry_after_connection_reset(self, chaos_proxy) -> None:
+        chaos_proxy.set_fault('GET /info', Fault(reset=1, times=1))
+
+        with ApiClient(base_url=chaos_proxy.base_url, retries=1) as api:
+            validate_response_code(api.get_info(), HTTPCodes.OK)
+        assert chaos_proxy.injected.get('reset') == 1, 'Connection was not reset'
+
+    @allure.feature('Connection reset fails the call without retries')
+    def test_connection_reset_without_retries(self, chaos_proxy) -> None:
+        chaos_proxy.set_fault(ChaosConstants.ANY, Fault(reset=1))
+
+        with ApiClient(base_url=chaos_proxy.base_url, retries=0) as api:
+            with pytest.raises(requests.ConnectionError):
+                api.get_info()
+
+    @allure.feature('Connection reset before forwarding leaves the request unprocessed')
+    def test_reset_before_forward_not_processed(self, chaos_proxy) -> None:
+        chaos_proxy.set_fault('POST /bear', Fault(reset=1, before_forward=True))
+
+        with ApiClient(base_url=chaos_proxy.base_url, retries=0) as api:
+            database_before = len(api.get_all().json())
+            with pytest.raises(requests.ConnectionError):
+                api.post_add(json=Bears.SIMPLE_BEAR_JSON)
+            assert len(api.get_all().json()) == database_before, 'Reset POST created a bear'
+
+    @allure.feature('Partial response is detected by the client')
+    def test_partial_response(self, chaos_proxy) -> None:
+        with ApiClient(base_url=chaos_proxy.base_url, retries=0) as api:
+            bear_id = api.post_add(json=Bears.SIMPLE_BEAR_JSON).json()
+            try:
+                chaos_proxy.set_fault('GET /bear/{bear_id}', Fault(partial=1))
+                with pytest.raises(requests.RequestException):
+                    api.get_one(bear_id=bear_id)
+            finally:
+                api.delete_one(bear_id=bear_id)
+
+    @allure.feature('Bandwidth limit slows down large responses')
+    def test_bandwidth_limit(self, chaos_proxy) -> None:
+        with ApiClient(base_url=chaos_proxy.base_url) as api:
+            # database of known size, the response is limited to it
+            validate_response_code(api.delete_all(), HTTPCodes.OK)
+            for _ in range(database_size):
+                validate_response_code(api.post_add(json=Bears.SIMPLE_BEAR_JSON), HTTPCodes.OK)
+            chaos_proxy.set_fault('GET /bear', Fault(bandwidth=bandwidth))
+
+            try:
+                started = time.perf_counter()
+                resp_get = api.get_all()
+                elapsed = time.perf_counter() - started
+            finally:
+                chaos_proxy.clear()
+                validate_response_code(api.delete_all(), HTTPCodes.OK)
+            validate_response_code(resp_get, HTTPCodes.OK)
+            assert len(resp_get.json()) == database_size, "Result Database size doesn't match with expected"
+        assert elapsed >= len(resp_get.content) / bandwidth * 0.9, \
+            'Bandwidth was not limited: {0} bytes in {1:.3f} s'.format(len(resp_get.content), elapsed)
@@ -1,5 +1,4 @@
 """REST API Autotest"""
-import requests
 import pytest
 import allure
 import copy
@@ -8,7 +7,10 @@ import sys
 sys.path.append(os.getcwd())
 
 from api import ApiClient, validate_response_code
-from constants import DockerConstants, HTTPCodes, Bears
+from constants import HTTPCodes, Bears
+from pairwise import parametrize_matrix
+from state import DatabaseState
+from validation import bear_contract
 
 # Test data
 bear_types_positive = ['POLAR', 'BROWN', 'BLACK', 'GUMMY']
@@ -29,9 +31,13 @@ headers = ['application/xml', 'application/zip', 'application/foobar']
 
 
 @pytest.fixture(scope='class')
-def api_bear() -> ApiClient:
-    """API fixture"""
-    return ApiClient(base_url=DockerConstants.BASE_URL)
+def api_bear(alaska, api_hooks) -> ApiClient:
+    """API fixture bound to the service under test of the current worker"""
+    base_url, transport = alaska
+    with ApiClient(base_url=base_url, transport=transport) as client:
+        for hook in api_hooks:
+            client.add_hook(hook)
+        yield client
 
 
 @pytest.fixture(scope='class')
@@ -63,41 +69,42 @@ def clear(api_bear):
     validate_response_code(resp_delete, HTTPCodes.OK)
 
 
+@pytest.fixture(scope='class')
+def db_state(api_bear) -> DatabaseState:
+    """bulk seeding, snapshots and restore of database records"""
+    return DatabaseState(api_bear)
+
+
+@pytest.fixture(scope='class')
+def simple_bear_snapshot(db_state) -> dict:
+    """create simple bear once per class and capture its record"""
+    return db_state.capture(db_state.seed([Bears.SIMPLE_BEAR_JSON]))
+
+
 @pytest.fixture()
-def create_simple_bear(api_bear) -> tuple:
-    """create simple bear before test"""
-    bear_id = api_bear.post_add(json=Bears.SIMPLE_BEAR_JSON).json()
-    bear_json = copy.copy(Bears.SIMPLE_BEAR_JSON)
-    bear_json.update({'bear_id': bear_id})
-    return bear_id, bear_json
+def create_simple_bear(db_state, simple_bear_snapshot) -> tuple:
+    """simple bear created once per class, read back and restored to its snapshot before every test"""
+    db_state.restore(simple_bear_snapshot, verify=True)
+    (bear_id, bear_json), = simple_bear_snapshot.items()
+    return bear_id, copy.copy(bear_json)
 
 
-@pytest.mark.usefixtures('use_docker', 'smoke_check', 'clear')
+@pytest.mark.usefixtures('alaska', 'smoke_check', 'clear')
 @allure.feature('Test suit for Alaska test')
 class TestAlaska:
 
-    @pytest.mark.parametrize('bear_type', bear_types_positive, ids=bear_types_positive)
-    @pytest.mark.parametrize('bear_name', bear_names_positive, ids=bear_names_positive)
-    @pytest.mark.parametrize('bear_age', bear_ages_positive, ids=bear_ages_positive)
+    @parametrize_matrix('bear_type, bear_name, bear_age', [bear_types_positive, bear_names_positive,
+                                                           bear_ages_positive])
     @allure.feature('Positive bear POST create + GET read specific bear')
     def test_positive_create_get_bear(self, api_bear, bear_type: str, bear_name: str, bear_age: int or float) -> None:
         json_expected = {'bear_type': bear_type, 'bear_name': bear_name, 'bear_age': bear_age}
         resp_post = api_bear.post_add(json=json_expected)
 
         validate_response_code(resp_post, HTTPCodes.OK)
-        json_expected.update({'bear_name': bear_name.upper(), 'bear_age': float(bear_age), 'bear_id': resp_post.json()})
-
-        resp_get = api_bear.get_one(bear_id=resp_post.json())
-        json_result = resp_get.json()
-        assert json_result == json_expected, "Result dictionary doesn't match with expected"
-        assert isinstance(json_result['bear_name'], str), 'Incorrect bear_name type: {}'\
-            .format(type(json_result['bear_name']))
-        assert isinstance(json_result['bear_age'], float), 'Incorrect bear_age type: {}'\
-            .format(type(json_result['bear_age']))
-        assert isinstance(json_result['bear_id'], int), 'Incorrect bear_id type: {}'\
-            .format(type(json_result['bear_id']))
-        assert isinstance(json_result['bear_type'], str), 'Incorrect bear_type type: {}'\
-            .format(type(json_result['bear_type']))
+        bear_id = resp_post.json()
+
+        json_result = api_bear.get_one(bear_id=bear_id).json()
+        bear_contract.assert_valid([json_result], {bear_id: bear_contract.expected(json_expected, bear_id)})
 
     @allure.feature('Check proper bear bear_id incrementation')
     def test_positive_bear_id_incrementation_create_bear(self, api_bear) -> None:
@@ -181,16 +188,14 @@ class TestAlaska:
         validate_response_code(resp_delete, HTTPCodes.NOT_FOUND)
 
     @allure.feature('Positive check Get All + Delete All bears')
-    def test_positive_get_all_delete_all_bears(self, api_bear) -> None:
-        # create bears
-        json_expected = copy.copy(Bears.SIMPLE_BEAR_JSON)
-        for num in range(database_size):
-            api_bear.post_add(json=json_expected).json()
+    def test_positive_get_all_delete_all_bears(self, api_bear, db_state) -> None:
+        # create bears as one concurrent batch
+        bear_ids = db_state.seed([Bears.SIMPLE_BEAR_JSON] * database_size)
 
-        # check get all bears
-        resp_get = api_bear.get_all()
-        validate_response_code(resp_get, HTTPCodes.OK)
-        assert len(resp_get.json()) == database_size, "Result Database size doesn't match with expected"
+        # check get all bears, records are decoded from the streamed body and validated in one pass
+        result = bear_contract.assert_valid(api_bear.iter_all(), {
+            bear_id: bear_contract.expected(Bears.SIMPLE_BEAR_JSON, bear_id) for bear_id in bear_ids})
+        assert result['count'] == database_size, "Result Database size doesn't match with expected"
 
         # check delete all bears
         resp_delete = api_bear.delete_all()
@@ -199,21 +204,35 @@ class TestAlaska:
         validate_response_code(resp_get, HTTPCodes.OK)
         assert len(resp_get.json()) == 0, "Database isn't empty"
 
-    @pytest.mark.parametrize('bear_type', bear_types_positive, ids=bear_types_positive)
-    @pytest.mark.parametrize('bear_name', bear_names_positive, ids=bear_names_positive)
-    @pytest.mark.parametrize('bear_age', bear_ages_positive, ids=bear_ages_positive)
+    @pytest.mark.parametrize('header', headers, ids=lambda headers: '{}'.format(headers))
+    @allure.feature('Negative http incorrect header check')
+    def test_negative_use_incorrect_header(self, api_bear, header: str) -> None:
+        api_bear.delete_all()
+        resp_post = api_bear.post_add(headers={"Content-type": header}, json=Bears.SIMPLE_BEAR_JSON)
+
+        assert resp_post.text != 1, "record unexpectedly created"
+        validate_response_code(resp_post, HTTPCodes.OK, should_be_equal=False)
+        validate_response_code(resp_post, HTTPCodes.BAD_REQUEST)
+
+
+@pytest.mark.usefixtures('alaska', 'smoke_check')
+@allure.feature('Update test suit for Alaska test')
+class TestAlaskaUpdate:
+    """Update tests share one simple bear per class, it is restored before every test instead of clearing database"""
+
+    @parametrize_matrix('bear_type, bear_name, bear_age', [bear_types_positive, bear_names_positive,
+                                                           bear_ages_positive])
     @allure.feature('Positive bear Update all items')
     def test_positive_update_specific_bear_all(self, api_bear, create_simple_bear, bear_type: str, bear_name: str,
                                                bear_age: int or float) -> None:
-        bear_id, json_expected = create_simple_bear
+        bear_id, _ = create_simple_bear
 
-        json_expected.update({'bear_type': bear_type, 'bear_name': bear_name.upper(), 'bear_age': float(bear_age)})
         update = {'bear_type': bear_type, 'bear_name': bear_name, 'bear_age': bear_age}
         resp_put = api_bear.put_one(bear_id=bear_id, json=update)
 
         validate_response_code(resp_put, HTTPCodes.OK)
         json_result = api_bear.get_one(bear_id=bear_id).json()
-        assert json_result == json_expected, "Result dictionary doesn't match with expected"
+        bear_contract.assert_valid([json_result], {bear_id: bear_contract.expected(update, bear_id)})
 
     @pytest.mark.parametrize('bear_type', bear_types_negative,
                              ids=lambda bear_types_negative: '{}'.format(bear_types_negative))
@@ -223,8 +242,7 @@ class TestAlaska:
 
         resp_put = api_bear.put_one(bear_id=bear_id, json={'bear_type': bear_type})
 
-        assert json_expected == api_bear.get_one(bear_id=bear_id).json(), \
-            "Result dictionary doesn't match with expected"
+        bear_contract.assert_valid([api_bear.get_one(bear_id=bear_id).json()], {bear_id: json_expected})
         validate_response_code(resp_put, HTTPCodes.OK, should_be_equal=False)
         validate_response_code(resp_put, HTTPCodes.BAD_REQUEST)
 
@@ -236,8 +254,7 @@ class TestAlaska:
 
         resp_put = api_bear.put_one(bear_id=bear_id, json={'bear_name': bear_name})
 
-        assert json_expected == api_bear.get_one(bear_id=bear_id).json(), \
-            "Result dictionary doesn't match with expected"
+        bear_contract.assert_valid([api_bear.get_one(bear_id=bear_id).json()], {bear_id: json_expected})
         validate_response_code(resp_put, HTTPCodes.OK, should_be_equal=False)
         validate_response_code(resp_put, HTTPCodes.BAD_REQUEST)
 
@@ -249,8 +266,7 @@ class TestAlaska:
 
         resp_put = api_bear.put_one(bear_id=bear_id, json={'bear_age': bear_age})
 
-        assert json_expected == api_bear.get_one(bear_id=bear_id).json(), \
-            "Result dictionary doesn't match with expected"
+        bear_contract.assert_valid([api_bear.get_one(bear_id=bear_id).json()], {bear_id: json_expected})
         validate_response_code(resp_put, HTTPCodes.OK, should_be_equal=False)
         validate_response_code(resp_put, HTTPCodes.BAD_REQUEST)
 
@@ -261,17 +277,6 @@ class TestAlaska:
         print(json_expected)
         resp_put = api_bear.put_one(bear_id=bear_id, json={'bear_id': bear_id_negative})
 
-        assert json_expected == api_bear.get_one(bear_id=bear_id).json(), \
-            "Result dictionary doesn't match with expected"
+        bear_contract.assert_valid([api_bear.get_one(bear_id=bear_id).json()], {bear_id: json_expected})
         validate_response_code(resp_put, HTTPCodes.OK, should_be_equal=False)
         validate_response_code(resp_put, HTTPCodes.BAD_REQUEST)
-
-    @pytest.mark.parametrize('header', headers, ids=lambda headers: '{}'.format(headers))
-    @allure.feature('Negative http incorrect header check')
-    def test_negative_use_incorrect_header(self, api_bear, header: str) -> None:
-        api_bear.delete_all()
-        resp_post = api_bear.post_add(headers={"Content-type": header}, json=Bears.SIMPLE_BEAR_JSON)
-
-        assert resp_post.text != 1, "record unexpectedly created"
-        validate_response_code(resp_post, HTTPCodes.OK, should_be_equal=False)
-        validate_response_code(resp_post, HTTPCodes.BAD_REQUEST)
@@ -0,0 +1,335 @@
+"""Duration history test scheduler pytest plugin
+
+With --schedule every test (setup, call and teardown without class/module/session fixtures) and every
+fixture setup is timed, the timings are smoothed into SchedulerConstants.HISTORY and used by later runs:
+
+* tests of a class (or of a module) stay together, so its shared fixtures (smoke_check,
+  simple_bear_snapshot) are set up once; classes with smoke fixtures or smoke-marked tests run first,
+  then classes with tests failed in the last run, then the cheapest ones
+* with pytest-xdist classes are handed to workers longest first, a class longer than the ideal shard
+  (expected session time / workers) is split, so the slowest worker does not set the wall-clock time:
+
+    python3.6 -m pytest rest_api_test.py --schedule              # record the history
+    python3.6 -m pytest rest_api_test.py --schedule -n 4         # balance workers by expected duration
+"""
+
+import json
+import math
+import os
+import statistics
+import sys
+import time
+import warnings
+import pytest
+sys.path.append(os.getcwd())
+
+from constants import SchedulerConstants
+
+
+def scope_of(nodeid):
+    """Scope of a test sharing its class and module fixtures, the same as pytest-xdist --dist loadscope
+
+    :param nodeid: test node id
+    :type nodeid: str
+    :return: node id of the class, or of the module for test functions
+    :rtype: str
+    """
+    return nodeid.rsplit('::', 1)[0]
+
+
+def module_of(nodeid):
+    """Module of a test
+
+    :param nodeid: test node id
+    :type nodeid: str
+    :return: node id of the module
+    :rtype: str
+    """
+    return nodeid.split('::', 1)[0]
+
+
+class DurationHistory:
+    """Exponentially smoothed durations of tests, fixture setups and shared fixtures of scopes"""
+
+    def __init__(self, path=SchedulerConstants.HISTORY):
+        """DurationHistory init
+
+        :param path: history JSON file, empty history if it does not exist
+        :type path: str
+        :return: None
+        """
+        self.path = path
+        self.tests = {}
+        self.fixtures = {}
+        self.scopes = {}
+        self.failed = set()
+        if os.path.exists(path):
+            with open(path) as file:
+                data = json.load(file)
+            self.tests, self.fixtures, self.scopes = data['tests'], data['fixtures'], data['scopes']
+            self.failed = set(data['failed'])
+        self._default = statistics.median(self.tests.values()) if self.tests else SchedulerConstants.DEFAULT_DURATION
+
+    def duration(self, nodeid):
+        """Expected duration of the test without shared fixtures, median of known tests for a new one
+
+        :rtype: float
+        """
+        return self.tests.get(nodeid, self._default)
+
+    def shared(self, scope):
+        """Expected setup duration of class and module fixtures of the scope
+
+        :rtype: float
+        """
+        return self.scopes.get(scope, 0.0)
+
+    @staticmethod
+    def _smooth(history, current):
+        alpha = SchedulerConstants.SMOOTHING
+        for key, value in current.items():
+            history[key] = alpha * value + (1 - alpha) * history[key] if key in history else value
+
+    def update(self, run):
+        """Smooth timings of a run into the history, tests not run keep their durations
+
+        :param run: 'tests' and 'fixtures'/'scopes' (name -> [total seconds, setups]) and 'failed' of the run
+        :type run: dict
+        :return: None
+        """
+        self._smooth(self.tests, run['tests'])
+        for history, current in ((self.fixtures, run['fixtures']), (self.scopes, run['scopes'])):
+            self._smooth(history, {key: total / count for key, (total, count) in current.items()})
+        self.failed = (self.failed - set(run['tests'])) | set(run['failed'])
+
+    def save(self):
+        """Write history to its file
+
+        :return: None
+        """
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        with open(self.path, 'w') as file:
+            json.dump({'tests': self.tests, 'fixtures': self.fixtures, 'scopes': self.scopes,
+                       'failed': sorted(self.failed)}, file, indent=2, sort_keys=True)
+
+
+def is_smoke(item):
+    """Smoke test: marked with SchedulerConstants.SMOKE_MARKER or using one of SchedulerConstants.SMOKE_FIXTURES
+
+    :rtype: bool
+    """
+    return item.get_closest_marker(SchedulerConstants.SMOKE_MARKER) is not None or \
+        any(name in SchedulerConstants.SMOKE_FIXTURES for name in item.fixturenames)
+
+
+def order_items(items, history):
+    """Collection order by the history, tests of a module and of a class stay together
+
+    :param items: collected test items
+    :type items: list
+    :param history: duration history
+    :type history: DurationHistory
+    :return: items, smoke, failed in the last run and cheapest modules, classes and tests first
+    :rtype: list
+    """
+    def key(group):
+        return (not any(is_smoke(item) for item in group), not any(item.nodeid in history.failed for item in group),
+                sum(history.duration(item.nodeid) for item in group) +
+                sum(history.shared(scope) for scope in {scope_of(item.nodeid) for item in group}))
+
+    def test_key(item):
+        return (item.get_closest_marker(SchedulerConstants.SMOKE_MARKER) is None, item.nodeid not in history.failed,
+                history.duration(item.nodeid))
+
+    modules = {}
+    for item in items:
+        modules.setdefault(module_of(item.nodeid), {}).setdefault(scope_of(item.nodeid), []).append(item)
+    ordered = []
+    for scopes in sorted(modules.values(), key=lambda scopes: key([item for group in scopes.values()
+                                                                    for item in group])):
+        for group in sorted(scopes.values(), key=key):
+            ordered.extend(sorted(group, key=test_key))
+    return ordered
+
+
+def plan_units(nodeids, history, workers):
+    """Work units of pytest-xdist workers: tests of a scope run on one worker, so its shared fixtures are set up
+    once, unless the scope is longer than the ideal shard; then it is split into consecutive parts, each one
+    setting up the shared fixtures again
+
+    :param nodeids: collected test node ids in collection order
+    :type nodeids: list
+    :param history: duration history
+    :type history: DurationHistory
+    :param workers: number of workers
+    :type workers: int
+    :return: nodeid -> unit, units in assignment order (failed in the last run, then longest first),
+        unit -> expected seconds
+    :rtype: tuple
+    """
+    scopes = {}
+    for nodeid in nodeids:
+        scopes.setdefault(scope_of(nodeid), []).append(nodeid)
+    total = sum(history.duration(nodeid) for nodeid in nodeids) + sum(history.shared(scope) for scope in scopes)
+    target = total / max(workers, 1)
+
+    unit_of, costs, failed = {}, {}, set()
+    for scope, members in scopes.items():
+        shared = history.shared(scope)
+        duration = sum(history.duration(nodeid) for nodeid in members)
+        parts = 1
+        if shared + duration > target > shared:
+            parts = min(math.ceil(duration / (target - shared)), len(members), workers)
+        elapsed = 0.0
+        for nodeid in members:
+            part = min(int(elapsed * parts / duration), parts - 1) if duration else 0
+            unit = scope if parts == 1 else '{0}[{1}/{2}]'.format(scope, part + 1, parts)
+            unit_of[nodeid] = unit
+            costs[unit] = costs.get(unit, shared) + history.duration(nodeid)
+            if nodeid in history.failed:
+                failed.add(unit)
+            elapsed += history.duration(nodeid)
+    order = sorted(costs, key=lambda unit: (unit not in failed, -costs[unit]))
+    return unit_of, order, costs
+
+
+class Scheduler:
+    """Plugin registered on the controller and on every worker: workers time tests and fixtures and order
+    their collection, the controller merges the timings into the history and schedules the workers"""
+
+    def __init__(self, config):
+        """Scheduler init
+
+        :param config: pytest config
+        :return: None
+        """
+        self.config = config
+        self.history = DurationHistory(config.getoption('--schedule-history'))
+        self.controller = not hasattr(config, 'workerinput') and \
+            config.getoption('dist', 'no') != 'no' and bool(config.getoption('tx', None))
+        self.tests = {}
+        self.fixtures = {}
+        self.scopes = {}
+        self.failed = []
+        self.scheduling = None
+        self._children = []
+        self._shared = 0.0
+        self._scope_shared = 0.0
+
+    def current_run(self):
+        """Timings of the current run
+
+        :return: 'tests' (nodeid -> seconds), 'fixtures' and 'scopes' (name -> [total seconds, setups]), 'failed'
+        :rtype: dict
+        """
+        return {'tests': self.tests, 'fixtures': self.fixtures, 'scopes': self.scopes, 'failed': self.failed}
+
+    def merge(self, run):
+        """Merge timings of a worker run
+
+        :param run: current_run of the worker
+        :type run: dict
+        :return: None
+        """
+        self.tests.update(run['tests'])
+        for merged, current in ((self.fixtures, run['fixtures']), (self.scopes, run['scopes'])):
+            for name, (total, count) in current.items():
+                merged_total, merged_count = merged.get(name, (0.0, 0))
+                merged[name] = [merged_total + total, merged_count + count]
+        self.failed.extend(run['failed'])
+
+    @staticmethod
+    def _add(timings, name, seconds):
+        total, count = timings.get(name, (0.0, 0))
+        timings[name] = [total + seconds, count + 1]
+
+    @pytest.hookimpl(trylast=True)
+    def pytest_collection_modifyitems(self, items):
+        items[:] = order_items(items, self.history)
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_fixture_setup(self, fixturedef):
+        self._children.append(0.0)
+        started = time.perf_counter()
+        yield
+        elapsed = time.perf_counter() - started
+        own = elapsed - self._children.pop()
+        if self._children:
+            self._children[-1] += elapsed
+        self._add(self.fixtures, fixturedef.argname, own)
+        if fixturedef.scope != 'function':
+            self._shared += own
+            if fixturedef.scope in SchedulerConstants.SHARED_SCOPES:
+                self._scope_shared += own
+
+    @pytest.hookimpl(tryfirst=True)
+    def pytest_runtest_setup(self):
+        self._shared = self._scope_shared = 0.0
+
+    def pytest_runtest_logreport(self, report):
+        if self.controller:
+            return
+        duration = report.duration
+        if report.when == 'setup':
+            duration -= self._shared
+            if self._scope_shared:
+                self._add(self.scopes, scope_of(report.nodeid), self._scope_shared)
+        self.tests[report.nodeid] = self.tests.get(report.nodeid, 0.0) + max(duration, 0.0)
+        if report.failed:
+            self.failed.append(report.nodeid)
+
+    @pytest.hookimpl(tryfirst=True, optionalhook=True)
+    def pytest_xdist_make_scheduler(self, config, log):
+        if config.getoption('dist') == 'each':
+            return None
+        # pytest-xdist is imported only by --schedule -n runs
+        from cost_scheduling import CostScheduling, xdist_version
+
+        lowest, highest = SchedulerConstants.XDIST_VERSIONS
+        if not lowest <= xdist_version() < highest:
+            warnings.warn(pytest.PytestWarning('--schedule supports pytest-xdist from {0}.{1} below {2}.{3}, workers '
+                                               'are scheduled by --dist {4}'.format(*lowest, *highest,
+                                                                                    config.getoption('dist'))))
+            return None
+        self.scheduling = CostScheduling(config, log, self.history)
+        return self.scheduling
+
+    @pytest.hookimpl(optionalhook=True)
+    def pytest_testnodedown(self, node, error):
+        run = node.workeroutput.get('scheduler')
+        if run is not None:
+            self.merge(run)
+
+    def pytest_sessionfinish(self, session):
+        if hasattr(self.config, 'workerinput'):
+            # pytest-xdist worker: timings are merged by the controller in pytest_testnodedown
+            self.config.workeroutput['scheduler'] = self.current_run()
+        elif self.tests:
+            self.history.update(self.current_run())
+            self.history.save()
+
+    def pytest_terminal_summary(self, terminalreporter):
+        if not self.tests:
+            return
+        terminalreporter.write_sep('=', 'scheduler: {0}'.format(self.history.path))
+        fixtures = sorted(self.history.fixtures.items(), key=lambda item: -item[1])[:SchedulerConstants.TOP_FIXTURES]
+        terminalreporter.write_line('{0} tests timed, slowest fixture setups: {1}'.format(
+            len(self.tests), ', '.join('{0} {1:.2f} ms'.format(name, seconds * 1000) for name, seconds in fixtures)))
+        if self.scheduling is not None and self.scheduling.loads:
+            terminalreporter.write_line('expected worker load: ' + ', '.join(
+                '{0} {1:.2f} s'.format(worker, load) for worker, load in sorted(self.scheduling.loads.items())))
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup('schedule', 'duration history test scheduler')
+    group.addoption('--schedule', action='store_true', default=False,
+                    help='time tests and fixtures, order tests and balance pytest-xdist workers by their history')
+    group.addoption('--schedule-history', default=SchedulerConstants.HISTORY, help='duration history file')
+
+
+def pytest_configure(config):
+    config.addinivalue_line('markers', '{0}: fail-fast test run before the other tests of its class with --schedule'
+                            .format(SchedulerConstants.SMOKE_MARKER))
+    if config.getoption('--schedule'):
+        config.scheduler = Scheduler(config)
+        config.pluginmanager.register(config.scheduler, 'scheduler_state')
@@ -0,0 +1,306 @@
+"""Soak / endurance run for Alaska REST API
+
+Drives sustained CRUD traffic through ApiClient and every interval writes a time-series row with client latency,
+throughput, bear_id counter behaviour and resource usage of the container under test (docker stats):
+
+    python3.6 soak.py --duration 14400 --interval 60 --workers 8 --rate 200
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import threading
+import time
+import docker
+sys.path.append(os.getcwd())
+
+from api import ApiClient
+from benchmark import Benchmark
+from constants import DockerConstants, HTTPCodes, BenchmarkConstants, SoakConstants
+from docker_utils import get_host_port, sample_container
+from hooks import summarize
+
+
+def slope_per_hour(points):
+    """Least squares slope of (elapsed seconds, value) points
+
+    :param points: (elapsed_s, value) pairs, None values are skipped
+    :type points: list
+    :return: value change per hour, None for less than two points
+    :rtype: float
+    """
+    points = [(x, y) for x, y in points if y is not None]
+    if len(points) < 2:
+        return None
+    mean_x = sum(x for x, _ in points) / len(points)
+    mean_y = sum(y for _, y in points) / len(points)
+    denominator = sum((x - mean_x) ** 2 for x, _ in points)
+    if not denominator:
+        return None
+    return sum((x - mean_x) * (y - mean_y) for x, y in points) / denominator * 3600
+
+
+class BearIdTracker:
+    """Checks that bear_ids returned by POST are unique and dense, one byte per id"""
+
+    def __init__(self):
+        """BearIdTracker init
+
+        :return: None
+        """
+        self._lock = threading.Lock()
+        self._first = None
+        self._seen = bytearray()
+        self.count = 0
+        self.duplicates = 0
+        self.max_id = None
+
+    def add(self, bear_id):
+        """Record bear_id allocated by the service
+
+        :param bear_id: Bear bear_id
+        :type bear_id: int
+        :return: None
+        """
+        with self._lock:
+            if self._first is None:
+                self._first = bear_id
+            if bear_id < self._first:
+                self._seen[:0] = bytearray(self._first - bear_id)
+                self._first = bear_id
+            index = bear_id - self._first
+            if index >= len(self._seen):
+                self._seen.extend(bytearray(index + 1 - len(self._seen)))
+            if self._seen[index]:
+                self.duplicates += 1
+            self._seen[index] = 1
+            self.count += 1
+            self.max_id = bear_id if self.max_id is None else max(self.max_id, bear_id)
+
+    @property
+    def gaps(self):
+        """Number of bear_ids between the first and the last allocated ones that were never returned
+
+        :rtype: int
+        """
+        with self._lock:
+            return len(self._seen) - sum(self._seen) if self._seen else 0
+
+
+class Soak(Benchmark):
+    """Long-running CRUD traffic with periodic time-series sampling"""
+
+    def __init__(self, api, mix, workers, duration, interval, output, container=None, rate=None,
+                 seed_size=BenchmarkConstants.SEED_SIZE):
+        """Soak init
+
+        :param api: API client shared by workers, its pool size should be >= workers
+        :type api: ApiClient
+        :param mix: operation name -> weight, see BenchmarkConstants.MIXES
+        :type mix: dict
+        :param workers: number of worker threads
+        :type workers: int
+        :param duration: soak duration in seconds
+        :type duration: float
+        :param interval: sampling interval in seconds
+        :type interval: float
+        :param output: time-series JSON lines file
+        :type output: str
+        :param container: container under test, resource usage is not sampled if None
+        :type container: docker.models.containers.Container
+        :param rate: target total request rate per second, unlimited if None
+        :type rate: float
+        :param seed_size: number of bears created before the run
+        :type seed_size: int
+        :return: None
+        """
+        super().__init__(api, mix, workers, duration, rate, seed_size)
+        self._interval = interval
+        self._output = output
+        self._container = container
+        self._window = []
+        self._stop = threading.Event()
+        self.bear_ids = BearIdTracker()
+        self.rows = []
+
+    def _call(self, operation, rnd):
+        resp = super()._call(operation, rnd)
+        if operation == 'post_add' and resp.status_code == HTTPCodes.OK:
+            self.bear_ids.add(resp.json())
+        return resp
+
+    def _worker(self, index, start, stop):
+        rnd = random.Random(index)
+        interval = self._workers / self._rate if self._rate else 0
+        next_send = start + index * interval / self._workers
+        while not self._stop.is_set():
+            if interval:
+                delay = next_send - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                next_send += interval
+            if time.perf_counter() >= stop:
+                break
+            operation = rnd.choices(self._operations, self._weights)[0]
+            sent = time.perf_counter()
+            try:
+                failed = self._call(operation, rnd).status_code != HTTPCodes.OK
+            except Exception:
+                # Any failure counts, the worker thread keeps running
+                failed = True
+            with self._lock:
+                self._window.append((operation, time.perf_counter() - sent, failed))
+
+    def _sample(self, start, window_start):
+        """Time-series row of the finished window
+
+        :return: row
+        :rtype: dict
+        """
+        with self._lock:
+            window, self._window = self._window, []
+            database_size = len(self._bear_ids)
+        now = time.perf_counter()
+        row = {'time': time.strftime('%Y-%m-%dT%H:%M:%S'), 'elapsed_s': now - start}
+        row.update(summarize([latency for _, latency, _ in window], sum(failed for _, _, failed in window),
+                             now - window_start))
+        row['endpoints_p95_ms'] = {}
+        for operation in self._operations:
+            latencies = [latency for name, latency, _ in window if name == operation]
+            if latencies:
+                row['endpoints_p95_ms'][BenchmarkConstants.ENDPOINTS[operation]] = \
+                    summarize(latencies, 0, 1)['p95_ms']
+        row.update({'bear_id_max': self.bear_ids.max_id, 'bear_ids_allocated': self.bear_ids.count,
+                    'bear_id_duplicates': self.bear_ids.duplicates, 'bear_id_gaps': self.bear_ids.gaps,
+                    'database_size': database_size})
+        if self._container is not None:
+            try:
+                row.update(sample_container(self._container))
+            except docker.errors.APIError as ex:
+                row['container_error'] = str(ex)
+        return row
+
+    def run(self):
+        """Seed the database, run the traffic and sample every interval
+
+        :return: summary with drift of latency and resource usage per hour
+        :rtype: dict
+        """
+        self.seed()
+        for bear_id in self._bear_ids:
+            self.bear_ids.add(bear_id)
+
+        os.makedirs(os.path.dirname(self._output) or '.', exist_ok=True)
+        start = time.perf_counter()
+        stop = start + self._duration
+        threads = [threading.Thread(target=self._worker, args=(index, start, stop), daemon=True)
+                   for index in range(self._workers)]
+        for thread in threads:
+            thread.start()
+        with open(self._output, 'w') as file:
+            window_start = start
+            try:
+                while time.perf_counter() < stop:
+                    time.sleep(max(min(window_start + self._interval, stop) - time.perf_counter(), 0))
+                    row = self._sample(start, window_start)
+                    window_start = time.perf_counter()
+                    self.rows.append(row)
+                    file.write(json.dumps(row) + '\n')
+                    file.flush()
+                    print('{0:>8.0f}s {1:>8.1f} rps  p95 {2} ms  errors {3}  bear_id_max {4}  memory {5}'.format(
+                        row['elapsed_s'], row['throughput_rps'],
+                        '{0:.2f}'.format(row['p95_ms']) if row['p95_ms'] is not None else '-', row['errors'],
+                        row['bear_id_max'], row.get('memory_bytes', '-')))
+            finally:
+                self._stop.set()
+                for thread in threads:
+                    thread.join()
+        return self.summary()
+
+    def summary(self):
+        """Drift of the time series
+
+        :rtype: dict
+        """
+        def series(key):
+            return [(row['elapsed_s'], row.get(key)) for row in self.rows]
+
+        first, last = (self.rows[0], self.rows[-1]) if self.rows else ({}, {})
+        return {
+            'windows': len(self.rows),
+            'p95_ms_first': first.get('p95_ms'), 'p95_ms_last': last.get('p95_ms'),
+            'p95_ms_per_hour': slope_per_hour(series('p95_ms')),
+            'throughput_rps_per_hour': slope_per_hour(series('throughput_rps')),
+            'memory_bytes_first': first.get('memory_bytes'), 'memory_bytes_last': last.get('memory_bytes'),
+            'memory_bytes_per_hour': slope_per_hour(series('memory_bytes')),
+            'open_fds_per_hour': slope_per_hour(series('open_fds')),
+            'bear_ids_allocated': self.bear_ids.count, 'bear_id_max': self.bear_ids.max_id,
+            'bear_id_duplicates': self.bear_ids.duplicates, 'bear_id_gaps': self.bear_ids.gaps,
+        }
+
+
+def find_container(base_url, name=None):
+    """Container under test: by name or id, otherwise the running container of the tested image
+    publishing the port of base_url
+
+    :param base_url: base URL of the service
+    :type base_url: str
+    :param name: container name or id
+    :type name: str
+    :return: container or None when docker is not available or nothing matches
+    :rtype: docker.models.containers.Container
+    """
+    try:
+        client = docker.from_env()
+        if name:
+            return client.containers.get(name)
+        port = int(base_url.rsplit(':', 1)[1])
+        for container in client.containers.list(filters={'status': 'running', 'ancestor': '{0}:{1}'.format(
+                DockerConstants.DOCKER_IMAGE, DockerConstants.DOCKER_TAG)}):
+            if get_host_port(container, DockerConstants.PORT) == port:
+                return container
+    except (docker.errors.DockerException, ValueError, IndexError, KeyError, TypeError):
+        pass
+    return None
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Alaska REST API soak run')
+    parser.add_argument('--base-url', default=DockerConstants.BASE_URL)
+    parser.add_argument('--container', default=None, help='container name or id, found by image and port if omitted')
+    parser.add_argument('--mix', default='crud', choices=sorted(BenchmarkConstants.MIXES))
+    parser.add_argument('--workers', type=int, default=BenchmarkConstants.WORKERS)
+    parser.add_argument('--duration', type=float, default=SoakConstants.DURATION, help='seconds')
+    parser.add_argument('--interval', type=float, default=SoakConstants.INTERVAL, help='sampling interval, seconds')
+    parser.add_argument('--rate', type=float, default=SoakConstants.RATE, help='target total requests per second')
+    parser.add_argument('--seed-size', type=int, default=BenchmarkConstants.SEED_SIZE)
+    parser.add_argument('--output', default=SoakConstants.OUTPUT, help='time-series JSON lines file')
+    parser.add_argument('--summary', default=SoakConstants.SUMMARY, help='summary JSON file')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    container = find_container(args.base_url, args.container)
+    if container is None:
+        print('Container under test is not found, resource usage is not sampled')
+    with ApiClient(base_url=args.base_url, pool_size=args.workers) as api:
+        api.delete_all()
+        summary = Soak(api, BenchmarkConstants.MIXES[args.mix], args.workers, args.duration, args.interval,
+                       args.output, container, args.rate, args.seed_size).run()
+        api.delete_all()
+    summary.update({'image': '{0}:{1}'.format(DockerConstants.DOCKER_IMAGE, DockerConstants.DOCKER_TAG),
+                    'container': container.name if container is not None else None, 'mix': args.mix,
+                    'workers': args.workers, 'target_rate': args.rate, 'duration_s': args.duration,
+                    'time_series': args.output})
+    os.makedirs(os.path.dirname(args.summary) or '.', exist_ok=True)
+    with open(args.summary, 'w') as file:
+        json.dump(summary, file, indent=2)
+    print(json.dumps(summary, indent=2))
+    return summary
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+"""Soak run smoke tests against the fake Alaska service over local HTTP"""
+import json
+import pytest
+import allure
+import os
+import sys
+sys.path.append(os.getcwd())
+
+pytest.importorskip('docker')
+
+from api import ApiClient
+from constants import BenchmarkConstants
+from fake_alaska import FakeAlaskaServer
+from soak import BearIdTracker, Soak, slope_per_hour
+
+# Test data
+workers = 2
+
+duration = 1.0
+
+interval = 0.25
+
+rate = 200
+
+seed_size = 10
+
+summary_keys = ['windows', 'p95_ms_first', 'p95_ms_last', 'p95_ms_per_hour', 'throughput_rps_per_hour',
+                'memory_bytes_first', 'memory_bytes_last', 'memory_bytes_per_hour', 'open_fds_per_hour',
+                'bear_ids_allocated', 'bear_id_max', 'bear_id_duplicates', 'bear_id_gaps']
+
+
+@pytest.fixture()
+def api_fake():
+    """API interfaces of a fresh fake service over local HTTP"""
+    with FakeAlaskaServer() as server, ApiClient(base_url=server.base_url, pool_size=workers) as api:
+        yield api
+
+
+def new_soak(api, output):
+    return Soak(api, BenchmarkConstants.MIXES['crud'], workers, duration, interval, output, rate=rate,
+                seed_size=seed_size)
+
+
+@allure.feature('Soak smoke tests')
+class TestSoak:
+
+    @allure.feature('Short soak run writes time-series rows and the drift summary')
+    def test_soak_run(self, api_fake, tmp_path) -> None:
+        output = str(tmp_path / 'soak.jsonl')
+        summary = new_soak(api_fake, output).run()
+        assert sorted(summary) == sorted(summary_keys)
+        assert summary['windows'] >= duration / interval - 1
+        assert summary['bear_ids_allocated'] > seed_size
+        assert (summary['bear_id_duplicates'], summary['bear_id_gaps']) == (0, 0)
+        with open(output) as file:
+            rows = [json.loads(line) for line in file]
+        assert len(rows) == summary['windows']
+        assert sum(row['requests'] for row in rows) > 0
+        assert all(row['errors'] == 0 and row['database_size'] >= 0 for row in rows)
+
+    @allure.feature('Failed calls are counted as errors and workers keep sending')
+    def test_soak_errors_counted(self, api_fake, tmp_path) -> None:
+        soak = new_soak(api_fake, str(tmp_path / 'soak.jsonl'))
+
+        def failing_call(operation, rnd):
+            raise KeyError(operation)
+
+        soak._call = failing_call
+        soak.run()
+        assert all(row['errors'] == row['requests'] for row in soak.rows)
+        assert soak.rows[-1]['requests'] > 0, 'Workers stopped after the first failure'
+
+    @allure.feature('bear_id tracker counts duplicates and gaps')
+    def test_bear_id_tracker(self) -> None:
+        tracker = BearIdTracker()
+        for bear_id in (5, 3, 7, 5):
+            tracker.add(bear_id)
+        assert (tracker.count, tracker.duplicates, tracker.gaps, tracker.max_id) == (4, 1, 2, 7)
+
+    @allure.feature('Drift slope is the least squares change per hour')
+    def test_slope_per_hour(self) -> None:
+        assert slope_per_hour([(0, 1.0), (1800, 2.0), (3600, 3.0), (10, None)]) == pytest.approx(2.0)
+        assert slope_per_hour([(0, 1.0)]) is None
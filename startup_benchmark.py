@@ -0,0 +1,122 @@
+"""Startup time benchmark of the test harness: import time of conftest.py and test modules
+(python -X importtime, pytest preloaded as in a real run) and wall time of pytest --collect-only,
+checked against StartupConstants budgets
+
+Needs Python 3.7 or newer for -X importtime, the tests themselves still run on python3.6.
+
+Usage:
+    python3.7 startup_benchmark.py --runs 5 --output reports/startup.json
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+sys.path.append(os.getcwd())
+
+from constants import StartupConstants
+
+
+def import_times(module):
+    """Import times of module and of everything it imports, in a fresh interpreter with pytest preloaded
+
+    :param module: module name
+    :type module: str
+    :return: (cumulative microseconds of the module, {imported module: self microseconds})
+    :rtype: tuple
+    """
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'import pytest; import {0}'.format(module)],
+                            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, universal_newlines=True, check=True)
+    own = {}
+    cumulative = None
+    collecting = False
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        if name.strip() == 'pytest' and not name.startswith('  '):
+            collecting = True
+            continue
+        if collecting:
+            own[name.strip()] = int(self_us)
+            if name.strip() == module:
+                cumulative = int(cumulative_us)
+    return cumulative, own
+
+
+def collect_time():
+    """Wall time of pytest --collect-only in a fresh interpreter
+
+    :return: seconds
+    :rtype: float
+    """
+    started = time.perf_counter()
+    subprocess.run([sys.executable, '-m', 'pytest', '--collect-only', '-q', '-p', 'no:cacheprovider'],
+                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
+    return time.perf_counter() - started
+
+
+def run(runs):
+    """Measure startup times, medians of runs
+
+    :param runs: number of runs of every measurement
+    :type runs: int
+    :return: results with 'over_budget' list of exceeded budgets
+    :rtype: dict
+    """
+    results = {'imports_ms': {}, 'heaviest_imports_ms': {}, 'budgets_ms': StartupConstants.BUDGETS_MS,
+               'over_budget': []}
+    heaviest = {}
+    for module in StartupConstants.MODULES:
+        samples = []
+        for _ in range(runs):
+            cumulative, own = import_times(module)
+            samples.append(cumulative / 1000)
+            for name, self_us in own.items():
+                heaviest.setdefault(name, []).append(self_us / 1000)
+        results['imports_ms'][module] = statistics.median(samples)
+    medians = ((name, statistics.median(values)) for name, values in heaviest.items())
+    results['heaviest_imports_ms'] = dict(sorted(medians, key=lambda item: -item[1])[:StartupConstants.TOP_IMPORTS])
+    results['collect_only_ms'] = statistics.median(collect_time() for _ in range(runs)) * 1000
+
+    measured = dict(results['imports_ms'], collect_only=results['collect_only_ms'])
+    for name, budget in StartupConstants.BUDGETS_MS.items():
+        if measured.get(name, 0) > budget:
+            results['over_budget'].append(name)
+    return results
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Test harness startup time benchmark')
+    parser.add_argument('--runs', type=int, default=StartupConstants.RUNS)
+    parser.add_argument('--output', default=StartupConstants.OUTPUT)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if sys.version_info < StartupConstants.MIN_PYTHON:
+        sys.exit('startup_benchmark.py needs Python {0}.{1} or newer for -X importtime, running {2}'
+                 .format(*StartupConstants.MIN_PYTHON, sys.version.split()[0]))
+    results = run(args.runs)
+    results.update({'runs': args.runs, 'started': time.strftime('%Y-%m-%dT%H:%M:%S')})
+
+    print('{0:<28}{1:>10}{2:>10}'.format('measurement', 'ms', 'budget'))
+    for name, value in sorted(results['imports_ms'].items()) + [('collect_only', results['collect_only_ms'])]:
+        budget = StartupConstants.BUDGETS_MS.get(name)
+        print('{0:<28}{1:>10.1f}{2:>10}{3}'.format(name, value, budget if budget is not None else '-',
+                                                   '  OVER BUDGET' if name in results['over_budget'] else ''))
+    print('heaviest imports (self ms): ' + ', '.join('{0} {1:.1f}'.format(name, value)
+                                                     for name, value in results['heaviest_imports_ms'].items()))
+
+    os.makedirs(os.path.dirname(args.output) or '.', exist_ok=True)
+    with open(args.output, 'w') as file:
+        json.dump(results, file, indent=2)
+    return 1 if results['over_budget'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,143 @@
+"""Database state management: bulk seeding, snapshots and restore between tests"""
+
+import os
+import sys
+sys.path.append(os.getcwd())
+
+from constants import AsyncConstants, Bears, HTTPCodes
+from validation import diff_records
+
+
+class DatabaseState:
+    """Seeds bears in concurrent batches, captures snapshots of their records and restores them.
+
+    A snapshot is a dict bear_id -> record as returned by the service. Seeding and batch reads go through
+    AsyncApiClient, or sequentially through ApiClient when it serves an in-process transport (fake backend)
+    """
+
+    def __init__(self, api, concurrency=AsyncConstants.CONCURRENCY):
+        """DatabaseState init
+
+        :param api: API client of the service
+        :type api: ApiClient
+        :param concurrency: maximum number of in-flight requests of batches
+        :type concurrency: int
+        :return: None
+        """
+        self._api = api
+        self._concurrency = concurrency
+
+    def _batch(self, method, args):
+        """Run AsyncApiClient batch method, or the matching ApiClient calls for in-process transport
+
+        :param method: name of AsyncApiClient batch method: create_bears, get_bears, put_bears or delete_bears
+        :type method: str
+        :param args: batch items
+        :type args: list
+        :return: responses in the order of args
+        :rtype: list
+        """
+        if not args:
+            return []
+        if self._api.transport is not None:
+            if method == 'create_bears':
+                return [self._api.post_add(json=bear_json) for bear_json in args]
+            if method == 'get_bears':
+                return [self._api.get_one(bear_id=bear_id) for bear_id in args]
+            if method == 'put_bears':
+                return [self._api.put_one(bear_id=bear_id, json=bear_json) for bear_id, bear_json in args]
+            return [self._api.delete_one(bear_id=bear_id) for bear_id in args]
+
+        # aiohttp is imported only for HTTP services
+        from async_api import AsyncApiClient, run_async
+
+        async def batch():
+            async with AsyncApiClient(base_url=self._api.base_url, concurrency=self._concurrency) as client:
+                return await getattr(client, method)(args)
+
+        return run_async(batch())
+
+    def seed(self, bear_jsons):
+        """Create bears as one concurrent batch
+
+        :param bear_jsons: bear records to create
+        :type bear_jsons: iterable
+        :return: bear_ids in the order of bear_jsons
+        :rtype: list
+        :raises RuntimeError: some record was not created
+        """
+        responses = self._batch('create_bears', list(bear_jsons))
+        failed = [resp.status_code for resp in responses if resp.status_code != HTTPCodes.OK]
+        if failed:
+            raise RuntimeError('{0} of {1} bears were not created, status codes: {2}'
+                               .format(len(failed), len(responses), sorted(set(failed))))
+        return [resp.json() for resp in responses]
+
+    def capture(self, bear_ids=None):
+        """Snapshot of records
+
+        :param bear_ids: bear_ids to capture, whole database if None
+        :type bear_ids: list
+        :return: snapshot, bear_id -> record
+        :rtype: dict
+        :raises RuntimeError: some record does not exist
+        """
+        if bear_ids is None:
+            return {record['bear_id']: record for record in self._api.iter_all()}
+        bear_ids = list(bear_ids)
+        responses = self._batch('get_bears', bear_ids)
+        missing = [bear_id for bear_id, resp in zip(bear_ids, responses) if resp.status_code != HTTPCodes.OK]
+        if missing:
+            raise RuntimeError('Bears do not exist: {0}'.format(missing))
+        return {bear_id: resp.json() for bear_id, resp in zip(bear_ids, responses)}
+
+    def verify(self, snapshot, full=True):
+        """Structured difference between snapshot and current records
+
+        :param snapshot: expected records
+        :type snapshot: dict
+        :param full: compare the whole database (also reports unexpected records), only snapshot records if False
+        :type full: bool
+        :return: {'missing': [bear_id], 'unexpected': [bear_id], 'changed': {bear_id: {field: (expected, actual)}}},
+            all empty when database matches the snapshot
+        :rtype: dict
+        """
+        if full:
+            current = self.capture()
+        else:
+            responses = self._batch('get_bears', list(snapshot))
+            current = {bear_id: resp.json() for bear_id, resp in zip(snapshot, responses)
+                       if resp.status_code == HTTPCodes.OK}
+        changed = {}
+        for bear_id, expected in snapshot.items():
+            actual = current.get(bear_id)
+            if actual is not None and actual != expected:
+                changed[bear_id] = diff_records(expected, actual)
+        return {'missing': sorted(set(snapshot) - set(current)),
+                'unexpected': sorted(set(current) - set(snapshot)),
+                'changed': changed}
+
+    def restore(self, snapshot, verify=True):
+        """Return records to the snapshot state
+
+        :param snapshot: expected records
+        :type snapshot: dict
+        :param verify: read the database and fix only the differences (also deletes unexpected records),
+            if False every snapshot record is written back without reading
+        :type verify: bool
+        :return: None
+        :raises RuntimeError: snapshot records were deleted, they cannot be recreated with the same bear_id
+        """
+        if verify:
+            diff = self.verify(snapshot)
+            if diff['missing']:
+                raise RuntimeError('Bears were deleted and cannot be restored: {0}'.format(diff['missing']))
+            self._batch('delete_bears', diff['unexpected'])
+            bear_ids = list(diff['changed'])
+        else:
+            bear_ids = list(snapshot)
+        updates = [(bear_id, {field: snapshot[bear_id][field] for field in Bears.FIELDS}) for bear_id in bear_ids]
+        failed = [bear_id for (bear_id, _), resp in zip(updates, self._batch('put_bears', updates))
+                  if resp.status_code != HTTPCodes.OK]
+        if failed:
+            raise RuntimeError('Bears were deleted or cannot be restored: {0}'.format(failed))
@@ -0,0 +1,210 @@
+"""Concurrency stress autotest: global invariants of the bear contract under parallel requests"""
+import itertools
+import random
+import string
+import pytest
+import allure
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+sys.path.append(os.getcwd())
+
+from api import ApiClient
+from constants import HTTPCodes, Bears
+from validation import bear_contract
+
+# Test data
+stress_workers = 32
+
+create_count = 1000
+
+update_count = 300
+
+contested_updates = 200
+
+mixed_database_size = 300
+
+mixed_updates = 1500
+
+mixed_creates = 200
+
+seed = 0
+
+
+def unique_bear(number):
+    """Full bear record with a name unique for the number
+
+    :param number: record number
+    :type number: int
+    :return: bear json
+    :rtype: dict
+    """
+    letters = ''
+    while True:
+        number, rest = divmod(number, 26)
+        letters = string.ascii_uppercase[rest] + letters
+        if not number:
+            break
+    return {'bear_type': Bears.TYPES[len(letters) % len(Bears.TYPES)], 'bear_name': 'U' + letters,
+            'bear_age': float(len(letters) + 1)}
+
+
+def run_concurrently(api, operations):
+    """Send API calls from stress_workers threads at once
+
+    :param api: API client shared by the threads
+    :type api: ApiClient
+    :param operations: (ApiClient method name, kwargs) pairs
+    :type operations: list
+    :return: operations log, (method name, kwargs, status code, response text) in the order of operations
+    :rtype: list
+    """
+    def call(operation):
+        name, kwargs = operation
+        resp = getattr(api, name)(**kwargs)
+        return name, kwargs, resp.status_code, resp.text
+
+    with ThreadPoolExecutor(max_workers=stress_workers) as executor:
+        return list(executor.map(call, operations))
+
+
+def create_bears(api, count, owned):
+    """Create unique bears concurrently
+
+    :param owned: bear_ids of the test, created bears are added to it
+    :type owned: set
+    :return: bear_id -> created record
+    :rtype: dict
+    """
+    log = run_concurrently(api, [('post_add', {'json': unique_bear(number)}) for number in range(count)])
+    owned.update(int(text) for _, _, status, text in log if status == HTTPCodes.OK)
+    assert all(status == HTTPCodes.OK for _, _, status, _ in log), 'Not all bears were created'
+    return {int(text): bear_contract.expected(kwargs['json'], int(text)) for _, kwargs, _, text in log}
+
+
+def current_records(api, bear_ids):
+    """Records of get_all restricted to bear_ids, other tests' records are ignored
+
+    :rtype: dict
+    """
+    bear_ids = set(bear_ids)
+    return {record['bear_id']: record for record in api.iter_all() if record['bear_id'] in bear_ids}
+
+
+@pytest.fixture(scope='class')
+def api_stress(alaska, api_hooks) -> ApiClient:
+    """API fixture with a connection pool for every stress worker thread"""
+    from cassette import CassetteAdapter
+    base_url, transport = alaska
+    if isinstance(transport, CassetteAdapter):
+        pytest.skip('concurrency stress needs a live service')
+    with ApiClient(base_url=base_url, pool_size=stress_workers, transport=transport) as client:
+        for hook in api_hooks:
+            client.add_hook(hook)
+        yield client
+
+
+@pytest.fixture()
+def owned_bears(api_stress) -> set:
+    """bear_ids created by the test, deleted on teardown so that the following tests do not see them"""
+    bear_ids = set()
+    yield bear_ids
+    run_concurrently(api_stress, [('delete_one', {'bear_id': bear_id}) for bear_id in bear_ids])
+
+
+@pytest.mark.usefixtures('alaska')
+@allure.feature('Concurrency stress test suit for Alaska test')
+class TestConcurrency:
+    """Every test works with its own bears only and deletes them, records of other tests are left intact"""
+
+    @allure.feature('Concurrent POST create: bear_ids are unique and dense')
+    def test_concurrent_create_ids_unique_dense(self, api_stress, owned_bears) -> None:
+        created = create_bears(api_stress, create_count, owned_bears)
+
+        assert len(created) == create_count, 'bear_ids are not unique'
+        assert max(created) - min(created) + 1 == create_count, 'bear_ids are not dense: {0}..{1} for {2} bears'\
+            .format(min(created), max(created), create_count)
+        bear_contract.assert_valid(current_records(api_stress, created).values(), created)
+
+    @allure.feature('Concurrent PUT update: no update is lost or torn')
+    def test_concurrent_updates_not_lost(self, api_stress, owned_bears) -> None:
+        created = create_bears(api_stress, update_count + 1, owned_bears)
+        bear_ids = sorted(created)
+        contested_id = bear_ids.pop()
+        numbers = itertools.count(update_count + 1)
+
+        # one update of every bear and many updates of the contested bear, all at once
+        operations = [('put_one', {'bear_id': bear_id, 'json': unique_bear(next(numbers))}) for bear_id in bear_ids]
+        operations += [('put_one', {'bear_id': contested_id, 'json': unique_bear(next(numbers))})
+                       for _ in range(contested_updates)]
+        random.Random(seed).shuffle(operations)
+        log = run_concurrently(api_stress, operations)
+        assert all(status == HTTPCodes.OK for _, _, status, _ in log), 'Not all updates succeeded'
+
+        records = current_records(api_stress, created)
+        expected = {kwargs['bear_id']: bear_contract.expected(kwargs['json'], kwargs['bear_id'])
+                    for _, kwargs, _, _ in log if kwargs['bear_id'] != contested_id}
+        bear_contract.assert_valid((records[bear_id] for bear_id in bear_ids), expected)
+        written = [bear_contract.expected(kwargs['json'], contested_id)
+                   for _, kwargs, _, _ in log if kwargs['bear_id'] == contested_id]
+        assert records[contested_id] in written, 'Contested bear is not one of the written records: {0}'\
+            .format(records[contested_id])
+
+    @allure.feature('Concurrent DELETE and PUT: deleted bears do not reappear')
+    def test_concurrent_deletes_not_resurrected(self, api_stress, owned_bears) -> None:
+        created = create_bears(api_stress, update_count, owned_bears)
+        numbers = itertools.count(update_count)
+
+        operations = [('delete_one', {'bear_id': bear_id}) for bear_id in created]
+        operations += [('put_one', {'bear_id': bear_id, 'json': unique_bear(next(numbers))}) for bear_id in created]
+        random.Random(seed).shuffle(operations)
+        log = run_concurrently(api_stress, operations)
+
+        deleted = {kwargs['bear_id'] for name, kwargs, status, _ in log
+                   if name == 'delete_one' and status == HTTPCodes.OK}
+        assert deleted == set(created), 'Not all bears were deleted: {0}'.format(sorted(set(created) - deleted))
+        assert not current_records(api_stress, created), 'Deleted bears reappeared in get_all'
+        for bear_id in sorted(deleted)[::max(len(deleted) // 10, 1)]:
+            resp_get = api_stress.get_one(bear_id=bear_id)
+            assert resp_get.text == Bears.GET_ALL_EMPTY_RESPONSE, 'Deleted bear {0} reappeared: {1}'\
+                .format(bear_id, resp_get.text)
+
+    @allure.feature('Concurrent mixed operations: get_all is consistent with the operations log')
+    def test_mixed_operations_consistent_with_log(self, api_stress, owned_bears) -> None:
+        created = create_bears(api_stress, mixed_database_size, owned_bears)
+        rnd = random.Random(seed)
+        numbers = itertools.count(mixed_database_size)
+        bear_ids = sorted(created)
+
+        operations = [('put_one', {'bear_id': rnd.choice(bear_ids), 'json': unique_bear(next(numbers))})
+                      for _ in range(mixed_updates)]
+        operations += [('delete_one', {'bear_id': bear_id}) for bear_id in rnd.sample(bear_ids, len(bear_ids) // 4)]
+        operations += [('post_add', {'json': unique_bear(next(numbers))}) for _ in range(mixed_creates)]
+        rnd.shuffle(operations)
+        log = run_concurrently(api_stress, operations)
+
+        # replay the log: a bear is deleted by a successful DELETE, otherwise it is one of its written records
+        written = {bear_id: [record] for bear_id, record in created.items()}
+        deleted = set()
+        for name, kwargs, status, text in log:
+            assert status == HTTPCodes.OK or name != 'post_add', 'Bear was not created: {0}'.format(text)
+            if name == 'post_add':
+                bear_id = int(text)
+                owned_bears.add(bear_id)
+                assert bear_id not in written, 'bear_id {0} was allocated twice'.format(bear_id)
+                written[bear_id] = [bear_contract.expected(kwargs['json'], bear_id)]
+            elif name == 'put_one' and status == HTTPCodes.OK:
+                written[kwargs['bear_id']].append(bear_contract.expected(kwargs['json'], kwargs['bear_id']))
+            elif name == 'delete_one' and status == HTTPCodes.OK:
+                deleted.add(kwargs['bear_id'])
+
+        assert max(written) - min(written) + 1 == len(written), 'bear_ids are not dense'
+        records = current_records(api_stress, written)
+        bear_contract.assert_valid(sorted(records.values(), key=lambda record: record['bear_id']))
+        assert set(records) == set(written) - deleted, 'get_all differs from the operations log: missing {0}, ' \
+            'resurrected {1}'.format(sorted(set(written) - deleted - set(records)), sorted(set(records) & deleted))
+        for bear_id, record in records.items():
+            assert record in written[bear_id], 'Record {0} was never written, written: {1}'\
+                .format(record, written[bear_id])
+            if len(written[bear_id]) == 2:
+                assert record == written[bear_id][1], 'Update of bear {0} was lost'.format(bear_id)
@@ -5,12 +5,11 @@ import os
 import sys
 from logger import create_test_logger
 
-logger = create_test_logger('LoL_class')
 
 class LoL:
     def __init__(self):
         self.a = 3
-        logger.info('LOOOL')
+        create_test_logger('LoL_class').info('LOOOL')
 
 
 @pytest.fixture()
@@ -0,0 +1,178 @@
+"""Bear record contract: compiled once, validates single records and whole GET /bear dumps in one pass"""
+
+import os
+import sys
+sys.path.append(os.getcwd())
+
+from constants import Bears
+
+RECORD_FIELDS = frozenset(Bears.FIELDS + ('bear_id',))
+
+
+def diff_records(expected, actual):
+    """Fields of two records that differ
+
+    :param expected: expected record
+    :type expected: dict
+    :param actual: actual record
+    :type actual: dict
+    :return: field -> (expected value, actual value), empty for equal records
+    :rtype: dict
+    """
+    if expected == actual:
+        return {}
+    return {field: (expected.get(field), actual.get(field)) for field in set(expected) | set(actual)
+            if expected.get(field) != actual.get(field)}
+
+
+class BearContract:
+    """Stored bear record contract of the specification in README.md (values from Bears constants):
+    bear_type is one of Bears.TYPES, bear_name is an uppercase str of Bears.NAME_MIN_LENGTH..NAME_MAX_LENGTH
+    characters, bear_age is a float in (Bears.AGE_MIN, Bears.AGE_MAX], bear_id is an int growing by 1
+    with every new record"""
+
+    def __init__(self, types=Bears.TYPES, name_length=(Bears.NAME_MIN_LENGTH, Bears.NAME_MAX_LENGTH),
+                 age_range=(Bears.AGE_MIN, Bears.AGE_MAX)):
+        """BearContract init, compiles the field checks
+
+        :param types: accepted bear_type values
+        :type types: tuple
+        :param name_length: min and max bear_name length
+        :type name_length: tuple
+        :param age_range: exclusive min and inclusive max bear_age
+        :type age_range: tuple
+        :return: None
+        """
+        types = frozenset(types)
+        name_min, name_max = name_length
+        age_min, age_max = age_range
+        # Fast path for the common case of a valid record, the checks below explain the failure otherwise
+        self._valid = lambda bear_id, bear_type, bear_name, bear_age: \
+            type(bear_id) is int and type(bear_type) is str and bear_type in types and \
+            type(bear_name) is str and name_min <= len(bear_name) <= name_max and bear_name == bear_name.upper() and \
+            type(bear_age) is float and age_min < bear_age <= age_max
+        # Every check returns an error message or None, exact type checks reject bool for int and int for float
+        self._checks = (
+            ('bear_id', lambda value: None if type(value) is int else 'not int: {0!r}'.format(value)),
+            ('bear_type', lambda value: None if type(value) is str and value in types
+                else 'not one of {0}: {1!r}'.format(sorted(types), value)),
+            ('bear_name', lambda value: 'not str: {0!r}'.format(value) if type(value) is not str
+                else 'length not in {0}..{1}: {2!r}'.format(name_min, name_max, value)
+                if not name_min <= len(value) <= name_max
+                else 'not uppercase: {0!r}'.format(value) if value != value.upper() else None),
+            ('bear_age', lambda value: 'not float: {0!r}'.format(value) if type(value) is not float
+                else None if age_min < value <= age_max
+                else 'not in ({0}, {1}]: {2!r}'.format(age_min, age_max, value)),
+        )
+
+    @staticmethod
+    def expected(bear_json, bear_id):
+        """Record the service stores for a created or updated bear: uppercase name, float age
+
+        :param bear_json: bear fields sent by the client
+        :type bear_json: dict
+        :param bear_id: bear_id of the record
+        :type bear_id: int
+        :return: expected record
+        :rtype: dict
+        """
+        record = dict(bear_json, bear_id=bear_id)
+        if isinstance(record.get('bear_name'), str):
+            record['bear_name'] = record['bear_name'].upper()
+        if isinstance(record.get('bear_age'), int) and not isinstance(record['bear_age'], bool):
+            record['bear_age'] = float(record['bear_age'])
+        return record
+
+    def check(self, record):
+        """Contract violations of one record
+
+        :param record: record returned by the service
+        :type record: dict
+        :return: field -> error message, empty for a valid record
+        :rtype: dict
+        """
+        if type(record) is not dict:
+            return {'record': 'not an object: {0!r}'.format(record)}
+        errors = {}
+        if record.keys() != RECORD_FIELDS:
+            errors['fields'] = 'expected {0}, got {1}'.format(sorted(RECORD_FIELDS), sorted(record))
+        for field, check in self._checks:
+            if field in record:
+                error = check(record[field])
+                if error is not None:
+                    errors[field] = error
+        return errors
+
+    def validate(self, records, expected=None, ordered=False):
+        """Validate records in one pass
+
+        :param records: records, e.g. ApiClient.iter_all() or a get_all().json() dump
+        :type records: iterable
+        :param expected: bear_id -> expected record (see expected), records are also compared with it if given
+        :type expected: dict
+        :param ordered: bear_ids must increase from record to record, the specification promises no order of GET /bear
+        :type ordered: bool
+        :return: {'count': number of records, 'invalid': {position: {field: error}}, 'duplicates': [bear_id],
+            'unordered': [position], 'missing': [bear_id], 'unexpected': [bear_id],
+            'changed': {bear_id: {field: (expected, actual)}}}, see is_valid
+        :rtype: dict
+        """
+        checks, valid = self._checks, self._valid
+        invalid, duplicates, unordered, unexpected, changed = {}, [], [], [], {}
+        seen = set()
+        previous = None
+        count = 0
+        for position, record in enumerate(records):
+            count += 1
+            if type(record) is dict and record.keys() == RECORD_FIELDS:
+                errors = None
+                if not valid(record['bear_id'], record['bear_type'], record['bear_name'], record['bear_age']):
+                    errors = {field: error for field, error in ((field, check(record[field]))
+                                                                for field, check in checks) if error is not None}
+            else:
+                errors = self.check(record)
+            if errors:
+                invalid[position] = errors
+                if type(record) is not dict or type(record.get('bear_id')) is not int:
+                    continue
+            bear_id = record['bear_id']
+            if bear_id in seen:
+                duplicates.append(bear_id)
+            seen.add(bear_id)
+            if ordered and previous is not None and bear_id <= previous:
+                unordered.append(position)
+            previous = bear_id
+            if expected is not None:
+                expected_record = expected.get(bear_id)
+                if expected_record is None:
+                    unexpected.append(bear_id)
+                elif expected_record != record:
+                    changed[bear_id] = diff_records(expected_record, record)
+        return {'count': count, 'invalid': invalid, 'duplicates': duplicates, 'unordered': unordered,
+                'missing': sorted(set(expected) - seen) if expected is not None else [],
+                'unexpected': unexpected, 'changed': changed}
+
+    @staticmethod
+    def is_valid(result):
+        """True when validate found nothing
+
+        :param result: validate result
+        :type result: dict
+        :rtype: bool
+        """
+        return not any(value for key, value in result.items() if key != 'count')
+
+    def assert_valid(self, records, expected=None, ordered=False):
+        """Validate records and fail with the structured diff
+
+        :return: validate result
+        :rtype: dict
+        :raises AssertionError: records violate the contract or differ from expected
+        """
+        result = self.validate(records, expected, ordered)
+        assert self.is_valid(result), 'Records do not match the contract: {0}'.format(
+            {key: value for key, value in result.items() if value and key != 'count'})
+        return result
+
+
+bear_contract = BearContract()
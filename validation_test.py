@@ -0,0 +1,88 @@
+"""Unit tests of the bear record contract of validation.py"""
+import pytest
+import allure
+import os
+import sys
+sys.path.append(os.getcwd())
+
+from validation import BearContract, bear_contract, diff_records
+
+# Test data
+valid_record = {'bear_type': 'POLAR', 'bear_name': 'MIKHAIL', 'bear_age': 17.5, 'bear_id': 1}
+
+invalid_fields = [
+    ('bear_id', '1'), ('bear_id', True), ('bear_id', 1.0),
+    ('bear_type', 'polar'), ('bear_type', 'PANDA'), ('bear_type', 1),
+    ('bear_name', ''), ('bear_name', 'ABCDEFGHIJK'), ('bear_name', 'Mikhail'), ('bear_name', None),
+    ('bear_age', 17), ('bear_age', 0.0), ('bear_age', 100.5), ('bear_age', -1.0), ('bear_age', True),
+]
+
+invalid_records = [None, [], 'bear', dict(valid_record, bear_color='WHITE'),
+                   {key: value for key, value in valid_record.items() if key != 'bear_age'}]
+
+
+def record(bear_id, **fields):
+    return dict(valid_record, bear_id=bear_id, **fields)
+
+
+@allure.feature('BearContract unit tests')
+class TestBearContract:
+
+    @allure.feature('Valid record passes the fast path and the explaining checks')
+    def test_valid_record(self) -> None:
+        assert bear_contract.check(valid_record) == {}
+        assert bear_contract.is_valid(bear_contract.validate([valid_record]))
+
+    @allure.feature('Invalid field value is reported for that field only')
+    @pytest.mark.parametrize('field, value', invalid_fields)
+    def test_invalid_field(self, field, value) -> None:
+        bad = dict(valid_record, **{field: value})
+        assert list(bear_contract.check(bad)) == [field]
+        result = bear_contract.validate([valid_record, bad])
+        assert list(result['invalid']) == [1] and list(result['invalid'][1]) == [field]
+
+    @allure.feature('Not an object or wrong field set is reported')
+    @pytest.mark.parametrize('bad', invalid_records)
+    def test_invalid_record(self, bad) -> None:
+        result = bear_contract.validate([bad])
+        assert result['count'] == 1 and list(result['invalid']) == [0]
+        assert not bear_contract.is_valid(result)
+
+    @allure.feature('Duplicated bear_id is reported, order is checked only when requested')
+    def test_duplicates_and_order(self) -> None:
+        records = [record(3), record(1), record(3)]
+        result = bear_contract.validate(records)
+        assert result['duplicates'] == [3] and result['unordered'] == []
+        assert bear_contract.validate(records, ordered=True)['unordered'] == [1]
+
+    @allure.feature('Records are compared with the expected ones')
+    def test_expected(self) -> None:
+        expected = {1: record(1), 2: record(2), 3: record(3)}
+        result = bear_contract.validate([record(2, bear_age=2.5), record(1), record(4)], expected)
+        assert result['missing'] == [3]
+        assert result['unexpected'] == [4]
+        assert result['changed'] == {2: {'bear_age': (17.5, 2.5)}}
+
+    @allure.feature('Expected record has an uppercase name and a float age')
+    def test_expected_record(self) -> None:
+        assert BearContract.expected({'bear_type': 'POLAR', 'bear_name': 'mikhail', 'bear_age': 17}, 1) == \
+            {'bear_type': 'POLAR', 'bear_name': 'MIKHAIL', 'bear_age': 17.0, 'bear_id': 1}
+        assert BearContract.expected({'bear_age': True}, 1)['bear_age'] is True
+
+    @allure.feature('assert_valid fails with the structured diff and passes valid records in any order')
+    def test_assert_valid(self) -> None:
+        assert bear_contract.assert_valid(iter([record(2), record(1)]))['count'] == 2
+        with pytest.raises(AssertionError, match='duplicates'):
+            bear_contract.assert_valid([record(1), record(1)])
+
+    @allure.feature('Contract limits are configurable')
+    def test_custom_contract(self) -> None:
+        contract = BearContract(types=('PANDA',), name_length=(1, 3), age_range=(0, 5))
+        assert contract.check(record(1, bear_type='PANDA', bear_name='BOB', bear_age=5.0)) == {}
+        assert sorted(contract.check(valid_record)) == ['bear_age', 'bear_name', 'bear_type']
+
+    @allure.feature('diff_records lists the differing fields')
+    def test_diff_records(self) -> None:
+        assert diff_records(valid_record, dict(valid_record)) == {}
+        assert diff_records(valid_record, {'bear_id': 1, 'bear_name': 'UMKA'}) == \
+            {'bear_type': ('POLAR', None), 'bear_name': ('MIKHAIL', 'UMKA'), 'bear_age': (17.5, None)}